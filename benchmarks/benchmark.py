@@ -0,0 +1,268 @@
+"""
+Benchmark harness for every stage of the Playfair password cipher.
+
+Each stage is timed separately over batches of random passwords, for every
+combination of password length distribution and batch size, and its peak
+memory use is measured with tracemalloc (skip with --no-memory). The full
+pipelines are run both with the fused single-pass kernels (encrypt_playfair,
+decrypt_playfair) and with the separate stages (encrypt_staged,
+decrypt_staged):
+
+    python benchmarks/benchmark.py --lengths 8-16 32 --batch-sizes 100 1000 --out results.json
+
+Results are written as JSON. With --baseline, per-record times are compared
+with a stored result file and any stage that got slower than --threshold is
+reported as a regression (exit status 1). --save-baseline stores the current
+run for later comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+
+def parse_length_distribution(spec):
+    """
+    Parse a password length distribution
+    
+    Args:
+        spec: "N" for a fixed length or "MIN-MAX" for uniformly distributed lengths
+    
+    Returns:
+        A tuple (min_length, max_length)
+    """
+    low, _, high = spec.partition('-')
+    low = int(low)
+    high = int(high) if high else low
+    if low < 1 or high < low:
+        raise argparse.ArgumentTypeError(f"Invalid length distribution '{spec}'")
+    return low, high
+
+def random_passwords(count, lengths, seed):
+    """
+    Generate random passwords from the allowed character set
+    
+    Args:
+        count: Number of passwords
+        lengths: A tuple (min_length, max_length)
+        seed: Seed for the random generator
+    
+    Returns:
+        A list of passwords
+    """
+    rng = random.Random(seed)
+    return [''.join(rng.choice(methods.ALLOWED_CHARS) for _ in range(rng.randint(*lengths)))
+            for _ in range(count)]
+
+def build_stages(passwords, ctx):
+    """
+    Prepare the input of every stage and return the stages to time
+    
+    Args:
+        passwords: The passwords of the batch
+        ctx: The CipherContext to use
+    
+    Returns:
+        A list of (stage_name, function) where function runs the stage over the batch
+    """
+    key = ctx.secret_key
+    prepared = [playfair_encrypt.prepare_message(p) for p in passwords]
+    digraphs = [dg for dgs, _ in prepared for dg in dgs]
+    encrypted_pairs = [playfair_encrypt.encrypt_digraph(dg[0], dg[1], ctx, ctx.matrix_flat) for dg in digraphs]
+    records = [playfair_encrypt.encrypt_playfair(p, ctx, key) for p in passwords]
+    substituted = [''.join(playfair_encrypt.encrypt_digraph(dg[0], dg[1], ctx, ctx.matrix_flat) for dg in dgs)
+                   for dgs, _ in prepared]
+    transformed = [playfair_encrypt.apply_ascii_transform(s, key, ctx.key_values) for s in substituted]
+    case_keys = [case for _, case in records]
+    
+    return [
+        ("prepare_message", lambda: [playfair_encrypt.prepare_message(p) for p in passwords]),
+        ("encrypt_digraph", lambda: [playfair_encrypt.encrypt_digraph(dg[0], dg[1], ctx, ctx.matrix_flat) for dg in digraphs]),
+        ("apply_ascii_transform", lambda: [playfair_encrypt.apply_ascii_transform(s, key, ctx.key_values) for s in substituted]),
+        ("shuffle_text", lambda: [playfair_encrypt.shuffle_text(t, c) for t, c in zip(transformed, case_keys)]),
+        ("unshuffle_text", lambda: [playfair_decrypt.unshuffle_text(e, c) for e, c in records]),
+        ("reverse_ascii_transform", lambda: [playfair_decrypt.reverse_ascii_transform(t, key, ctx.key_values) for t in transformed]),
+        ("decrypt_digraph", lambda: [playfair_decrypt.decrypt_digraph(dg[0], dg[1], ctx) for dg in encrypted_pairs]),
+        ("encrypt_playfair", lambda: [playfair_encrypt.encrypt_playfair(p, ctx, key) for p in passwords]),
+        ("decrypt_playfair", lambda: [playfair_decrypt.decrypt_playfair(e, c, ctx, key) for e, c in records]),
+        ("encrypt_staged", lambda: [playfair_encrypt.encrypt_playfair(p, ctx, key, fused=False) for p in passwords]),
+        ("decrypt_staged", lambda: [playfair_decrypt.decrypt_playfair(e, c, ctx, key, fused=False) for e, c in records]),
+    ]
+
+def time_stage(func, repeat):
+    """
+    Time a stage function
+    
+    Args:
+        func: The function to time
+        repeat: Number of runs; the fastest one is reported
+    
+    Returns:
+        The best wall time in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def measure_memory(func):
+    """
+    Measure the memory a stage function allocates with tracemalloc
+    
+    Args:
+        func: The function to measure
+    
+    Returns:
+        A tuple (peak_bytes, transient_bytes): the peak traced memory during
+        the call, and how far it rose above the memory still held at the end
+        (the intermediate objects of a record, freed once it is done)
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak, peak - current
+
+def run_benchmarks(length_distributions, batch_sizes, key, engine, repeat, seed, memory=True):
+    """
+    Time every stage for every length distribution and batch size
+    
+    Args:
+        length_distributions: A list of (min_length, max_length) tuples
+        batch_sizes: A list of batch sizes
+        key: The secret key
+        engine: Engine for the digraph substitution stage
+        repeat: Number of runs per measurement
+        seed: Seed for the password generator
+        memory: Whether to measure the peak memory of every stage
+    
+    Returns:
+        A dictionary with the run metadata and a list of results
+    """
+    ctx = cipher_context.compile_key(key, engine=engine)
+    results = []
+    for lengths in length_distributions:
+        for batch_size in batch_sizes:
+            passwords = random_passwords(batch_size, lengths, seed)
+            for stage, func in build_stages(passwords, ctx):
+                seconds = time_stage(func, repeat)
+                result = {
+                    "stage": stage,
+                    "lengths": f"{lengths[0]}-{lengths[1]}",
+                    "batch_size": batch_size,
+                    "seconds": seconds,
+                    "per_record_us": seconds / batch_size * 1e6,
+                }
+                if memory:
+                    result["peak_bytes"], result["transient_bytes"] = measure_memory(func)
+                results.append(result)
+    
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "engine": engine,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def find_regressions(current, baseline, threshold):
+    """
+    Compare per-record times with a baseline run
+    
+    Args:
+        current: The current benchmark run
+        baseline: A stored benchmark run
+        threshold: Allowed slowdown as a fraction (0.2 = 20%)
+    
+    Returns:
+        A list of (stage, lengths, batch_size, baseline_us, current_us) for every regression
+    """
+    stored = {(r["stage"], r["lengths"], r["batch_size"]): r["per_record_us"] for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        key = (r["stage"], r["lengths"], r["batch_size"])
+        if key in stored and r["per_record_us"] > stored[key] * (1 + threshold):
+            regressions.append((*key, stored[key], r["per_record_us"]))
+    return regressions
+
+def print_summary(run):
+    """Print the results as a table"""
+    print(f"{'stage':<26}{'lengths':>10}{'batch':>8}{'us/record':>12}{'peak KiB':>10}{'transient B':>13}")
+    for r in run["results"]:
+        peak = f"{r['peak_bytes'] / 1024:.1f}" if "peak_bytes" in r else "-"
+        transient = str(r.get("transient_bytes", "-"))
+        print(f"{r['stage']:<26}{r['lengths']:>10}{r['batch_size']:>8}{r['per_record_us']:>12.2f}{peak:>10}{transient:>13}")
+
+def main(argv=None):
+    """Main function for the benchmark harness"""
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the Playfair cipher.")
+    parser.add_argument("--lengths", nargs="+", type=parse_length_distribution, default=[(8, 16)],
+                        help="password length distributions: N or MIN-MAX (default: 8-16)")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1000],
+                        help="number of passwords per batch (default: 1000)")
+    parser.add_argument("--key", default="P@55W0RD!", help="secret key to benchmark with")
+    parser.add_argument("--engine", choices=cipher_context.ENGINES, default="lookup",
+                        help="digraph substitution engine (default: lookup)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, best is kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the password generator")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip the tracemalloc peak memory measurement")
+    parser.add_argument("--out", help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="compare with a stored result file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown reported as a regression, as a fraction (default: 0.2)")
+    parser.add_argument("--save-baseline", help="also store the results as a baseline file")
+    args = parser.parse_args(argv)
+    
+    run = run_benchmarks(args.lengths, args.batch_sizes, args.key, args.engine, args.repeat, args.seed,
+                         args.memory)
+    
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(run, f, indent=2)
+        print_summary(run)
+    else:
+        json.dump(run, sys.stdout, indent=2)
+        print()
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(run, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(run, baseline, args.threshold)
+        for stage, lengths, batch_size, before, after in regressions:
+            print(f"REGRESSION {stage} (lengths {lengths}, batch {batch_size}): "
+                  f"{before:.2f} -> {after:.2f} us/record", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Startup-time benchmark for the cipher modules.
+
+Each measurement imports the modules in a fresh interpreter with
+`python -X importtime` and reports the cumulative import time, so the cost
+that short-lived worker processes pay on every start is visible:
+
+    python benchmarks/import_time.py --runs 10
+
+It also checks that importing the core modules loads no third-party packages.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Core modules that must be importable without third-party packages
+CORE_MODULES = ["methods", "cipher_context", "shuffle_cache", "playfair_encrypt", "playfair_decrypt"]
+
+# Third-party packages that must not be loaded by the core modules
+THIRD_PARTY = ["prettytable", "numpy"]
+
+def measure_import(modules):
+    """
+    Import modules in a fresh interpreter and measure the cumulative import time
+    
+    Args:
+        modules: A list of module names
+    
+    Returns:
+        A tuple (total_microseconds, loaded_third_party_packages)
+    """
+    code = (
+        f"import sys\n"
+        f"import {', '.join(modules)}\n"
+        f"print(','.join(m for m in {THIRD_PARTY!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    
+    # importtime lines look like "import time: self [us] | cumulative | imported package";
+    # the cumulative time of the requested modules includes everything they import
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        if package.strip() in modules and not package.startswith("  "):
+            total += int(cumulative)
+    
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return total, loaded
+
+def main(argv=None):
+    """Main function for the startup-time benchmark"""
+    parser = argparse.ArgumentParser(description="Measure the import time of the cipher modules.")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters (default: 5)")
+    parser.add_argument("--modules", nargs="+", default=CORE_MODULES, help="modules to import")
+    args = parser.parse_args(argv)
+    
+    timings = []
+    loaded = []
+    for _ in range(args.runs):
+        total, loaded = measure_import(args.modules)
+        timings.append(total)
+    
+    result = {
+        "modules": args.modules,
+        "runs": args.runs,
+        "median_us": statistics.median(timings),
+        "min_us": min(timings),
+        "third_party_loaded": loaded,
+    }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    
+    if loaded:
+        print(f"Third-party packages loaded at import: {', '.join(loaded)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
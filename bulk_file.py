@@ -0,0 +1,213 @@
+"""
+Memory-mapped processing of fixed-width record files.
+
+Every record of the input is a line of the same length, padded with spaces
+(which never appear in passwords, ciphertext or case information). The input
+is mapped with mmap and walked as memoryview slices, so reading a file does
+not grow the Python heap with its size; only the record being processed is
+decoded. The output has fixed-width records too and can either be written
+sequentially or preallocated and mapped (mmap_output=True), with every record
+written in place.
+
+Encrypted record layout, for passwords of at most `width` characters:
+
+    <ciphertext padded to 2*width> TAB <case information padded> NEWLINE
+
+The ciphertext field is 2*width wide because every character of a password
+can be followed by a filler, and the case field holds one hex digit for
+every 4 ciphertext characters.
+
+Characters are stored one byte each as Latin-1, which holds the characters
+of every matrix size (ASCII up to 8x8).
+"""
+import mmap
+import os
+
+import cipher_context
+import parallel
+import playfair_encrypt
+import playfair_decrypt
+
+def case_field_width(cipher_width):
+    """Width of the case information field for a ciphertext field width"""
+    return (cipher_width + 3) // 4
+
+def encrypted_record_width(width):
+    """
+    Width of an encrypted record (without its newline)
+    
+    Args:
+        width: Maximum password length
+    
+    Returns:
+        The number of characters of every encrypted record
+    """
+    cipher_width = 2 * width
+    return cipher_width + 1 + case_field_width(cipher_width)
+
+def record_layout(data, size):
+    """
+    Find the record layout of a fixed-width file
+    
+    Args:
+        data: The mapped file
+        size: The file size
+    
+    Returns:
+        A tuple (width, record_length, count) where width excludes the line
+        ending and record_length includes it
+    
+    Raises:
+        ValueError: If the file is not made of records of the same length
+    """
+    end = data.find(b'\n')
+    if end < 0:
+        # A single record without line ending
+        return size, size + 1, 1
+    
+    newline = 2 if end > 0 and data[end - 1] == ord('\r') else 1
+    width = end - (newline - 1)
+    record_length = width + newline
+    
+    if size % record_length == 0:
+        count = size // record_length
+    elif size % record_length == width:
+        # The last record has no line ending
+        count = size // record_length + 1
+    else:
+        raise ValueError(f"Not a fixed-width file: {size} bytes is not a whole number of {record_length}-byte records.")
+    return width, record_length, count
+
+def _process_file(input_path, output_path, make_converter, mmap_output, skip_invalid):
+    """
+    Convert every record of a fixed-width file into a fixed-width output record
+    
+    Args:
+        input_path: Path of the fixed-width input file
+        output_path: Path of the output file
+        make_converter: Function taking (data, width) and returning
+            (convert, output_width); convert maps a memoryview of one input
+            record to the bytes of the output record
+        mmap_output: Whether to preallocate and map the output file
+        skip_invalid: Whether invalid records are left blank instead of stopping
+    
+    Returns:
+        A tuple (count, errors) with the number of records and a list of
+        (line_number, error) for the invalid records that were skipped
+    """
+    with open(input_path, 'rb') as source:
+        size = os.fstat(source.fileno()).st_size
+        if size == 0:
+            open(output_path, 'wb').close()
+            return 0, []
+        
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            width, record_length, count = record_layout(data, size)
+            newline = data[width:record_length]
+            convert, output_width = make_converter(data, width)
+            output_length = output_width + 1
+            blank = b' ' * output_width + b'\n'
+            
+            with open(output_path, 'w+b' if mmap_output else 'wb') as target:
+                output = None
+                if mmap_output:
+                    target.truncate(count * output_length)
+                    output = mmap.mmap(target.fileno(), count * output_length, access=mmap.ACCESS_WRITE)
+                
+                errors = []
+                view = memoryview(data)
+                try:
+                    for i in range(count):
+                        start = i * record_length
+                        if i < count - 1 and data[start + width:start + record_length] != newline:
+                            raise ValueError(f"Not a fixed-width file: line {i + 1} is not {width} characters long.")
+                        field = view[start:start + width]
+                        try:
+                            record = convert(field) + b'\n'
+                        except parallel.RECORD_ERRORS as e:
+                            if not skip_invalid:
+                                raise ValueError(f"Invalid record on line {i + 1}: {e}") from e
+                            errors.append((i + 1, e))
+                            record = blank
+                        finally:
+                            field.release()
+                        
+                        if output is not None:
+                            output[i * output_length:(i + 1) * output_length] = record
+                        else:
+                            target.write(record)
+                finally:
+                    view.release()
+                    if output is not None:
+                        output.flush()
+                        output.close()
+    
+    return count, errors
+
+def encrypt_file(input_path, output_path, key, mmap_output=True, engine="table", skip_invalid=False):
+    """
+    Encrypt a fixed-width file of passwords (one per line, padded with spaces)
+    
+    Args:
+        input_path: Path of the password file
+        output_path: Path of the encrypted file
+        key: The secret key or a CipherContext compiled for it
+        mmap_output: Whether to preallocate and map the output file
+        engine: Engine for the digraph substitution stage (see cipher_context.ENGINES)
+        skip_invalid: Whether invalid passwords are left blank instead of stopping
+    
+    Returns:
+        A tuple (count, errors) with the number of records and a list of
+        (line_number, error) for the invalid records that were skipped
+    """
+    ctx = cipher_context.resolve_key(key, engine=engine)
+
+    def make_converter(data, width):
+        cipher_width = 2 * width
+        case_width = case_field_width(cipher_width)
+
+        def convert(field):
+            password = bytes(field).rstrip(b' ').decode('latin-1')
+            encrypted, case_encoded = playfair_encrypt.encrypt_playfair(password, ctx, ctx.secret_key)
+            return f"{encrypted:<{cipher_width}}\t{case_encoded:<{case_width}}".encode('latin-1')
+        
+        return convert, encrypted_record_width(width)
+    
+    return _process_file(input_path, output_path, make_converter, mmap_output, skip_invalid)
+
+def decrypt_file(input_path, output_path, key, width=None, mmap_output=True, engine="table", skip_invalid=False):
+    """
+    Decrypt a fixed-width file written by encrypt_file
+    
+    Args:
+        input_path: Path of the encrypted file
+        output_path: Path of the password file
+        key: The secret key or a CipherContext compiled for it
+        width: Width of the password records (default: half the ciphertext field)
+        mmap_output: Whether to preallocate and map the output file
+        engine: Engine for the digraph substitution stage (see cipher_context.ENGINES)
+        skip_invalid: Whether invalid records are left blank instead of stopping
+    
+    Returns:
+        A tuple (count, errors) with the number of records and a list of
+        (line_number, error) for the invalid records that were skipped
+    """
+    ctx = cipher_context.resolve_key(key, engine=engine)
+
+    def make_converter(data, record_width):
+        cipher_width = data.find(b'\t', 0, record_width)
+        if cipher_width < 0:
+            raise ValueError("Not an encrypted fixed-width file: the first record has no tab separator.")
+        output_width = cipher_width // 2 if width is None else width
+
+        def convert(field):
+            encrypted = bytes(field[:cipher_width]).rstrip(b' ').decode('latin-1')
+            case_encoded = bytes(field[cipher_width + 1:]).rstrip(b' ').decode('ascii')
+            decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_encoded, ctx, ctx.secret_key)
+            if len(decrypted) > output_width:
+                raise ValueError(f"Decrypted password is longer than the {output_width}-character record width.")
+            return f"{decrypted:<{output_width}}".encode('latin-1')
+        
+        return convert, output_width
+    
+    return _process_file(input_path, output_path, make_converter, mmap_output, skip_invalid)
@@ -0,0 +1,310 @@
+"""
+Encryption and decryption of bytes-like passwords without str round-trips.
+
+encrypt_bytes/decrypt_bytes accept bytes, bytearray or memoryview and return
+bytes; encrypt_into/decrypt_into write the result into a caller-provided
+writable buffer (bytearray, memoryview, mmap, ...) instead. Every byte is one
+character (Latin-1), so ASCII input gives exactly the output of
+encrypt_playfair/decrypt_playfair on the decoded text.
+
+Every stage works on bytes with per-key tables built once:
+- validation deletes the allowed bytes with bytes.translate,
+- case folding and the case map are bytes.translate tables,
+- digraph substitution is one lookup per digraph in a 65536-entry table
+  indexed by the two bytes read as a 16-bit integer,
+- the ASCII transformation translates every residue class of positions
+  (modulo the number of key values) with the table of its key value,
+- the shuffle is a C-level gather with operator.itemgetter.
+
+Only the short hex case information is turned into a str, as the key of the
+shared permutation cache.
+
+The tables take a few milliseconds to build and about 1 MB per key, so they
+are cached per compiled key, and secret keys given as str are compiled once
+and kept in an LRU cache of the same size.
+"""
+import functools
+import operator
+import re
+import sys
+
+import cipher_context
+import case_codec
+import shuffle_cache
+import playfair_encrypt
+import playfair_decrypt
+
+# Filler inserted between doubled letters and after odd-length messages
+FILLER = ord('X')
+
+# Number of keys whose compiled context and byte tables are kept
+KEY_CACHE_SIZE = 16
+
+# Runs of lowercase case bits
+_LOWER_RUNS = re.compile(rb'0+')
+
+def _pair_index(c1, c2):
+    """Index of a digraph in the pair tables, as read from memoryview.cast('H')"""
+    if sys.byteorder == 'little':
+        return c1 | c2 << 8
+    return c1 << 8 | c2
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def _compiled_key(secret_key, matrix_size):
+    """Compile a secret key, reusing the contexts of recently used keys and sizes"""
+    return cipher_context.compile_key(secret_key, matrix_size)
+
+def _context(key, matrix_size):
+    """Return the CipherContext for a secret key or an already compiled context"""
+    if isinstance(key, cipher_context.CipherContext):
+        return key
+    return _compiled_key(key, matrix_size)
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def _tables(ctx):
+    """
+    Build the byte tables of a CipherContext
+    
+    Args:
+        ctx: A CipherContext
+    
+    Returns:
+        A tuple (allowed, fold, lower, case_bits, encrypt_pairs, decrypt_pairs,
+        forward, reverse) where allowed holds the allowed bytes, fold, lower and
+        case_bits are translate tables (to uppercase, to lowercase, and to 1 for
+        uppercase/non-alpha or 0 for lowercase), the pair tables map a 16-bit
+        digraph index to the substituted digraph, and forward/reverse map a
+        key value to the translate table of the ASCII transformation
+    """
+    chars = [chr(code) for code in range(256)]
+
+    def single_byte(char, default):
+        return ord(char) if len(char) == 1 and ord(char) < 256 else default
+    
+    allowed = bytes(sorted(ord(c) for c in ctx.allowed if ord(c) < 256))
+    fold = bytes(single_byte(c.upper(), code) for code, c in enumerate(chars))
+    lower = bytes(single_byte(c.lower(), code) for code, c in enumerate(chars))
+    case_bits = bytes(c.isupper() or not c.isalpha() for c in chars)
+    
+    # Digraphs with a character outside the matrix take the fallbacks of the str path
+    cells = [(char, ord(char)) for char in ctx.positions if ord(char) < 256]
+    encrypt_pairs = [playfair_encrypt.encrypt_digraph('\0', '\0', ctx, ctx.matrix_flat).encode('latin-1')] * 65536
+    decrypt_pairs = [b'??'] * 65536
+    for c1, b1 in cells:
+        for c2, b2 in cells:
+            index = _pair_index(b1, b2)
+            encrypt_pairs[index] = playfair_encrypt.encrypt_digraph(c1, c2, ctx, ctx.matrix_flat).encode('latin-1')
+            decrypt_pairs[index] = playfair_decrypt.decrypt_digraph(c1, c2, ctx).encode('latin-1')
+    
+    ring = ctx.ring.encode('latin-1')
+    ring_index = {byte: i for i, byte in enumerate(ring)}
+    size = len(ring)
+    forward = {}
+    reverse = {}
+    for value in set(ctx.key_values):
+        forward[value] = bytes(ring[(ring_index.get(code, 0) + value) % size] for code in range(256))
+        reverse[value] = bytes(ring[(ring_index[code] - value) % size] if code in ring_index else code
+                               for code in range(256))
+    
+    return allowed, fold, lower, case_bits, encrypt_pairs, decrypt_pairs, forward, reverse
+
+def _gather(data, order):
+    """Return bytes(data[i] for i in order) with a C-level gather"""
+    if len(order) < 2:
+        return bytes(data[i] for i in order)
+    return bytes(operator.itemgetter(*order)(data))
+
+def _transform(data, key_values, tables):
+    """
+    Apply the ASCII transformation (or its reverse) to bytes
+    
+    Args:
+        data: The bytes to transform
+        key_values: Values derived from the secret key
+        tables: Mapping of key value -> translate table
+    
+    Returns:
+        The transformed bytes as a bytearray
+    """
+    result = bytearray(len(data))
+    step = len(key_values)
+    for r in range(min(step, len(data))):
+        result[r::step] = data[r::step].translate(tables[key_values[r]])
+    return result
+
+def _prepare(folded):
+    """
+    Split folded bytes into digraphs with fillers, as prepare_message does
+    
+    Args:
+        folded: The uppercase message
+    
+    Returns:
+        A tuple (prepared, filler_count) with the concatenated digraphs
+    """
+    if len(folded) % 2 == 0 and not any(map(operator.eq, folded[0::2], folded[1::2])):
+        return folded, 0
+    
+    prepared = bytearray()
+    fillers = 0
+    i = 0
+    while i < len(folded):
+        if i == len(folded) - 1 or folded[i] == folded[i + 1]:
+            prepared += bytes((folded[i], FILLER))
+            fillers += 1
+            i += 1
+        else:
+            prepared += folded[i:i + 2]
+            i += 2
+    return bytes(prepared), fillers
+
+def _remove_fillers(decrypted):
+    """
+    Bytes version of playfair_decrypt.remove_fillers
+    
+    Decrypted digraphs hold matrix characters, whose letters are uppercase,
+    so only X can be a filler and neighbours compare as plain bytes.
+    """
+    # An X at the start is kept
+    k = decrypted.find(FILLER, 1)
+    if k == -1:
+        return decrypted
+    last = len(decrypted) - 1
+    parts = []
+    start = 0
+    while k != -1:
+        # X between same letters, or at the end - it's a filler
+        if k == last or decrypted[k - 1] == decrypted[k + 1]:
+            parts.append(decrypted[start:k])
+            start = k + 1
+            # An X right after a dropped filler is kept
+            k = decrypted.find(FILLER, k + 2)
+        else:
+            k = decrypted.find(FILLER, k + 1)
+    parts.append(decrypted[start:])
+    return b''.join(parts)
+
+def _check_valid(data, allowed, validate, ctx):
+    """Raise the ValueError of the str path if data has a byte outside allowed"""
+    if data.translate(None, allowed):
+        validate(data.decode('latin-1'), ctx)
+
+def _encrypt(message, ctx):
+    """Encrypt bytes; returns (ciphertext, case_info) as bytes"""
+    message = bytes(message)
+    allowed, fold, _, case_bits, encrypt_pairs, _, forward, _ = _tables(ctx)
+    _check_valid(message, allowed, playfair_encrypt.validate_message, ctx)
+    
+    prepared, fillers = _prepare(message.translate(fold))
+    encrypted = b''.join(map(encrypt_pairs.__getitem__, memoryview(prepared).cast('H')))
+    
+    case_encoded = case_codec.encode_case_map(message.translate(case_bits) + b'\x01' * fillers)
+    transformed = _transform(encrypted, ctx.key_values, forward)
+    forward_order, _ = shuffle_cache.get_permutations(case_encoded, len(transformed))
+    return _gather(transformed, forward_order), case_encoded.encode('ascii')
+
+def _decrypt(ciphertext, case_info, ctx):
+    """Decrypt bytes; returns the plaintext as bytes"""
+    ciphertext = bytes(ciphertext)
+    case_encoded = bytes(case_info).decode('ascii')
+    allowed, _, lower, _, _, decrypt_pairs, _, reverse = _tables(ctx)
+    _check_valid(ciphertext, allowed, playfair_decrypt.validate_encrypted, ctx)
+    playfair_decrypt.validate_length(ciphertext)
+    
+    _, inverse = shuffle_cache.get_permutations(case_encoded or ctx.fallback_shuffle_key, len(ciphertext))
+    transformed = _transform(_gather(ciphertext, inverse), ctx.key_values, reverse)
+    decrypted = b''.join(map(decrypt_pairs.__getitem__, memoryview(transformed).cast('H')))
+    
+    result = bytearray(_remove_fillers(decrypted))
+    bits = case_codec.decode_case_bits(case_encoded).encode('ascii')[:len(result)]
+    for run in _LOWER_RUNS.finditer(bits):
+        start, end = run.span()
+        result[start:end] = result[start:end].translate(lower)
+    return bytes(result)
+
+def _write(out, data):
+    """Copy data to the start of a writable buffer and return its length"""
+    view = memoryview(out)
+    if view.readonly:
+        raise TypeError("The output buffer is read-only.")
+    if view.nbytes < len(data):
+        raise ValueError(f"The output buffer holds {view.nbytes} bytes, {len(data)} are needed.")
+    view.cast('B')[:len(data)] = data
+    return len(data)
+
+def encrypt_bytes(message, key, matrix_size=7):
+    """
+    Encrypt a bytes-like password
+    
+    Args:
+        message: The password as bytes, bytearray or memoryview (one character per byte)
+        key: The secret key or a CipherContext compiled for it
+        matrix_size: Size of the matrix used when key is a secret key
+    
+    Returns:
+        A tuple (encrypted_message, case_information) of bytes
+    
+    Raises:
+        ValueError: As encrypt_playfair does for invalid characters
+    """
+    return _encrypt(message, _context(key, matrix_size))
+
+def decrypt_bytes(ciphertext, case_info, key, matrix_size=7):
+    """
+    Decrypt a bytes-like encrypted password
+    
+    Args:
+        ciphertext: The encrypted password as bytes, bytearray or memoryview
+        case_info: The case information (hex digits) as a bytes-like object
+        key: The secret key or a CipherContext compiled for it
+        matrix_size: Size of the matrix used when key is a secret key
+    
+    Returns:
+        The decrypted password as bytes
+    
+    Raises:
+        ValueError: As decrypt_playfair does for invalid characters, or if
+                    the ciphertext has an odd length
+    """
+    return _decrypt(ciphertext, case_info, _context(key, matrix_size))
+
+def encrypt_into(message, key, out, matrix_size=7):
+    """
+    Encrypt a bytes-like password into a caller-provided buffer
+    
+    Args:
+        message: The password as bytes, bytearray or memoryview
+        key: The secret key or a CipherContext compiled for it
+        out: A writable buffer receiving the ciphertext at its start
+        matrix_size: Size of the matrix used when key is a secret key
+    
+    Returns:
+        A tuple (count, case_information) with the number of bytes written
+        and the case information as bytes
+    
+    Raises:
+        ValueError: For invalid characters or if out is too small (out is
+                    left unchanged)
+    """
+    encrypted, case_info = encrypt_bytes(message, key, matrix_size)
+    return _write(out, encrypted), case_info
+
+def decrypt_into(ciphertext, case_info, key, out, matrix_size=7):
+    """
+    Decrypt a bytes-like encrypted password into a caller-provided buffer
+    
+    Args:
+        ciphertext: The encrypted password as bytes, bytearray or memoryview
+        case_info: The case information as a bytes-like object
+        key: The secret key or a CipherContext compiled for it
+        out: A writable buffer receiving the password at its start
+        matrix_size: Size of the matrix used when key is a secret key
+    
+    Returns:
+        The number of bytes written
+    
+    Raises:
+        ValueError: For invalid characters or if out is too small (out is
+                    left unchanged)
+    """
+    return _write(out, decrypt_bytes(ciphertext, case_info, key, matrix_size))
@@ -0,0 +1,118 @@
+# Translation table turning bytes(case_map) (0/1 bytes) into ASCII '0'/'1' digits
+_BIT_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+
+# Characters accepted by the fast path of decode_case_bits
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+def pack_case_map(case_map):
+    """
+    Pack a case map into an integer
+    
+    Args:
+        case_map: A sequence of booleans (True for uppercase/non-alpha)
+    
+    Returns:
+        A tuple (value, bit_count) where the first entry of case_map is the
+        most significant bit of value
+    """
+    if not case_map:
+        return 0, 0
+    bits = bytes(case_map).translate(_BIT_DIGITS)
+    return int(bits, 2), len(case_map)
+
+def encode_case_map(case_map):
+    """
+    Encode a case map as the hexadecimal case information
+    
+    The bits are padded with zeros to a multiple of 4 and written as one
+    lowercase hex digit per 4 bits.
+    
+    Args:
+        case_map: A sequence of booleans (True for uppercase/non-alpha)
+    
+    Returns:
+        The case information as a hex string
+    """
+    value, bit_count = pack_case_map(case_map)
+    digits = (bit_count + 3) // 4
+    if digits == 0:
+        return ''
+    padding = digits * 4 - bit_count
+    return format(value << padding, f'0{digits}x')
+
+def decode_case_bits(case_encoded):
+    """
+    Decode hexadecimal case information into case bits
+    
+    Characters that are not hex digits are skipped.
+    
+    Args:
+        case_encoded: The case information as a hex string
+    
+    Returns:
+        A string of '0' (lowercase) and '1' (uppercase/non-alpha) characters,
+        four per hex digit
+    """
+    if not _HEX_DIGITS.issuperset(case_encoded):
+        # Slow path: keep only the characters int() accepts as a hex digit
+        valid = []
+        for c in case_encoded:
+            try:
+                int(c, 16)
+            except ValueError:
+                continue
+            valid.append(c)
+        case_encoded = ''.join(valid)
+    if not case_encoded:
+        return ''
+    return format(int(case_encoded, 16), f'0{len(case_encoded) * 4}b')
+
+def case_to_bytes(case_encoded):
+    """
+    Convert hexadecimal case information to its compact binary form
+    
+    The first byte is the number of padding nibbles (0 or 1) at the end,
+    followed by two hex digits per byte.
+    
+    Args:
+        case_encoded: The case information as a hex string
+    
+    Returns:
+        The case information as bytes
+    """
+    padding = len(case_encoded) % 2
+    return bytes([padding]) + bytes.fromhex(case_encoded + '0' * padding)
+
+def case_from_bytes(data):
+    """
+    Convert the compact binary form back to hexadecimal case information
+    
+    Args:
+        data: Bytes produced by case_to_bytes
+    
+    Returns:
+        The case information as a lowercase hex string
+    """
+    if not data or data[0] not in (0, 1):
+        raise ValueError("Invalid binary case information.")
+    hex_digits = data[1:].hex()
+    return hex_digits[:len(hex_digits) - data[0]]
+
+def encode_positions(positions, length):
+    """
+    Encode a set of positions as a hexadecimal bitmask
+    
+    Uses the layout of the case information: bit k (most significant first)
+    is set for position k, padded with zeros to a multiple of 4.
+    
+    Args:
+        positions: The positions to mark, each below length
+        length: The number of positions covered by the mask
+    
+    Returns:
+        The bitmask as a hex string of (length + 3) // 4 digits
+    """
+    bits = bytearray(length)
+    for position in positions:
+        bits[position] = 1
+    return encode_case_map(bits)
@@ -0,0 +1,374 @@
+import functools
+import threading
+from types import MappingProxyType
+
+import methods
+
+# Engines available for the Playfair (digraph substitution) stage:
+# - "lookup": resolve each digraph through the char -> (row, col) tables
+# - "table": precompute every digraph substitution for the key
+ENGINES = ("lookup", "table")
+
+# Character ring used by the ASCII transformation and each character's index in it
+TRANSFORM_CHARS = methods.ALLOWED_CHARS
+TRANSFORM_INDEX = {char: i for i, char in enumerate(TRANSFORM_CHARS)}
+
+# Row and column offsets of the same-row and same-column rules when encrypting
+# (decryption uses the opposite offsets)
+ROW_SHIFT = 2
+COL_SHIFT = 3
+
+# Number of characters a compiled key's schedule covers before it has to grow
+DEFAULT_SCHEDULE_LENGTH = 256
+
+@functools.lru_cache(maxsize=None)
+def shift_tables(matrix_size):
+    """
+    Precompute the wrapped row/column indices of the Playfair shift rules
+    
+    Args:
+        matrix_size: Number of rows (and columns) in the matrix
+    
+    Returns:
+        A tuple (rows_down, cols_right, rows_up, cols_left) of tuples mapping
+        a row or column index to the shifted one: rows_down/cols_right for
+        encryption, rows_up/cols_left for decryption
+    """
+    indices = range(matrix_size)
+    return (tuple((i + ROW_SHIFT) % matrix_size for i in indices),
+            tuple((j + COL_SHIFT) % matrix_size for j in indices),
+            tuple((i - ROW_SHIFT) % matrix_size for i in indices),
+            tuple((j - COL_SHIFT) % matrix_size for j in indices))
+
+@functools.lru_cache(maxsize=64)
+def ring_index(ring):
+    """
+    Return the index of every character of a transform ring
+    
+    Args:
+        ring: The characters of the ring
+    
+    Returns:
+        A read-only mapping of character -> index in the ring
+    """
+    if ring == TRANSFORM_CHARS:
+        return MappingProxyType(TRANSFORM_INDEX)
+    return MappingProxyType({char: i for i, char in enumerate(ring)})
+
+def transform_ring(matrix_flat):
+    """
+    Return the transform ring for a matrix
+    
+    Matrices up to 7x7 use TRANSFORM_CHARS (so their output is unchanged);
+    the ring of a larger matrix adds its extended characters, so that every
+    character the matrix can produce survives the transformation.
+    
+    Args:
+        matrix_flat: The flattened matrix
+    
+    Returns:
+        The characters of the ring as a string
+    """
+    if len(matrix_flat) <= methods.STANDARD_MATRIX_SIZE ** 2:
+        return TRANSFORM_CHARS
+    extra = dict.fromkeys(char for char in matrix_flat if char not in methods.ALLOWED_SET)
+    return TRANSFORM_CHARS + ''.join(extra)
+
+def generate_key_values(secret_key):
+    """
+    Generate a sequence of numbers from the secret key without using hash functions
+    
+    Args:
+        secret_key: The secret key
+    
+    Returns:
+        List of integers derived from the key
+    """
+    # Convert each character to its ASCII value
+    key_values = [ord(c) for c in secret_key]
+    
+    # Extend the key values to make it more complex
+    extended_values = []
+    sum_so_far = 0
+    
+    for i, val in enumerate(key_values):
+        sum_so_far = (sum_so_far + val) % 256
+        product = (val * (i + 1)) % 256
+        extended_values.append(sum_so_far)
+        extended_values.append(product)
+    
+    return extended_values
+
+def expand_key_values(key_values, length):
+    """
+    Repeat key values cyclically to cover a text
+    
+    Args:
+        key_values: Values derived from the secret key (each below 256)
+        length: Number of characters to cover
+    
+    Returns:
+        bytes whose item i is key_values[i % len(key_values)], holding a
+        whole number of periods and at least length items
+    
+    Raises:
+        ValueError: If key_values is empty and length is not zero
+    """
+    if not key_values:
+        if length:
+            raise ValueError("The secret key is empty; it has no key values.")
+        return b''
+    return bytes(key_values) * -(-length // len(key_values))
+
+class KeySchedule:
+    """
+    The key values of a secret key, pre-expanded to the length of a message
+    
+    Item i of the schedule is the key value applied to the i-th character of
+    a transformed text, so the ASCII transformation can zip the text with the
+    schedule instead of cycling through the key values. The schedule is
+    expanded up front and grows (at least doubling) when a longer text needs
+    it; growth swaps in a new bytes object under a lock, so earlier results
+    of expand() stay valid and threads can share a schedule.
+    
+    A buffer already holding the expanded schedule (e.g. shared memory
+    written by another process) can be passed in place of a new one. It is
+    trusted rather than expanded again, so only its length (whole periods of
+    the key values) and its first period are checked, raising ValueError.
+    
+    Attributes:
+        period: Number of key values the schedule repeats
+    """
+    
+    __slots__ = ("period", "_values", "_lock")
+
+    def __init__(self, key_values, length=DEFAULT_SCHEDULE_LENGTH, buffer=None):
+        self.period = len(key_values)
+        if buffer is None:
+            values = expand_key_values(key_values, length if key_values else 0)
+        else:
+            values = memoryview(buffer).cast('B')
+            whole_periods = len(values) % self.period == 0 if key_values else not values
+            if not whole_periods or values[:self.period] != bytes(key_values):
+                raise ValueError("The buffer does not hold the key schedule of this key.")
+        self._values = values
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def expand(self, length):
+        """
+        Return the schedule covering at least length characters
+        
+        Args:
+            length: Number of characters to cover
+        
+        Returns:
+            A bytes-like object of key values (read-only; do not modify)
+        
+        Raises:
+            ValueError: If the key has no key values and length is not zero
+        """
+        values = self._values
+        if len(values) >= length:
+            return values
+        with self._lock:
+            if len(self._values) < length:
+                self._values = expand_key_values(self._values[:self.period], max(length, 2 * len(self._values)))
+            return self._values
+
+class CipherContext:
+    """
+    Precompiled per-key state for the Playfair cipher.
+    
+    Building a context once and passing it to encrypt_playfair/decrypt_playfair
+    in place of the matrix avoids scanning the matrix for every character and
+    re-deriving the key values on every call.
+    
+    A context is immutable: sequences are tuples, mappings are read-only
+    views, and its attributes cannot be reassigned. The same context can be
+    shared by any number of threads without locking (the key schedule
+    locks its own growth).
+    
+    Attributes:
+        secret_key: The secret key the context was compiled for
+        matrix: The matrix as a tuple of rows (tuples)
+        matrix_size: Number of rows (and columns) in the matrix
+        matrix_flat: Flattened version of the matrix (tuple)
+        positions: Read-only mapping of character -> (row, col) in the matrix
+        key_values: Values derived from the secret key (tuple, see generate_key_values)
+        key_schedule: The key values expanded to message length (see KeySchedule)
+        fallback_shuffle_key: Shuffle key used when no case information is given
+        shifts: Shifted row/column indices for the matrix size (see shift_tables)
+        ring: Characters of the transform ring (see transform_ring)
+        ring_index: Read-only mapping of character -> index in the ring
+        allowed: Characters accepted in plaintext and ciphertext (frozenset)
+        engine: Engine used for the digraph substitution stage (see ENGINES)
+        encrypt_table: Read-only digraph -> encrypted digraph mapping ("table" engine only, else None)
+        decrypt_table: Read-only encrypted digraph -> digraph mapping ("table" engine only, else None)
+    """
+    
+    __slots__ = ("secret_key", "matrix", "matrix_size", "matrix_flat", "positions", "key_values",
+                 "key_schedule", "fallback_shuffle_key", "shifts", "ring", "ring_index", "allowed", "engine",
+                 "encrypt_table", "decrypt_table")
+
+    def __init__(self, matrix, secret_key, engine="lookup", schedule_length=DEFAULT_SCHEDULE_LENGTH,
+                 schedule_buffer=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Available engines: {', '.join(ENGINES)}")
+        
+        matrix = tuple(tuple(row) for row in matrix)
+        
+        # Keep the first occurrence, matching find_position's row-major scan
+        positions = {}
+        for i, row in enumerate(matrix):
+            for j, char in enumerate(row):
+                if char not in positions:
+                    positions[char] = (i, j)
+        
+        key_values = tuple(generate_key_values(secret_key))
+        matrix_flat = tuple(char for row in matrix for char in row)
+        ring = transform_ring(matrix_flat)
+        
+        encrypt_table = None
+        decrypt_table = None
+        if engine == "table":
+            encrypt_table, decrypt_table = (MappingProxyType(table) for table in build_digraph_tables(matrix))
+        
+        init = super().__setattr__
+        init("secret_key", secret_key)
+        init("matrix", matrix)
+        init("matrix_size", len(matrix))
+        init("matrix_flat", matrix_flat)
+        init("positions", MappingProxyType(positions))
+        init("key_values", key_values)
+        init("key_schedule", KeySchedule(key_values, schedule_length, schedule_buffer))
+        init("fallback_shuffle_key", ''.join(format(v % 16, 'x') for v in key_values))
+        init("shifts", shift_tables(len(matrix)))
+        init("ring", ring)
+        init("ring_index", ring_index(ring))
+        init("allowed", methods.ALLOWED_SET if ring == TRANSFORM_CHARS else methods.allowed_set(ring))
+        init("engine", engine)
+        init("encrypt_table", encrypt_table)
+        init("decrypt_table", decrypt_table)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"CipherContext is immutable; cannot set '{name}'.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"CipherContext is immutable; cannot delete '{name}'.")
+
+    def __reduce__(self):
+        # Rebuilt from its inputs when unpickled (e.g. sent to worker processes)
+        return (CipherContext, (self.matrix, self.secret_key, self.engine, len(self.key_schedule)))
+
+def _shift_digraph(matrix, pos1, pos2, rows, cols):
+    """
+    Apply the modified Playfair rules to a pair of matrix positions
+    
+    Args:
+        matrix: The matrix as a list of rows
+        pos1: (row, col) of the first character
+        pos2: (row, col) of the second character
+        rows: Shifted row indices for the same-row rule (see shift_tables)
+        cols: Shifted column indices for the same-column rule (see shift_tables)
+    
+    Returns:
+        The substituted character pair
+    """
+    i1, j1 = pos1
+    i2, j2 = pos2
+    
+    if i1 == i2:  # Same row rule
+        return matrix[rows[i1]][j1] + matrix[rows[i2]][j2]
+    if j1 == j2:  # Same column rule
+        return matrix[i1][cols[j1]] + matrix[i2][cols[j2]]
+    # Rectangle rule
+    return matrix[i1][j2] + matrix[i2][j1]
+
+def build_digraph_tables(matrix):
+    """
+    Precompute the substitution of every digraph of matrix characters
+    
+    Args:
+        matrix: The matrix as a list of rows
+    
+    Returns:
+        A tuple (encrypt_table, decrypt_table) of digraph -> digraph dictionaries
+    
+    Raises:
+        ValueError: If the tables are not inverses of each other (e.g. the
+                    matrix contains the same character in several cells)
+    """
+    cells = [(char, (i, j)) for i, row in enumerate(matrix) for j, char in enumerate(row)]
+    rows_down, cols_right, rows_up, cols_left = shift_tables(len(matrix))
+    
+    encrypt_table = {}
+    decrypt_table = {}
+    for c1, pos1 in cells:
+        for c2, pos2 in cells:
+            digraph = c1 + c2
+            encrypt_table[digraph] = _shift_digraph(matrix, pos1, pos2, rows_down, cols_right)
+            decrypt_table[digraph] = _shift_digraph(matrix, pos1, pos2, rows_up, cols_left)
+    
+    # Both tables must cover every digraph once and undo each other
+    if len(encrypt_table) != len(cells) ** 2:
+        raise ValueError("The matrix contains duplicate characters; digraph tables cannot be built.")
+    for digraph, encrypted in encrypt_table.items():
+        if decrypt_table[encrypted] != digraph:
+            raise ValueError(f"Digraph tables are not inverses: '{digraph}' -> '{encrypted}' -> '{decrypt_table[encrypted]}'")
+    
+    return encrypt_table, decrypt_table
+
+def compile_key(secret_key, matrix_size=7, special_chars=methods.DEFAULT_SPECIAL_CHARS, engine="lookup",
+                schedule_length=DEFAULT_SCHEDULE_LENGTH, schedule_buffer=None):
+    """
+    Build the matrix for a secret key and compile it into a CipherContext
+    
+    Args:
+        secret_key: The secret key
+        matrix_size: Size of the matrix (e.g., 7 for a 7x7 matrix)
+        special_chars: Special characters to include in the matrix
+        engine: Engine for the digraph substitution stage (see ENGINES)
+        schedule_length: Number of characters the key schedule covers up front
+        schedule_buffer: Optional buffer holding the expanded key schedule (see KeySchedule)
+    
+    Returns:
+        A CipherContext for the key
+    """
+    matrix = methods.PT(secret_key, matrix_size, special_chars)
+    return CipherContext(matrix, secret_key, engine, schedule_length, schedule_buffer)
+
+def resolve_key(key, matrix_size=7, engine="lookup"):
+    """
+    Return a CipherContext for a secret key or an already compiled context
+    
+    Args:
+        key: A secret key or a CipherContext
+        matrix_size: Size of the matrix used when compiling a secret key
+        engine: Engine used when compiling a secret key (see ENGINES)
+    
+    Returns:
+        A CipherContext
+    """
+    if isinstance(key, CipherContext):
+        return key
+    return compile_key(key, matrix_size, engine=engine)
+
+def as_context(matrix, secret_key):
+    """
+    Return a CipherContext for a matrix/key pair
+    
+    Args:
+        matrix: A CipherContext or a matrix as a list of lists
+        secret_key: The secret key used for the additional encryption steps
+    
+    Returns:
+        The given context if it was compiled for secret_key, otherwise a new one
+    """
+    if isinstance(matrix, CipherContext):
+        if matrix.secret_key == secret_key:
+            return matrix
+        return CipherContext(matrix.matrix, secret_key, matrix.engine)
+    return CipherContext(matrix, secret_key)
@@ -0,0 +1,103 @@
+import math
+import time
+
+# Stages reported by encrypt_playfair and decrypt_playfair, in pipeline order.
+# For decryption, "prepare" is the removal of filler characters.
+STAGES = ("prepare", "digraph", "transform", "case", "shuffle")
+
+class _StageTimer:
+    """Measures consecutive stages and reports each one to an instrument callback"""
+
+    def __init__(self, instrument):
+        self.instrument = instrument
+        self.started = time.perf_counter()
+
+    def lap(self, stage, count):
+        """
+        Report the time since the previous lap as one stage
+        
+        Args:
+            stage: The stage name (see STAGES)
+            count: Number of items the stage processed
+        """
+        now = time.perf_counter()
+        self.instrument(stage, now - self.started, count)
+        self.started = now
+
+class _NullTimer:
+    """Stand-in for _StageTimer when instrumentation is disabled"""
+
+    def lap(self, stage, count):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+def stage_timer(instrument):
+    """
+    Return a timer for the stages of one encrypt/decrypt call
+    
+    Args:
+        instrument: A callback instrument(stage, seconds, count), or None
+    
+    Returns:
+        A timer with a lap(stage, count) method (a no-op when instrument is None)
+    """
+    if instrument is None:
+        return _NULL_TIMER
+    return _StageTimer(instrument)
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of a sorted list
+    
+    Args:
+        sorted_values: A non-empty sorted list of numbers
+        p: The percentile (0-100)
+    
+    Returns:
+        The value at the p-th percentile
+    """
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class StageStats:
+    """
+    Instrument that aggregates per-stage timings.
+    
+    Pass an instance as the instrument argument of encrypt_playfair or
+    decrypt_playfair (it can be shared by many calls) and call report() to
+    get the p50/p99 wall time of every stage.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.items = {}
+
+    def __call__(self, stage, seconds, count):
+        self.samples.setdefault(stage, []).append(seconds)
+        self.items[stage] = self.items.get(stage, 0) + count
+
+    def report(self):
+        """
+        Summarize the recorded timings
+        
+        Returns:
+            A dictionary of stage -> {"calls", "items", "total_s", "p50_us", "p99_us"}
+        """
+        summary = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            summary[stage] = {
+                "calls": len(ordered),
+                "items": self.items[stage],
+                "total_s": sum(ordered),
+                "p50_us": percentile(ordered, 50) * 1e6,
+                "p99_us": percentile(ordered, 99) * 1e6,
+            }
+        return summary
+
+    def print_report(self):
+        """Print the summary as a table"""
+        print(f"{'stage':<12}{'calls':>10}{'items':>12}{'p50 us':>10}{'p99 us':>10}")
+        for stage, row in self.report().items():
+            print(f"{stage:<12}{row['calls']:>10}{row['items']:>12}{row['p50_us']:>10.2f}{row['p99_us']:>10.2f}")
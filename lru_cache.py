@@ -0,0 +1,109 @@
+import threading
+
+# Marks a missing entry, so that any value (None included) can be cached
+_MISSING = object()
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache of values built on demand.
+    
+    A miss builds the value outside the lock, so lookups of other keys are
+    not blocked; a build that raises stores nothing. The cache is shared by
+    ShuffleCache (shuffle_cache.py) and MatrixCache (methods.py), which give
+    it their own lookup signatures.
+    
+    Attributes:
+        maxsize: Maximum number of entries kept (0 disables caching)
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that had to build the value
+        evictions: Number of entries dropped to respect maxsize
+    """
+
+    def __init__(self, maxsize):
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Plain dicts keep insertion order: the first entry is the least recently used
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, cache_key, build):
+        """
+        Return the value for a cache key, building it on a miss
+        
+        Args:
+            cache_key: A hashable key
+            build: Called without arguments to build the value on a miss
+        
+        Returns:
+            The cached or newly built value
+        """
+        with self._lock:
+            entry = self._entries.pop(cache_key, _MISSING)
+            if entry is not _MISSING:
+                self.hits += 1
+                self._entries[cache_key] = entry
+                return entry
+            self.misses += 1
+        
+        entry = build()
+        
+        with self._lock:
+            if self.maxsize > 0:
+                self._entries[cache_key] = entry
+                self._evict(self.maxsize)
+        return entry
+
+    def _evict(self, maxsize):
+        """Drop the least recently used entries above maxsize (lock held)"""
+        while len(self._entries) > maxsize:
+            del self._entries[next(iter(self._entries))]
+            self.evictions += 1
+
+    def resize(self, maxsize):
+        """
+        Change the size limit, evicting the least recently used entries if needed
+        
+        Args:
+            maxsize: New maximum number of entries (0 disables caching)
+        """
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative.")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict(maxsize)
+
+    def clear(self):
+        """Drop all entries and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._reset_stats()
+
+    def _reset_stats(self):
+        """Reset the statistics (lock held)"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """
+        Return the cache statistics
+        
+        Returns:
+            A dictionary with hits, misses, evictions, size and maxsize
+        """
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        """Return the statistics dictionary (lock held)"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -2,7 +2,6 @@ import os
 import methods
 import playfair_encrypt
 import playfair_decrypt
-from prettytable import PrettyTable
 
 def clear_screen():
     """Clear the terminal screen"""
@@ -10,6 +9,8 @@ def clear_screen():
 
 def display_matrix_pretty(matrix):
     """Display the Playfair matrix using PrettyTable"""
+    from prettytable import PrettyTable
+    
     table = PrettyTable()
     table.field_names = [f"Col {j+1}" for j in range(len(matrix[0]))]
     
@@ -20,6 +21,8 @@ def display_matrix_pretty(matrix):
 
 def encrypt_mode():
     """Run the encryption mode"""
+    from prettytable import PrettyTable
+    
     clear_screen()
     print("=== Playfair Cipher Encryption for Passwords ===")
     print("Note: This implementation is designed for passwords without spaces.")
@@ -48,7 +51,7 @@ def encrypt_mode():
         secret_key = input("Enter your secret key: ")
         message = input("\nEnter the password to encrypt: ")
     
-    matrix_size = 7  # Fixed for this assignment
+    matrix_size = methods.input_matrix_size()
     
     # Using fixed special characters
     special_chars = methods.DEFAULT_SPECIAL_CHARS
@@ -118,6 +121,8 @@ def encrypt_mode():
 
 def decrypt_mode():
     """Run the decryption mode"""
+    from prettytable import PrettyTable
+    
     clear_screen()
     print("=== Playfair Cipher Decryption for Passwords ===")
     print("Note: This implementation is designed for passwords without spaces.")
@@ -150,7 +155,7 @@ def decrypt_mode():
         encrypted = input("\nEnter the encrypted message: ")
         case_encoded = input("Enter the case information: ")
     
-    matrix_size = 7  # Fixed for this assignment
+    matrix_size = methods.input_matrix_size()
     
     # Using fixed special characters
     special_chars = methods.DEFAULT_SPECIAL_CHARS
@@ -1,4 +1,4 @@
-import string
+import lru_cache
 
 # Fixed set of 13 special characters that will always be used
 DEFAULT_SPECIAL_CHARS = "!@#$%^&*()_-+"
@@ -6,13 +6,98 @@ DEFAULT_SPECIAL_CHARS = "!@#$%^&*()_-+"
 # Define the allowed character set
 ALLOWED_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*()_+-{}"
 
-def validate_input(text, is_key=False):
+# Allowed characters as a set, and a translate table deleting them so that
+# only the invalid characters of a text are left
+ALLOWED_SET = frozenset(ALLOWED_CHARS)
+_DELETE_ALLOWED = str.maketrans('', '', ALLOWED_CHARS)
+
+# Size of the standard matrix (26 letters + 10 digits + 13 special characters)
+STANDARD_MATRIX_SIZE = 7
+
+# Characters filling the cells of matrices larger than 7x7, in order: the rest
+# of printable ASCII (an 8x8 matrix stays ASCII), then Latin-1 capital letters
+# and Latin-1 symbols. Letters are stored in uppercase like A-Z; symbols whose
+# uppercase is a different character (such as the micro sign) are left out.
+EXTENDED_CHARS = ("{}[]<>|\\/:;,.?~`'\"="
+                  "ÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖØÙÚÛÜÝÞ"
+                  "¡¢£¤¥¦§¨©ª«¬®¯°±²³´¶·¸¹º»¼½¾¿×÷")
+
+# Largest supported matrix: 36 letters and digits plus EXTENDED_CHARS fill a
+# 10x10 matrix without repeated characters even without special characters
+MAX_MATRIX_SIZE = 10
+
+def check_matrix_size(matrix_size):
+    """
+    Validate a matrix size
+    
+    Args:
+        matrix_size: Number of rows (and columns) of the matrix
+    
+    Raises:
+        ValueError: If the size is not supported
+    """
+    if not 1 <= matrix_size <= MAX_MATRIX_SIZE:
+        raise ValueError(f"Matrix size must be between 1 and {MAX_MATRIX_SIZE}, got {matrix_size}.")
+
+def charset(matrix_size=STANDARD_MATRIX_SIZE):
+    """
+    Return the characters a matrix of the given size can encrypt
+    
+    Matrices up to 7x7 use ALLOWED_CHARS; larger ones add the extended
+    characters of their extra cells (with the default special characters).
+    
+    Args:
+        matrix_size: Number of rows (and columns) of the matrix
+    
+    Returns:
+        str: ALLOWED_CHARS followed by the extended characters of the matrix
+    """
+    extra = max(0, matrix_size * matrix_size - STANDARD_MATRIX_SIZE * STANDARD_MATRIX_SIZE)
+    return ALLOWED_CHARS + EXTENDED_CHARS[:extra]
+
+def allowed_set(chars):
+    """
+    Return the set of characters accepted in texts for a character set
+    
+    Args:
+        chars (str): Characters of the matrix or transform ring
+    
+    Returns:
+        frozenset: The characters and their lowercase forms
+    """
+    return frozenset(chars + chars.lower())
+
+def invalid_chars(text, allowed=ALLOWED_SET):
+    """
+    Return the characters of a text that are not allowed
+    
+    The check runs as a single C-level pass over the text; valid texts (the
+    common case) do not build any intermediate string.
+    
+    Args:
+        text (str): The text to check
+        allowed (frozenset): The allowed characters (default: ALLOWED_SET)
+    
+    Returns:
+        str: The invalid characters in the order they appear (empty if valid)
+    """
+    if allowed.issuperset(text):
+        return ''
+    if allowed is ALLOWED_SET:
+        return text.translate(_DELETE_ALLOWED)
+    return ''.join(c for c in text if c not in allowed)
+
+def validate_input(text, is_key=False, matrix_size=STANDARD_MATRIX_SIZE):
     """
     Validate that the input contains only allowed characters.
     
+    Keys are always limited to ALLOWED_CHARS; plaintext may also use the
+    extended characters of matrices larger than 7x7.
+    
     Args:
         text (str): The input text to validate
         is_key (bool): Whether this is a key validation (True) or plaintext validation (False)
+        matrix_size (int): Size of the matrix the plaintext is encrypted with
     
     Returns:
         tuple: (is_valid, error_message) - is_valid is True if valid, False otherwise
@@ -21,18 +106,19 @@ def validate_input(text, is_key=False):
     if not text:
         return False, "Input cannot be empty."
     
-    invalid_chars = []
-    for char in text:
-        if char not in ALLOWED_CHARS and char != ' ':  # Spaces handled separately
-            invalid_chars.append(char)
+    extended = not is_key and matrix_size > STANDARD_MATRIX_SIZE
+    allowed = allowed_set(charset(matrix_size)) if extended else ALLOWED_SET
+    invalid = invalid_chars(text, allowed).replace(' ', '')  # Spaces handled separately
     
-    if invalid_chars:
-        unique_invalid = set(invalid_chars)
+    if invalid:
+        unique_invalid = set(invalid)
         error_msg = f"Invalid character{'s' if len(unique_invalid) > 1 else ''} found: {', '.join(repr(c) for c in unique_invalid)}.\n"
         error_msg += f"Only the following characters are allowed:\n"
         error_msg += f"- Letters (A-Z, a-z)\n"
         error_msg += f"- Numbers (0-9)\n"
         error_msg += f"- Special characters: !@#$%^&*()_+-{{}}"
+        if extended:
+            error_msg += f"\n- Extended characters of the {matrix_size}x{matrix_size} matrix: {charset(matrix_size)[len(ALLOWED_CHARS):]}"
         return False, error_msg
     
     if ' ' in text:
@@ -53,7 +139,7 @@ def main():
         print(f"Error: {error_msg}")
         print("Please try again.")
     
-    matrix_size = 7  # Fixed for this assignment
+    matrix_size = input_matrix_size()
     
     # Special characters are fixed and cannot be changed
     special_chars = DEFAULT_SPECIAL_CHARS
@@ -65,6 +151,16 @@ def main():
     print_matrix(matrix)
     return matrix
 
+def input_matrix_size():
+    """Ask the user for a matrix size (7 by default)"""
+    while True:
+        answer = input(f"Matrix size ({STANDARD_MATRIX_SIZE}-{MAX_MATRIX_SIZE}, default {STANDARD_MATRIX_SIZE}): ").strip()
+        if not answer:
+            return STANDARD_MATRIX_SIZE
+        if answer.isdigit() and STANDARD_MATRIX_SIZE <= int(answer) <= MAX_MATRIX_SIZE:
+            return int(answer)
+        print(f"Error: Enter a number between {STANDARD_MATRIX_SIZE} and {MAX_MATRIX_SIZE}.")
+
 def sanitize_key(key):
     """
     Sanitize the key by converting to uppercase and removing spaces.
@@ -77,9 +173,9 @@ def sanitize_key(key):
     
     return ''.join(c.upper() for c in key if c.isalnum() or c in DEFAULT_SPECIAL_CHARS)
 
-def PT(key, matrix_size, special_chars=DEFAULT_SPECIAL_CHARS):
+def build_matrix(key, matrix_size, special_chars=DEFAULT_SPECIAL_CHARS):
     """
-    Implement the Plain Traditional matrix construction method
+    Build a matrix with the Plain Traditional method, without caching
     
     Args:
         key: The secret key
@@ -89,47 +185,44 @@ def PT(key, matrix_size, special_chars=DEFAULT_SPECIAL_CHARS):
     Returns:
         A square matrix filled according to the Plain Traditional method
     """
+    check_matrix_size(matrix_size)
+    
     # Process the key
     key = sanitize_key(key)
     
     # Create the standard character set (26 letters + 10 digits + special chars)
-    alphabet = string.ascii_uppercase
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
     digits = "0123456789"
     
     # Ensure we don't exceed 13 special characters
     if len(special_chars) > 13:
         special_chars = special_chars[:13]
     
-    # Remove duplicate characters from the key
-    key_chars = []
-    for char in key:
-        if char not in key_chars:
-            key_chars.append(char)
-    
     # Create the matrix fill order with priority:
-    # 1. Key characters first
+    # 1. Key characters first (without duplicates)
     # 2. Remaining alphabets
     # 3. All 10 digits (ensuring all digits are included)
     # 4. Special characters (up to 13)
-    fill_order = key_chars.copy()
-    
-    # Add remaining letters
-    for c in alphabet:
-        if c not in fill_order:
-            fill_order.append(c)
-    
-    # Add all digits (ensure digits 0-9 are included)
-    for c in digits:
-        if c not in fill_order:
+    # The set mirrors fill_order for constant-time membership checks
+    fill_order = []
+    used = set()
+    for c in key + alphabet + digits:
+        if c not in used:
+            used.add(c)
             fill_order.append(c)
     
     # Add special characters (up to 13 total)
     special_count = 0
     for c in special_chars:
-        if c not in fill_order and special_count < 13:
+        if c not in used and special_count < 13:
+            used.add(c)
             fill_order.append(c)
             special_count += 1
     
+    # Larger matrices continue with the extended characters
+    if matrix_size > STANDARD_MATRIX_SIZE:
+        fill_order.extend(c for c in EXTENDED_CHARS if c not in used)
+    
     # Create the matrix
     matrix = []
     for i in range(matrix_size):
@@ -145,6 +238,106 @@ def PT(key, matrix_size, special_chars=DEFAULT_SPECIAL_CHARS):
     
     return matrix
 
+# Default number of (key, matrix_size, special_chars) matrices kept by the shared cache
+MATRIX_CACHE_SIZE = 512
+
+class MatrixCache(lru_cache.LRUCache):
+    """
+    Thread-safe bounded LRU cache of matrices built by build_matrix.
+    
+    Entries are keyed by the sanitized key, so keys differing only in case or
+    spaces share an entry. Matrices are stored as tuples of tuples; every
+    lookup returns a new list of lists, so callers can modify their copy
+    without affecting the cache. Invalid keys are not cached: their
+    ValueError is raised on every call.
+    
+    Attributes:
+        maxsize: Maximum number of matrices kept (0 disables caching)
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that had to build the matrix
+        evictions: Number of entries dropped to respect maxsize
+        invalidations: Number of entries dropped by invalidate()
+    """
+
+    def __init__(self, maxsize=MATRIX_CACHE_SIZE):
+        super().__init__(maxsize)
+        self.invalidations = 0
+
+    def get(self, key, matrix_size, special_chars=DEFAULT_SPECIAL_CHARS):
+        """
+        Return the matrix for a key, building it on a miss
+        
+        Args:
+            key: The secret key
+            matrix_size: Size of the matrix
+            special_chars: Special characters to include in the matrix
+        
+        Returns:
+            A new list of lists holding the matrix
+        
+        Raises:
+            ValueError: If the key or matrix size is invalid
+        """
+        key = sanitize_key(key)
+        entry = self.lookup((key, matrix_size, special_chars),
+                            lambda: tuple(map(tuple, build_matrix(key, matrix_size, special_chars))))
+        return [list(row) for row in entry]
+
+    def invalidate(self, key=None):
+        """
+        Drop the cached matrices of a key, or every matrix
+        
+        Args:
+            key: The secret key whose matrices are dropped (None: all of them)
+        
+        Returns:
+            The number of entries dropped
+        
+        Raises:
+            ValueError: If the key is invalid
+        """
+        if key is not None:
+            key = sanitize_key(key)
+        with self._lock:
+            if key is None:
+                dropped = list(self._entries)
+            else:
+                dropped = [cache_key for cache_key in self._entries if cache_key[0] == key]
+            for cache_key in dropped:
+                del self._entries[cache_key]
+            self.invalidations += len(dropped)
+            return len(dropped)
+
+    def _reset_stats(self):
+        """Reset the statistics (lock held)"""
+        super()._reset_stats()
+        self.invalidations = 0
+
+    def _stats(self):
+        """Return the statistics dictionary, with invalidations (lock held)"""
+        stats = super()._stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+# Cache shared by every PT call
+matrix_cache = MatrixCache()
+
+def PT(key, matrix_size, special_chars=DEFAULT_SPECIAL_CHARS):
+    """
+    Implement the Plain Traditional matrix construction method
+    
+    Matrices are memoized in matrix_cache; the result is a fresh copy.
+    
+    Args:
+        key: The secret key
+        matrix_size: Size of the matrix (e.g., 7 for a 7x7 matrix)
+        special_chars: Special characters to include in the matrix
+    
+    Returns:
+        A square matrix filled according to the Plain Traditional method
+    """
+    return matrix_cache.get(key, matrix_size, special_chars)
+
 def print_matrix(matrix):
     """Print the matrix in a readable format"""
     print("Matrix:")
@@ -0,0 +1,218 @@
+"""
+Multiprocess encryption and decryption for large batches of passwords.
+
+Input records are split into chunks that run on a ProcessPoolExecutor. Each
+worker compiles the key once in its initializer; results are yielded in input
+order, and at most max_in_flight chunks are submitted at any time so memory
+use stays flat regardless of the input size.
+
+The expanded key schedule is written once to a shared memory block that every
+worker's compiled key reads in place, instead of each worker expanding its own.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from multiprocessing import shared_memory
+
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+
+# Number of records sent to a worker at a time
+DEFAULT_CHUNK_SIZE = 1000
+
+# Errors caused by a bad record; they are returned in place of the result
+# instead of stopping the whole run
+RECORD_ERRORS = (ValueError, KeyError)
+
+# Per-worker compiled key and the shared memory block holding its key
+# schedule, set by _init_worker
+_worker_ctx = None
+_worker_schedule = None
+
+def _init_worker(secret_key, matrix_size, engine, schedule_name=None, schedule_length=0):
+    """
+    Compile the key once in each worker process
+    
+    Args:
+        secret_key: The secret key
+        matrix_size: Size of the matrix
+        engine: Engine for the digraph substitution stage
+        schedule_name: Name of the shared memory block holding the key
+                       schedule, or None to expand it in the worker
+        schedule_length: Number of key schedule bytes in the block
+    """
+    global _worker_ctx, _worker_schedule
+    buffer = None
+    if schedule_name is not None:
+        # Kept open for the lifetime of the worker: the key schedule is a view on it
+        _worker_schedule = shared_memory.SharedMemory(name=schedule_name)
+        buffer = _worker_schedule.buf[:schedule_length]
+    _worker_ctx = cipher_context.compile_key(secret_key, matrix_size, engine=engine, schedule_buffer=buffer)
+
+def _share_schedule(ctx):
+    """
+    Copy the key schedule of a compiled key to a new shared memory block
+    
+    Args:
+        ctx: A CipherContext
+    
+    Returns:
+        A tuple (block, schedule_length); block is None for a key without key
+        values
+    """
+    schedule = ctx.key_schedule.expand(0)
+    if not schedule:
+        return None, 0
+    block = shared_memory.SharedMemory(create=True, size=len(schedule))
+    block.buf[:len(schedule)] = schedule
+    return block, len(schedule)
+
+def _apply_chunk(func, chunk):
+    """
+    Apply func to every record of a chunk with the worker's compiled key
+    
+    Args:
+        func: A function taking (ctx, record)
+        chunk: A list of records
+    
+    Returns:
+        A list with the result, or the error raised, for each record
+    """
+    results = []
+    for record in chunk:
+        try:
+            results.append(func(_worker_ctx, record))
+        except RECORD_ERRORS as e:
+            results.append(e)
+    return results
+
+def encrypt_record(ctx, password, format_version=1):
+    """
+    Encrypt a single password with a compiled key (see encrypt_playfair for format_version)
+    
+    An empty password (such as a blank input line) is an invalid record: its
+    empty ciphertext would not decrypt back to a record of its own.
+    
+    Raises:
+        ValueError: If the password is empty, or as encrypt_playfair does
+    """
+    if not password:
+        raise ValueError("Empty password: there is nothing to encrypt.")
+    return playfair_encrypt.encrypt_playfair(password, ctx, ctx.secret_key, format_version=format_version)
+
+def decrypt_record(ctx, record):
+    """Decrypt a single (encrypted, case_information[, filler_information]) record with a compiled key"""
+    encrypted, case_encoded, filler_info = playfair_decrypt.split_record(record)
+    return playfair_decrypt.decrypt_playfair(encrypted, case_encoded, ctx, ctx.secret_key, filler_info=filler_info)
+
+def _chunks(items, chunk_size):
+    """Lazily split an iterable into lists of at most chunk_size items"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def map_parallel(func, items, secret_key, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_in_flight=None, matrix_size=7, engine="table",
+                 schedule_length=cipher_context.DEFAULT_SCHEDULE_LENGTH):
+    """
+    Apply func to every record in a process pool, yielding results in input order
+    
+    Records that raise one of RECORD_ERRORS do not stop the run; the error is
+    yielded in place of their result.
+    
+    Args:
+        func: A picklable (module-level) function taking (ctx, record)
+        items: An iterable of records (consumed lazily)
+        secret_key: The secret key
+        workers: Number of worker processes (default: os.cpu_count())
+        chunk_size: Number of records per chunk
+        max_in_flight: Maximum number of chunks submitted at once (default: 2 * workers)
+        matrix_size: Size of the matrix
+        engine: Engine for the digraph substitution stage (see cipher_context.ENGINES)
+        schedule_length: Number of characters the shared key schedule covers
+                         (workers grow their own copy for longer records)
+    
+    Yields:
+        One result (or error) per record, in input order
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    
+    # Fail in this process on an invalid key rather than in every worker
+    ctx = cipher_context.compile_key(secret_key, matrix_size, engine=engine, schedule_length=schedule_length)
+    block, length = _share_schedule(ctx)
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(secret_key, matrix_size, engine,
+                                           block and block.name, length)) as executor:
+            pending = deque()
+            for chunk in _chunks(items, chunk_size):
+                pending.append(executor.submit(_apply_chunk, func, chunk))
+                # Wait for the oldest chunk before reading more input
+                if len(pending) >= max_in_flight:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
+
+def encrypt_parallel(passwords, secret_key, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     max_in_flight=None, matrix_size=7, engine="table", format_version=1):
+    """
+    Encrypt passwords on multiple processes.
+    
+    Invalid passwords, empty ones included, do not stop the run; their error
+    is yielded in place of the result.
+    
+    Args:
+        passwords: An iterable of passwords (consumed lazily)
+        secret_key: The secret key
+        workers: Number of worker processes (default: os.cpu_count())
+        chunk_size: Number of passwords per chunk
+        max_in_flight: Maximum number of chunks submitted at once (default: 2 * workers)
+        matrix_size: Size of the matrix
+        engine: Engine for the digraph substitution stage (see cipher_context.ENGINES)
+        format_version: 2 to add the filler information to every result
+    
+    Yields:
+        (encrypted_message, case_information), followed by filler_information
+        for format version 2, or an error, in input order
+    """
+    func = encrypt_record if format_version == 1 else partial(encrypt_record, format_version=format_version)
+    return map_parallel(func, passwords, secret_key, workers, chunk_size,
+                        max_in_flight, matrix_size, engine)
+
+def decrypt_parallel(records, secret_key, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     max_in_flight=None, matrix_size=7, engine="table"):
+    """
+    Decrypt (encrypted, case_information) records on multiple processes.
+    
+    Invalid records do not stop the run; their error is yielded in place
+    of the result.
+    
+    Args:
+        records: An iterable of (encrypted_message, case_information) pairs, or
+                 format version 2 triples (consumed lazily)
+        secret_key: The secret key
+        workers: Number of worker processes (default: os.cpu_count())
+        chunk_size: Number of records per chunk
+        max_in_flight: Maximum number of chunks submitted at once (default: 2 * workers)
+        matrix_size: Size of the matrix
+        engine: Engine for the digraph substitution stage (see cipher_context.ENGINES)
+    
+    Yields:
+        The decrypted message or an error, in input order
+    """
+    return map_parallel(decrypt_record, records, secret_key, workers, chunk_size,
+                        max_in_flight, matrix_size, engine)
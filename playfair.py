@@ -0,0 +1,294 @@
+"""
+Non-interactive command line interface for the Playfair password cipher.
+
+Examples:
+    python -m playfair encrypt --key-file key.txt --in passwords.txt --out cipher.tsv
+    python -m playfair decrypt --key-file key.txt --in cipher.tsv --out passwords.txt
+    cat passwords.txt | python -m playfair encrypt --key SECRET --format jsonl
+    python -m playfair encrypt --key-file key.txt --in export.dat --out cipher.dat --format fixed
+    python -m playfair encrypt --key-file key.txt --in passwords.txt --out cipher.tsv --profile run
+
+Input is read and written one record per line, so files of any size are
+processed in constant memory. With --format fixed, the input and output are
+fixed-width record files processed through memory maps (see bulk_file). The
+command never prompts.
+"""
+import argparse
+import json
+import sys
+from functools import partial
+
+import bulk_file
+import cipher_context
+import methods
+import parallel
+import playfair_encrypt
+import profiling
+
+FORMATS = ("tsv", "jsonl", "fixed")
+
+def read_key(args):
+    """
+    Get the secret key from the command line arguments
+    
+    Args:
+        args: Parsed arguments with key and key_file attributes
+    
+    Returns:
+        The secret key
+    """
+    if args.key is not None:
+        return args.key
+    with open(args.key_file, 'r') as f:
+        return f.readline().strip()
+
+def open_input(path):
+    """Open an input path for reading ('-' is stdin)"""
+    if path == '-':
+        return sys.stdin
+    return open(path, 'r')
+
+def open_output(path):
+    """Open an output path for writing ('-' is stdout)"""
+    if path == '-':
+        return sys.stdout
+    return open(path, 'w')
+
+def iter_lines(stream):
+    """
+    Lazily yield the lines of a stream without their line endings
+    
+    Args:
+        stream: A text stream
+    
+    Yields:
+        Each line with trailing newline characters removed
+    """
+    for line in stream:
+        yield line.rstrip('\r\n')
+
+def parse_encrypted(line, fmt):
+    """
+    Parse an encrypted record written by the encrypt command
+    
+    Args:
+        line: The record without its line ending
+        fmt: The record format ("tsv" or "jsonl")
+    
+    Returns:
+        A tuple (encrypted_message, case_information), followed by
+        filler_information for a format version 2 record (a third tsv column
+        or a "fillers" field)
+    """
+    if fmt == "jsonl":
+        record = json.loads(line)
+        if "fillers" in record:
+            return record["encrypted"], record["case"], record["fillers"]
+        return record["encrypted"], record["case"]
+    encrypted, _, rest = line.partition('\t')
+    case_encoded, separator, filler_info = rest.partition('\t')
+    if separator:
+        return encrypted, case_encoded, filler_info
+    return encrypted, case_encoded
+
+def format_encrypted(encrypted, case_encoded, fmt, filler_info=None):
+    """Format an encrypted record (with the filler information of format version 2) as a line of output"""
+    if fmt == "jsonl":
+        record = {"encrypted": encrypted, "case": case_encoded}
+        if filler_info is not None:
+            record["fillers"] = filler_info
+        return json.dumps(record) + '\n'
+    if filler_info is not None:
+        return f"{encrypted}\t{case_encoded}\t{filler_info}\n"
+    return f"{encrypted}\t{case_encoded}\n"
+
+def format_decrypted(decrypted, fmt):
+    """Format a decrypted record as a line of output"""
+    if fmt == "jsonl":
+        return json.dumps({"decrypted": decrypted}) + '\n'
+    return f"{decrypted}\n"
+
+def decrypt_line(ctx, line, fmt):
+    """Parse and decrypt one encrypted record with a compiled key"""
+    return parallel.decrypt_record(ctx, parse_encrypted(line, fmt))
+
+def apply_records(func, lines, ctx):
+    """
+    Lazily apply func to one record per line
+    
+    Args:
+        func: A function taking (ctx, line)
+        lines: An iterable of records
+        ctx: The CipherContext to use
+    
+    Yields:
+        (line_number, result) where result is the output of func or the
+        error raised for an invalid record
+    """
+    for line_number, line in enumerate(lines, 1):
+        try:
+            yield line_number, func(ctx, line)
+        except parallel.RECORD_ERRORS as e:
+            yield line_number, e
+
+def run_fixed(args, ctx):
+    """
+    Run the encrypt or decrypt command on fixed-width record files
+    
+    Args:
+        args: Parsed command line arguments
+        ctx: The CipherContext to use
+    
+    Returns:
+        The process exit status
+    """
+    if args.input == '-' or args.output == '-':
+        print("Error: --format fixed needs --in and --out files.", file=sys.stderr)
+        return 2
+    
+    process = bulk_file.encrypt_file if args.command == "encrypt" else bulk_file.decrypt_file
+    try:
+        _, errors = process(args.input, args.output, ctx, mmap_output=not args.no_mmap_output,
+                            engine=args.engine, skip_invalid=args.skip_invalid)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    for line_number, error in errors:
+        print(f"Error on line {line_number}: {error}", file=sys.stderr)
+    return 0
+
+def run(args):
+    """
+    Run the encrypt or decrypt command
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        The process exit status
+    """
+    try:
+        secret_key = read_key(args)
+        ctx = cipher_context.compile_key(secret_key, args.matrix_size, engine=args.engine)
+        if args.format == "fixed":
+            if args.command == "encrypt" and args.format_version != 1:
+                raise ValueError("--format fixed only writes format version 1 records.")
+            return run_fixed(args, ctx)
+        source = open_input(args.input)
+        target = open_output(args.output)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    
+    try:
+        lines = iter_lines(source)
+        if args.command == "encrypt":
+            func = partial(parallel.encrypt_record, format_version=args.format_version)
+        else:
+            func = partial(decrypt_line, fmt=args.format)
+        
+        if args.workers == 1:
+            records = apply_records(func, lines, ctx)
+        else:
+            results = parallel.map_parallel(func, lines, secret_key, workers=args.workers or None,
+                                            chunk_size=args.chunk_size, matrix_size=args.matrix_size,
+                                            engine=args.engine)
+            records = enumerate(results, 1)
+        
+        for line_number, result in records:
+            if isinstance(result, Exception):
+                print(f"Error on line {line_number}: {result}", file=sys.stderr)
+                if not args.skip_invalid:
+                    return 1
+                continue
+            
+            if args.command == "encrypt":
+                target.write(format_encrypted(result[0], result[1], args.format, *result[2:]))
+            else:
+                target.write(format_decrypted(result, args.format))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+        else:
+            target.flush()
+    
+    return 0
+
+def at_least(minimum):
+    """
+    Build an argparse type for integers of at least minimum
+    
+    Args:
+        minimum: The smallest accepted value
+    
+    Returns:
+        A function converting an argument string to an int
+    """
+    def convert(text):
+        value = int(text)
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+        return value
+    
+    convert.__name__ = "integer"
+    return convert
+
+def build_parser():
+    """Build the argument parser for the command line interface"""
+    parser = argparse.ArgumentParser(
+        prog="python -m playfair",
+        description="Encrypt or decrypt passwords with the Playfair cipher, one record per line.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    for command, help_text in (("encrypt", "encrypt one password per line"),
+                               ("decrypt", "decrypt one encrypted record per line")):
+        sub = subparsers.add_parser(command, help=help_text)
+        key_group = sub.add_mutually_exclusive_group(required=True)
+        key_group.add_argument("--key", help="the secret key")
+        key_group.add_argument("--key-file", help="file whose first line is the secret key")
+        sub.add_argument("--in", dest="input", default="-", help="input file (default: stdin)")
+        sub.add_argument("--out", dest="output", default="-", help="output file (default: stdout)")
+        sub.add_argument("--format", choices=FORMATS, default="tsv",
+                         help="encrypted record format (default: tsv); fixed: fixed-width record files")
+        if command == "encrypt":
+            sub.add_argument("--format-version", type=int, choices=playfair_encrypt.FORMAT_VERSIONS, default=1,
+                             help="encrypted record version (default: 1); 2 adds the filler positions "
+                                  "(third tsv column or \"fillers\" field) so that decryption is exact")
+        sub.add_argument("--matrix-size", type=int, default=7,
+                         choices=range(methods.STANDARD_MATRIX_SIZE, methods.MAX_MATRIX_SIZE + 1),
+                         help=f"size of the Playfair matrix, {methods.STANDARD_MATRIX_SIZE} to {methods.MAX_MATRIX_SIZE} "
+                              "(default: 7); larger matrices also accept {}[]<>|... and Latin-1 letters")
+        sub.add_argument("--engine", choices=cipher_context.ENGINES, default="table",
+                         help="digraph substitution engine (default: table)")
+        sub.add_argument("--skip-invalid", action="store_true",
+                         help="report invalid records on stderr and continue instead of stopping")
+        sub.add_argument("--workers", type=at_least(0), default=1,
+                         help="number of worker processes (0: one per CPU, default: 1)")
+        sub.add_argument("--chunk-size", type=at_least(1), default=parallel.DEFAULT_CHUNK_SIZE,
+                         help=f"records per worker chunk (default: {parallel.DEFAULT_CHUNK_SIZE})")
+        sub.add_argument("--no-mmap-output", action="store_true",
+                         help="with --format fixed, write the output sequentially instead of mapping it")
+        sub.add_argument("--profile", metavar="PATH",
+                         help="profile the run and write PATH.pstats and PATH.collapsed (flamegraph input); "
+                              "only this process is profiled, not --workers processes")
+        sub.add_argument("--profile-top", type=int, default=profiling.DEFAULT_TOP, metavar="N",
+                         help=f"number of functions in the profile summary on stderr (default: {profiling.DEFAULT_TOP})")
+    
+    return parser
+
+def main(argv=None):
+    """Main function for the command line interface"""
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        return profiling.run_profiled(run, args, path=args.profile, top=args.profile_top)
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,24 @@
+
 import methods
-from prettytable import PrettyTable
+import cipher_context
+import shuffle_cache
+import instrumentation
+import case_codec
 
 def find_position(matrix, char):
     """
     Finds the position of a character in the matrix
     
     Args:
-        matrix: The decryption matrix
+        matrix: The decryption matrix or a CipherContext
         char: The character to find
     
     Returns:
         Tuple (row, col) or None if not found
     """
+    if isinstance(matrix, cipher_context.CipherContext):
+        return matrix.positions.get(char)
+    
     for i in range(len(matrix)):
         for j in range(len(matrix[i])):
             if matrix[i][j] == char:
@@ -25,7 +32,7 @@ def decrypt_digraph(e1, e2, matrix):
     Args:
         e1: First encrypted character
         e2: Second encrypted character
-        matrix: The decryption matrix
+        matrix: The decryption matrix or a CipherContext
     
     Returns:
         The decrypted character pair
@@ -34,26 +41,31 @@ def decrypt_digraph(e1, e2, matrix):
     pos1 = find_position(matrix, e1)
     pos2 = find_position(matrix, e2)
     
+    if isinstance(matrix, cipher_context.CipherContext):
+        _, _, rows_up, cols_left = matrix.shifts
+        matrix = matrix.matrix
+    else:
+        _, _, rows_up, cols_left = cipher_context.shift_tables(len(matrix))
+    
     # If either character is not in the matrix, return a placeholder
     if pos1 is None or pos2 is None:
         return "??"
     
     i1, j1 = pos1
     i2, j2 = pos2
-    matrix_size = len(matrix)
     
     # Apply the appropriate decryption rule based on character positions
     if i1 == i2:  # Same row rule - shift 2 steps up
-        # Move two positions up (with wrapping)
+        # Move two positions up (with wrapping, precomputed per matrix size)
         decrypted_pair = (
-            matrix[(i1 - 2) % matrix_size][j1] + 
-            matrix[(i2 - 2) % matrix_size][j2]
+            matrix[rows_up[i1]][j1] + 
+            matrix[rows_up[i2]][j2]
         )
     elif j1 == j2:  # Same column rule - shift 3 steps left
-        # Move three positions left (with wrapping)
+        # Move three positions left (with wrapping, precomputed per matrix size)
         decrypted_pair = (
-            matrix[i1][(j1 - 3) % matrix_size] + 
-            matrix[i2][(j2 - 3) % matrix_size]
+            matrix[i1][cols_left[j1]] + 
+            matrix[i2][cols_left[j2]]
         )
     else:  # Rectangle rule
         # For rectangle rule, we swap columns (same for encryption and decryption)
@@ -74,50 +86,42 @@ def generate_key_values(secret_key):
     Returns:
         List of integers derived from the key
     """
-    # Convert each character to its ASCII value
-    key_values = [ord(c) for c in secret_key]
-    
-    # Extend the key values to make it more complex
-    extended_values = []
-    sum_so_far = 0
-    
-    for i, val in enumerate(key_values):
-        sum_so_far = (sum_so_far + val) % 256
-        product = (val * (i + 1)) % 256
-        extended_values.append(sum_so_far)
-        extended_values.append(product)
-    
-    return extended_values
+    return cipher_context.generate_key_values(secret_key)
 
-def reverse_ascii_transform(text, secret_key):
+def reverse_ascii_transform(text, secret_key, key_values=None, ring=None):
     """
     Reverse the ASCII-based transformation using the secret key
     
     Args:
         text: The transformed text
         secret_key: The secret key used for the transformation
+        key_values: Precomputed key values for secret_key, or a key schedule
+                    (see cipher_context.KeySchedule) (optional)
+        ring: Characters of the transform ring (default: cipher_context.TRANSFORM_CHARS)
     
     Returns:
         Original text
     """
-    # Define allowed characters
-    valid_chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*()_+-{}"
-    valid_chars_list = list(valid_chars)
+    # Allowed characters and their indices
+    valid_chars = ring or cipher_context.TRANSFORM_CHARS
+    valid_index = cipher_context.ring_index(valid_chars)
     
     # Generate a sequence of numbers from the secret key
-    key_values = generate_key_values(secret_key)
+    if key_values is None:
+        key_values = generate_key_values(secret_key)
+    
+    # Expand the key values to one per character (cycling through them)
+    if len(key_values) < len(text):
+        key_values = cipher_context.expand_key_values(key_values, len(text))
     
     # Apply the reverse transformation
     result = []
-    for i, char in enumerate(text):
-        # Get the key value for this position (cycling through key values)
-        key_val = key_values[i % len(key_values)]
-        
+    for char, key_val in zip(text, key_values):
         # Reverse transform character within valid character set
-        if char in valid_chars_list:
-            original_index = valid_chars_list.index(char)
-            new_index = (original_index - key_val) % len(valid_chars_list)
-            new_char = valid_chars_list[new_index]
+        original_index = valid_index.get(char)
+        if original_index is not None:
+            new_index = (original_index - key_val) % len(valid_chars)
+            new_char = valid_chars[new_index]
             result.append(new_char)
         else:
             # If the character isn't in our valid set, keep it as is (shouldn't happen)
@@ -136,32 +140,7 @@ def generate_shuffle_indices(shuffle_key, length):
     Returns:
         A list of indices for shuffling
     """
-    # Convert the shuffle key to a list of integers
-    if len(shuffle_key) == 0:
-        return list(range(length))
-        
-    # Convert shuffle key chars to values
-    key_values = []
-    for c in shuffle_key:
-        # Convert to a value between 0-15
-        if c.isdigit():
-            key_values.append(int(c))
-        elif 'A' <= c <= 'F' or 'a' <= c <= 'f':
-            key_values.append(10 + ord(c.upper()) - ord('A'))
-        else:
-            key_values.append(ord(c) % 16)
-    
-    # Generate indices
-    indices = list(range(length))
-    
-    # Shuffle the indices using Fisher-Yates algorithm with the key values
-    for i in range(length - 1, 0, -1):
-        # Use key_values to determine the swap index
-        j = key_values[i % len(key_values)] % (i + 1)
-        # Swap indices[i] and indices[j]
-        indices[i], indices[j] = indices[j], indices[i]
-    
-    return indices
+    return shuffle_cache.generate_shuffle_indices(shuffle_key, length)
 
 def unshuffle_text(text, shuffle_key, show_visualization=False):
     """
@@ -177,23 +156,21 @@ def unshuffle_text(text, shuffle_key, show_visualization=False):
     """
     if not text:
         return ""
-        
-    # Generate shuffling indices
-    indices = generate_shuffle_indices(shuffle_key, len(text))
     
-    # Create a mapping from new positions to original positions
-    position_map = {}
-    for new_pos, old_pos in enumerate(indices):
-        position_map[new_pos] = old_pos
+    # Shuffling indices and their inverse come from the shared permutation cache
+    indices, inverse = shuffle_cache.get_permutations(shuffle_key, len(text))
     
-    # Apply the unshuffling
-    unshuffled = [''] * len(text)
-    for new_pos, char in enumerate(text):
-        old_pos = position_map[new_pos]
-        unshuffled[old_pos] = char
+    # Apply the unshuffling: unshuffled[old_pos] = text[inverse[old_pos]]
+    unshuffled = [text[new_pos] for new_pos in inverse]
+    
+    # Mapping from new positions to original positions
+    position_map = indices
     
     # Show visualization if requested
     if show_visualization:
+        # PrettyTable is only needed for visualization, so it is imported on demand
+        from prettytable import PrettyTable
+        
         # First, show how the key is used to generate indices
         key_table = PrettyTable()
         key_table.field_names = ["Shuffle Key", "To Key Values"]
@@ -301,7 +278,252 @@ def unshuffle_text(text, shuffle_key, show_visualization=False):
     
     return ''.join(unshuffled)
 
-def decrypt_playfair(encrypted, case_encoded, matrix, secret_key, show_visualization=False):
+def validate_encrypted(encrypted, ctx=None):
+    """
+    Check that an encrypted message only contains allowed characters
+    
+    Args:
+        encrypted: The encrypted message
+        ctx: The CipherContext the message was encrypted with (optional; its
+             character set replaces ALLOWED_CHARS for matrices larger than 7x7)
+    
+    Raises:
+        ValueError: For the first invalid character
+    """
+    allowed = methods.ALLOWED_SET if ctx is None else ctx.allowed
+    invalid = methods.invalid_chars(encrypted, allowed)
+    if invalid and allowed is not methods.ALLOWED_SET:
+        raise ValueError(f"Invalid character '{invalid[0]}' in encrypted text. It is not in the character set of the {ctx.matrix_size}x{ctx.matrix_size} matrix.")
+    if invalid:
+        raise ValueError(f"Invalid character '{invalid[0]}' in encrypted text. Only letters, numbers, and these special characters are allowed: !@#$%^&*()_+-{{}}")
+
+def validate_length(encrypted):
+    """
+    Validate that an encrypted message consists of whole digraphs
+    
+    Args:
+        encrypted: The encrypted message
+    
+    Raises:
+        ValueError: If the message has an odd number of characters
+    """
+    if len(encrypted) % 2:
+        raise ValueError("The encrypted message has an odd number of characters.")
+
+def _x_positions(text):
+    """Return the positions of X and x in a str, in increasing order"""
+    positions = []
+    for char in 'Xx':
+        k = text.find(char)
+        while k != -1:
+            positions.append(k)
+            k = text.find(char, k + 1)
+    # Two sorted runs: the sort merges them in linear time
+    positions.sort()
+    return positions
+
+def find_fillers(decrypted, final=True):
+    """
+    Find the filler X characters of decrypted digraphs
+    
+    An X between two identical letters, or at the end, is treated as a
+    filler; an X right after a filler, or at the start, is kept. Only the X
+    characters are visited.
+    
+    Args:
+        decrypted: The decrypted digraphs joined together, as a str or a
+                   list of characters
+        final: Whether decrypted ends the text; if not, an X in the last
+               position is left undecided (it is not reported)
+    
+    Returns:
+        A list of the filler positions in increasing order
+    """
+    if isinstance(decrypted, str):
+        candidates = _x_positions(decrypted)
+    else:
+        candidates = (k for k, char in enumerate(decrypted) if char == 'X' or char == 'x')
+    
+    fillers = []
+    last = len(decrypted) - 1
+    dropped = -2
+    for k in candidates:
+        # An X right after a dropped filler (or at the start) is kept
+        if k == 0 or k - 1 == dropped:
+            continue
+        if k == last:
+            if not final:
+                break
+        # X between same letters, or at the end - it's a filler
+        elif decrypted[k-1].upper() != decrypted[k+1].upper():
+            continue
+        fillers.append(k)
+        dropped = k
+    return fillers
+
+def remove_positions(text, positions):
+    """
+    Remove the characters at the given positions, copying the text between them in slices
+    
+    Args:
+        text: A str
+        positions: Positions to remove, in increasing order
+    
+    Returns:
+        The text without those characters
+    """
+    if not positions:
+        return text
+    parts = []
+    start = 0
+    for k in positions:
+        parts.append(text[start:k])
+        start = k + 1
+    parts.append(text[start:])
+    return ''.join(parts)
+
+def remove_fillers(decrypted):
+    """
+    Remove the filler X characters from decrypted digraphs (see find_fillers)
+    
+    Args:
+        decrypted: The decrypted digraphs joined together
+    
+    Returns:
+        The text without fillers
+    """
+    return remove_positions(decrypted, find_fillers(decrypted))
+
+def marked_fillers(filler_info, length):
+    """
+    Return the filler positions marked in the filler information
+    
+    Args:
+        filler_info: Hex bitmask of the filler positions, as returned by
+                     encrypt_playfair with format_version=2
+        length: Length of the decrypted digraphs; later marks are ignored
+    
+    Returns:
+        A list of the filler positions in increasing order
+    """
+    bits = case_codec.decode_case_bits(filler_info)[:length]
+    positions = []
+    k = bits.find('1')
+    while k != -1:
+        positions.append(k)
+        k = bits.find('1', k + 1)
+    return positions
+
+def drop_fillers(decrypted, filler_info):
+    """
+    Remove the fillers marked in the filler information
+    
+    Unlike remove_fillers this is exact: an X of the password is never
+    mistaken for a filler.
+    
+    Args:
+        decrypted: The decrypted digraphs joined together
+        filler_info: Hex bitmask of the filler positions (see marked_fillers)
+    
+    Returns:
+        The text without fillers
+    """
+    return remove_positions(decrypted, marked_fillers(filler_info, len(decrypted)))
+
+def restore_case(text, case_encoded):
+    """
+    Apply the case information to a decrypted text
+    
+    Args:
+        text: The decrypted text without fillers
+        case_encoded: Encoded case information
+    
+    Returns:
+        The text with 1 bits in uppercase and 0 bits in lowercase; non-letters
+        are unaffected, and characters beyond the case bits are kept as is
+    """
+    case_bits = case_codec.decode_case_bits(case_encoded)
+    restored = [char.lower() if bit == '0' else char.upper() for char, bit in zip(text, case_bits)]
+    return ''.join(restored) + text[len(restored):]
+
+def decrypt_fused(encrypted, case_encoded, ctx, filler_info=None):
+    """
+    Decrypt a message with a compiled key in a single pass
+    
+    Mirror image of playfair_encrypt.encrypt_fused: every digraph is read
+    from its shuffled positions, its characters are transformed back and it
+    is substituted into a preallocated buffer, without the intermediate
+    unshuffled and transformed strings. Filler removal and case restoration
+    follow on the decrypted text.
+    
+    Args:
+        encrypted: The encrypted message
+        case_encoded: Encoded case information
+        ctx: A CipherContext
+        filler_info: Filler information of format version 2, or None to
+                     detect the fillers with remove_fillers
+    
+    Returns:
+        Decrypted message with original case restored
+    
+    Raises:
+        ValueError: If the message contains an invalid character or has an
+                    odd number of characters
+    """
+    decrypted = ''.join(decrypt_characters(encrypted, case_encoded, ctx))
+    if filler_info is None:
+        return restore_case(remove_fillers(decrypted), case_encoded)
+    return restore_case(drop_fillers(decrypted, filler_info), case_encoded)
+
+def decrypt_characters(encrypted, case_encoded, ctx):
+    """
+    Run the single pass of decrypt_fused, up to the decrypted digraphs
+    
+    Args:
+        encrypted: The encrypted message
+        case_encoded: Encoded case information
+        ctx: A CipherContext
+    
+    Returns:
+        A list of the characters of the decrypted digraphs, fillers included
+    
+    Raises:
+        ValueError: If the message contains an invalid character or has an
+                    odd number of characters
+    """
+    validate_encrypted(encrypted, ctx)
+    validate_length(encrypted)
+    n = len(encrypted)
+    
+    # inverse[j] is the shuffled position of the j-th transformed character
+    _, inverse = shuffle_cache.get_permutations(case_encoded or ctx.fallback_shuffle_key, n)
+    
+    table = ctx.decrypt_table or {}
+    ring = ctx.ring
+    ring_index = ctx.ring_index
+    ring_size = len(ring)
+    schedule = ctx.key_schedule.expand(n)
+    
+    chars = [None] * n
+    for j in range(0, n, 2):
+        c1 = encrypted[inverse[j]]
+        index = ring_index.get(c1)
+        if index is not None:
+            c1 = ring[(index - schedule[j]) % ring_size]
+        c2 = encrypted[inverse[j + 1]]
+        index = ring_index.get(c2)
+        if index is not None:
+            c2 = ring[(index - schedule[j + 1]) % ring_size]
+        
+        pair = table.get(c1 + c2)
+        if pair is None:
+            pair = decrypt_digraph(c1, c2, ctx)
+        chars[j], chars[j + 1] = pair
+    
+    return chars
+
+def decrypt_playfair(encrypted, case_encoded, matrix, secret_key, show_visualization=False, instrument=None,
+                     fused=True, filler_info=None):
     """
     Decrypts a message using the Playfair cipher with modified rules.
     
@@ -313,18 +535,36 @@ def decrypt_playfair(encrypted, case_encoded, matrix, secret_key, show_visualiza
     Args:
         encrypted: The encrypted message
         case_encoded: Encoded case information (with shuffle method prefix)
-        matrix: The decryption matrix
+        matrix: The decryption matrix or a CipherContext compiled for secret_key
         secret_key: The secret key used for encryption
         show_visualization: Whether to show visualization tables
+        instrument: Optional callback instrument(stage, seconds, count) called once
+                    per stage (see instrumentation.STAGES; "prepare" is the
+                    removal of filler characters)
+        fused: Whether to use the single-pass decrypt_fused kernel (the separate
+               stages are always used with show_visualization or instrument)
+        filler_info: The filler information returned by encrypt_playfair with
+                     format_version=2; None (format version 1) detects the
+                     fillers with remove_fillers
     
     Returns:
         Decrypted message with original case restored
+    
+    Raises:
+        ValueError: If the message contains an invalid character or has an
+                    odd number of characters
     """
-    # Validate input characters
-    valid_chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*()_+-{}"
-    for char in encrypted:
-        if char not in valid_chars:
-            raise ValueError(f"Invalid character '{char}' in encrypted text. Only letters, numbers, and these special characters are allowed: !@#$%^&*()_+-{{}}")
+    timer = instrumentation.stage_timer(instrument)
+    
+    # Position tables and key values are precomputed per key
+    ctx = cipher_context.as_context(matrix, secret_key)
+    
+    if fused and not show_visualization and instrument is None:
+        return decrypt_fused(encrypted, case_encoded, ctx, filler_info)
+    
+    # Validate input characters and length
+    validate_encrypted(encrypted, ctx)
+    validate_length(encrypted)
     
     # Determine shuffle key based on case_encoded
     if case_encoded:
@@ -332,8 +572,7 @@ def decrypt_playfair(encrypted, case_encoded, matrix, secret_key, show_visualiza
         shuffle_key = case_encoded
     else:
         # No case information, use a sequence derived from the secret key
-        key_values = generate_key_values(secret_key)
-        shuffle_key = ''.join([format(v % 16, 'x') for v in key_values])
+        shuffle_key = ctx.fallback_shuffle_key
     
     if show_visualization:
         print("-"*70)
@@ -341,12 +580,14 @@ def decrypt_playfair(encrypted, case_encoded, matrix, secret_key, show_visualiza
     
     # Unshuffle the text
     unshuffled = unshuffle_text(encrypted, shuffle_key, show_visualization)
+    timer.lap("shuffle", len(unshuffled))
     
     if show_visualization:
         print("unshuffled: ", unshuffled)
     
     # Reverse the ASCII transformation
-    transformed = reverse_ascii_transform(unshuffled, secret_key)
+    transformed = reverse_ascii_transform(unshuffled, secret_key, ctx.key_schedule.expand(len(unshuffled)), ctx.ring)
+    timer.lap("transform", len(transformed))
     
     if show_visualization:
         print("transformed: ", transformed)
@@ -360,73 +601,37 @@ def decrypt_playfair(encrypted, case_encoded, matrix, secret_key, show_visualiza
     # Decrypt each pair
     decrypted_pairs = []
     
+    table = ctx.decrypt_table or {}
+    
     for dg in digraphs:
-        e1, e2 = dg[0], dg[1]
-        decrypted_pair = decrypt_digraph(e1, e2, matrix)
+        # Table engine: digraphs of matrix characters are a single lookup
+        decrypted_pair = table.get(dg)
+        if decrypted_pair is None:
+            e1, e2 = dg[0], dg[1]
+            decrypted_pair = decrypt_digraph(e1, e2, ctx)
         decrypted_pairs.append(decrypted_pair)
     
     # Join the decrypted pairs
     decrypted = ''.join(decrypted_pairs)
+    timer.lap("digraph", len(digraphs))
     
     if show_visualization:
         print("decrypted: ", decrypted)
     
     # Process the result to handle fillers and special cases
-    processed = []
-    i = 0
-    
-    while i < len(decrypted):
-        # Current character
-        curr = decrypted[i]
-        
-        # Handle X as a filler character
-        if i + 1 < len(decrypted) and decrypted[i+1].upper() == 'X':
-            # Check if X is a filler
-            if i + 2 < len(decrypted) and decrypted[i].upper() == decrypted[i+2].upper():
-                # X between same letters - it's a filler
-                processed.append(curr)
-                i += 2  # Skip the X
-            elif i + 2 >= len(decrypted):
-                # X at the end - it's a trailing filler
-                processed.append(curr)
-                break
-            else:
-                # X is probably not a filler
-                processed.append(curr)
-                i += 1
-        else:
-            processed.append(curr)
-            i += 1
-    
-    # Join the processed result
-    result = ''.join(processed)
+    if filler_info is None:
+        result = remove_fillers(decrypted)
+    else:
+        result = drop_fillers(decrypted, filler_info)
+    timer.lap("prepare", len(decrypted))
     
     if show_visualization:
         print("result: ", result)
     
-    # Decode case information from hex to binary
-    case_bits = ''
-    for c in case_encoded:
-        try:
-            # Convert hex digit to 4 binary digits
-            bits = bin(int(c, 16))[2:].zfill(4)
-            case_bits += bits
-        except ValueError:
-            # If not a valid hex digit, skip it
-            continue
-    
-    # Apply case information to restore original case
-    result_with_case = ''
-    for i, char in enumerate(result):
-        if i < len(case_bits) and char.isalpha():
-            # 1 = uppercase, 0 = lowercase
-            if case_bits[i] == '0':
-                result_with_case += char.lower()
-            else:
-                result_with_case += char.upper()
-        else:
-            # If we run out of case bits or it's not a letter, keep as is
-            result_with_case += char
+    # Apply case information to restore original case: 1 = uppercase, 0 = lowercase
+    # (invalid hex digits in the case information are skipped)
+    result_with_case = restore_case(result, case_encoded)
+    timer.lap("case", len(result_with_case))
     
     if show_visualization:
         print("result_with_case: ", result_with_case)
@@ -434,6 +639,54 @@ def decrypt_playfair(encrypted, case_encoded, matrix, secret_key, show_visualiza
     
     return result_with_case
 
+def split_record(record):
+    """
+    Split an encrypted record into its fields
+    
+    Args:
+        record: An (encrypted_message, case_information) pair, or an
+                (encrypted_message, case_information, filler_information)
+                triple from format version 2
+    
+    Returns:
+        A tuple (encrypted_message, case_information, filler_information)
+        where filler_information is None for a pair
+    
+    Raises:
+        ValueError: If the record has another number of fields
+    """
+    if len(record) == 2:
+        encrypted, case_encoded = record
+        return encrypted, case_encoded, None
+    encrypted, case_encoded, filler_info = record
+    return encrypted, case_encoded, filler_info
+
+def decrypt_many(records, key, engine="table"):
+    """
+    Decrypt a batch of encrypted passwords under the same key.
+    
+    The key is compiled once and shared by every record in the batch.
+    
+    Args:
+        records: An iterable of (encrypted_message, case_information) pairs, or
+                 of (encrypted_message, case_information, filler_information)
+                 triples from format version 2
+        key: The secret key or a CipherContext compiled for it
+        engine: Engine used when compiling a secret key (see cipher_context.ENGINES)
+    
+    Returns:
+        A list of decrypted messages in input order
+    
+    Raises:
+        ValueError: If any encrypted message contains an invalid character
+    """
+    ctx = cipher_context.resolve_key(key, engine=engine)
+    results = []
+    for record in records:
+        encrypted, case_encoded, filler_info = split_record(record)
+        results.append(decrypt_playfair(encrypted, case_encoded, ctx, ctx.secret_key, filler_info=filler_info))
+    return results
+
 def main():
     """Main function for Playfair decryption"""
     print("=== Playfair Cipher Decryption for Passwords ===")
@@ -1,5 +1,14 @@
+import operator
+
 import methods
-from prettytable import PrettyTable
+import cipher_context
+import shuffle_cache
+import instrumentation
+import case_codec
+
+# Ciphertext formats: 1 returns (encrypted, case_information); 2 also returns
+# the filler information, so decryption can drop fillers exactly
+FORMAT_VERSIONS = (1, 2)
 
 def prepare_message(message, filler='X'):
     """
@@ -49,12 +58,15 @@ def find_position(matrix, char):
     Finds the position of a character in the matrix
     
     Args:
-        matrix: The encryption matrix
+        matrix: The encryption matrix or a CipherContext
         char: The character to find
     
     Returns:
         Tuple (row, col) or None if not found
     """
+    if isinstance(matrix, cipher_context.CipherContext):
+        return matrix.positions.get(char)
+    
     for i in range(len(matrix)):
         for j in range(len(matrix[i])):
             if matrix[i][j] == char:
@@ -68,7 +80,7 @@ def encrypt_digraph(c1, c2, matrix, matrix_flat):
     Args:
         c1: First character of the pair
         c2: Second character of the pair
-        matrix: The encryption matrix
+        matrix: The encryption matrix or a CipherContext
         matrix_flat: Flattened version of the matrix
     
     Returns:
@@ -78,28 +90,33 @@ def encrypt_digraph(c1, c2, matrix, matrix_flat):
     pos1 = find_position(matrix, c1)
     pos2 = find_position(matrix, c2)
     
+    if isinstance(matrix, cipher_context.CipherContext):
+        rows_down, cols_right, _, _ = matrix.shifts
+        matrix = matrix.matrix
+    else:
+        rows_down, cols_right, _, _ = cipher_context.shift_tables(len(matrix))
+    
     # If either character is not in the matrix, use fallback
     if pos1 is None or pos2 is None:
         return matrix[0][0] + matrix[0][0]  # Fallback
     
     i1, j1 = pos1
     i2, j2 = pos2
-    matrix_size = len(matrix)
     
     # Apply Playfair rules with modifications
     if i1 == i2:  # Same row rule - shift 2 steps toward bottom
-        # Move two positions down (with wrapping)
-        new_row1 = (i1 + 2) % matrix_size
-        new_row2 = (i2 + 2) % matrix_size
+        # Move two positions down (with wrapping, precomputed per matrix size)
+        new_row1 = rows_down[i1]
+        new_row2 = rows_down[i2]
         
         encrypted_pair = (
             matrix[new_row1][j1] + 
             matrix[new_row2][j2]
         )
     elif j1 == j2:  # Same column rule - shift 3 steps toward right
-        # Move three positions right (with wrapping)
-        new_col1 = (j1 + 3) % matrix_size
-        new_col2 = (j2 + 3) % matrix_size
+        # Move three positions right (with wrapping, precomputed per matrix size)
+        new_col1 = cols_right[j1]
+        new_col2 = cols_right[j2]
         
         encrypted_pair = (
             matrix[i1][new_col1] + 
@@ -124,51 +141,41 @@ def generate_key_values(secret_key):
     Returns:
         List of integers derived from the key
     """
-    # Convert each character to its ASCII value
-    key_values = [ord(c) for c in secret_key]
-    
-    # Extend the key values to make it more complex
-    extended_values = []
-    sum_so_far = 0
-    
-    for i, val in enumerate(key_values):
-        sum_so_far = (sum_so_far + val) % 256
-        product = (val * (i + 1)) % 256
-        extended_values.append(sum_so_far)
-        extended_values.append(product)
-    
-    return extended_values
+    return cipher_context.generate_key_values(secret_key)
 
-def apply_ascii_transform(text, secret_key):
+def apply_ascii_transform(text, secret_key, key_values=None, ring=None):
     """
     Apply a reversible ASCII-based transformation using the secret key
     
     Args:
         text: The text to transform
         secret_key: The secret key to use
+        key_values: Precomputed key values for secret_key, or a key schedule
+                    (see cipher_context.KeySchedule) (optional)
+        ring: Characters of the transform ring (default: cipher_context.TRANSFORM_CHARS)
     
     Returns:
         Transformed text
     """
-    # Define allowed characters
-    valid_chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*()_+-{}"
+    # Allowed characters and their indices
+    valid_chars = ring or cipher_context.TRANSFORM_CHARS
+    valid_index = cipher_context.ring_index(valid_chars)
     
     # Generate a sequence of numbers from the secret key
-    key_values = generate_key_values(secret_key)
+    if key_values is None:
+        key_values = generate_key_values(secret_key)
+    
+    # Expand the key values to one per character (cycling through them)
+    if len(key_values) < len(text):
+        key_values = cipher_context.expand_key_values(key_values, len(text))
     
     # Apply the transformation
     result = []
-    for i, char in enumerate(text):
-        # Get ASCII value
-        ascii_val = ord(char)
-        # Get the key value for this position (cycling through key values)
-        key_val = key_values[i % len(key_values)]
-        
+    for char, key_val in zip(text, key_values):
         # Transform character within valid character set
-        valid_chars_list = list(valid_chars)
-        original_index = valid_chars_list.index(char) if char in valid_chars_list else 0
-        new_index = (original_index + key_val) % len(valid_chars_list)
-        new_char = valid_chars_list[new_index]
+        original_index = valid_index.get(char, 0)
+        new_index = (original_index + key_val) % len(valid_chars)
+        new_char = valid_chars[new_index]
         
         result.append(new_char)
     
@@ -185,32 +192,7 @@ def generate_shuffle_indices(shuffle_key, length):
     Returns:
         A list of indices for shuffling
     """
-    # Convert the shuffle key to a list of integers
-    if len(shuffle_key) == 0:
-        return list(range(length))
-        
-    # Convert shuffle key chars to values
-    key_values = []
-    for c in shuffle_key:
-        # Convert to a value between 0-15
-        if c.isdigit():
-            key_values.append(int(c))
-        elif 'A' <= c <= 'F' or 'a' <= c <= 'f':
-            key_values.append(10 + ord(c.upper()) - ord('A'))
-        else:
-            key_values.append(ord(c) % 16)
-    
-    # Generate indices
-    indices = list(range(length))
-    
-    # Shuffle the indices using Fisher-Yates algorithm with the key values
-    for i in range(length - 1, 0, -1):
-        # Use key_values to determine the swap index
-        j = key_values[i % len(key_values)] % (i + 1)
-        # Swap indices[i] and indices[j]
-        indices[i], indices[j] = indices[j], indices[i]
-    
-    return indices
+    return shuffle_cache.generate_shuffle_indices(shuffle_key, length)
 
 def shuffle_text(text, shuffle_key, show_visualization=False):
     """
@@ -227,22 +209,17 @@ def shuffle_text(text, shuffle_key, show_visualization=False):
     if not text:
         return ""
         
-    # Generate shuffling indices
-    indices = generate_shuffle_indices(shuffle_key, len(text))
-    
-    # Create a mapping from original positions to new positions
-    position_map = {}
-    for new_pos, old_pos in enumerate(indices):
-        position_map[old_pos] = new_pos
+    # Shuffling indices (and their inverse) come from the shared permutation cache
+    indices, position_map = shuffle_cache.get_permutations(shuffle_key, len(text))
     
-    # Apply the shuffling
-    shuffled = [''] * len(text)
-    for old_pos, char in enumerate(text):
-        new_pos = position_map[old_pos]
-        shuffled[new_pos] = char
+    # Apply the shuffling: shuffled[new_pos] = text[indices[new_pos]]
+    shuffled = [text[old_pos] for old_pos in indices]
     
     # Show visualization if requested
     if show_visualization:
+        # PrettyTable is only needed for visualization, so it is imported on demand
+        from prettytable import PrettyTable
+        
         # First, show how the key is used to generate indices
         key_table = PrettyTable()
         key_table.field_names = ["Shuffle Key", "To Key Values"]
@@ -326,7 +303,148 @@ def shuffle_text(text, shuffle_key, show_visualization=False):
     
     return ''.join(shuffled)
 
-def encrypt_playfair(message, matrix, secret_key, show_visualization=False):
+def validate_message(message, ctx=None):
+    """
+    Check that a message only contains allowed characters
+    
+    Args:
+        message: The plaintext message
+        ctx: The CipherContext the message is encrypted with (optional; its
+             character set replaces ALLOWED_CHARS for matrices larger than 7x7)
+    
+    Raises:
+        ValueError: For the first invalid character (spaces have their own message)
+    """
+    allowed = methods.ALLOWED_SET if ctx is None else ctx.allowed
+    invalid = methods.invalid_chars(message, allowed)
+    if invalid:
+        char = invalid[0]
+        if char == ' ':
+            raise ValueError("Spaces are not allowed in passwords. Please remove all spaces.")
+        elif allowed is not methods.ALLOWED_SET:
+            raise ValueError(f"Invalid character '{char}' in text. It is not in the character set of the {ctx.matrix_size}x{ctx.matrix_size} matrix.")
+        else:
+            raise ValueError(f"Invalid character '{char}' in text. Only letters, numbers, and these special characters are allowed: !@#$%^&*()_+-{{}}")
+
+def filler_positions(prepared):
+    """
+    Find where prepare_message inserts fillers
+    
+    Args:
+        prepared: The uppercase message
+    
+    Returns:
+        A list of the filler positions in the joined digraphs
+    """
+    n = len(prepared)
+    # Without adjacent doubles, only an odd length needs a filler
+    if not any(map(operator.eq, prepared, prepared[1:])):
+        return [n] if n % 2 else []
+    
+    positions = []
+    i = 0
+    while i < n:
+        if i == n - 1 or prepared[i] == prepared[i + 1]:
+            positions.append(i + len(positions) + 1)
+            i += 1
+        else:
+            i += 2
+    return positions
+
+def check_format_version(format_version):
+    """Raise ValueError for a format version outside FORMAT_VERSIONS"""
+    if format_version not in FORMAT_VERSIONS:
+        raise ValueError(f"Unsupported format version {format_version!r}. Supported versions: {FORMAT_VERSIONS}")
+
+def encrypt_fused(message, ctx, filler='X', format_version=1):
+    """
+    Encrypt a message with a compiled key in a single pass
+    
+    Gives exactly the output of the separate stages of encrypt_playfair. A
+    pre-scan finds the fillers, which fixes the case information and so the
+    shuffle; the main pass then substitutes every digraph, transforms its two
+    characters and writes them straight to their shuffled positions in a
+    preallocated buffer, without the intermediate digraph, substituted and
+    transformed strings.
+    
+    Args:
+        message: The plaintext message
+        ctx: A CipherContext
+        filler: Character used when splitting doubles or odd-length messages
+        format_version: 2 to also return the filler information (see FORMAT_VERSIONS)
+    
+    Returns:
+        A tuple (encrypted_message, case_information), followed by
+        filler_information for format version 2
+    
+    Raises:
+        ValueError: If the message contains an invalid character or the
+                    format version is not supported
+    """
+    check_format_version(format_version)
+    validate_message(message, ctx)
+    case_map = [c.isupper() or not c.isalpha() for c in message]
+    return encrypt_prepared(message.upper(), case_map, ctx, filler, format_version)
+
+def encrypt_prepared(prepared, case_map, ctx, filler='X', format_version=1):
+    """
+    Run the single pass of encrypt_fused on an uppercase, validated message
+    
+    Args:
+        prepared: The uppercase message, as a str or a list of characters
+        case_map: The case bits of the message (without fillers)
+        ctx: A CipherContext
+        filler: Character used when splitting doubles or odd-length messages
+        format_version: 2 to also return the filler information
+    
+    Returns:
+        A tuple (encrypted_message, case_information), followed by
+        filler_information for format version 2
+    """
+    n = len(prepared)
+    
+    # Pre-scan: the fillers fix the length and the case information
+    fillers_at = filler_positions(prepared)
+    fillers = len(fillers_at)
+    
+    # Fillers are uppercase
+    case_encoded = case_codec.encode_case_map(case_map + [True] * fillers)
+    
+    # positions[j] is the shuffled position of the j-th transformed character
+    length = n + fillers
+    _, positions = shuffle_cache.get_permutations(case_encoded, length)
+    
+    table = ctx.encrypt_table or {}
+    ring = ctx.ring
+    ring_index = ctx.ring_index
+    ring_size = len(ring)
+    schedule = ctx.key_schedule.expand(length)
+    
+    shuffled = [None] * length
+    i = 0
+    j = 0
+    while i < n:
+        c1 = prepared[i]
+        if i + 1 < n and prepared[i + 1] != c1:
+            c2 = prepared[i + 1]
+            i += 2
+        else:
+            c2 = filler
+            i += 1
+        
+        pair = table.get(c1 + c2)
+        if pair is None:
+            pair = encrypt_digraph(c1, c2, ctx, ctx.matrix_flat)
+        shuffled[positions[j]] = ring[(ring_index.get(pair[0], 0) + schedule[j]) % ring_size]
+        shuffled[positions[j + 1]] = ring[(ring_index.get(pair[1], 0) + schedule[j + 1]) % ring_size]
+        j += 2
+    
+    if format_version == 2:
+        return ''.join(shuffled), case_encoded, case_codec.encode_positions(fillers_at, length)
+    return ''.join(shuffled), case_encoded
+
+def encrypt_playfair(message, matrix, secret_key, show_visualization=False, instrument=None, fused=True,
+                     format_version=1):
     """
     Encrypt a message using the Playfair cipher with enhanced rules.
     
@@ -337,74 +455,112 @@ def encrypt_playfair(message, matrix, secret_key, show_visualization=False):
     
     Args:
         message: The plaintext message to encrypt
-        matrix: The encryption matrix (7x7)
+        matrix: The encryption matrix (7x7 up to 10x10) or a CipherContext compiled for secret_key
         secret_key: The secret key used for additional encryption steps
         show_visualization: Whether to show visualization tables
+        instrument: Optional callback instrument(stage, seconds, count) called once
+                    per stage (see instrumentation.STAGES)
+        fused: Whether to use the single-pass encrypt_fused kernel (the separate
+               stages are always used with show_visualization or instrument)
+        format_version: 1 for the original (encrypted_message, case_information)
+                        output, 2 to also return the filler information: a hex
+                        bitmask of the filler positions in the decrypted
+                        digraphs, which lets decrypt_playfair drop the fillers
+                        exactly instead of guessing them
     
     Returns:
-        A tuple containing (encrypted_message, case_information)
+        A tuple containing (encrypted_message, case_information), followed by
+        filler_information for format version 2
+    
+    Raises:
+        ValueError: If the message contains an invalid character or the
+                    format version is not supported
     """
+    timer = instrumentation.stage_timer(instrument)
+    check_format_version(format_version)
+    
+    # Position tables, flattened matrix and key values are precomputed per key
+    ctx = cipher_context.as_context(matrix, secret_key)
+    
+    if fused and not show_visualization and instrument is None:
+        return encrypt_fused(message, ctx, format_version=format_version)
+    
     # Validate input characters (no spaces allowed)
-    valid_chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*()_+-{}"
-    for char in message:
-        if char not in valid_chars:
-            if char == ' ':
-                raise ValueError("Spaces are not allowed in passwords. Please remove all spaces.")
-            else:
-                raise ValueError(f"Invalid character '{char}' in text. Only letters, numbers, and these special characters are allowed: !@#$%^&*()_+-{{}}")
+    validate_message(message, ctx)
     
     # Prepare the message (create digraphs with fillers) and track case
     digraphs, case_map = prepare_message(message, filler='X')
+    timer.lap("prepare", len(digraphs))
     
     if show_visualization:
         print("digraphs: ", digraphs)
         print("case_map: ", case_map)
     
-    # Create a flattened version of the matrix for indexing
-    matrix_flat = []
-    for row in matrix:
-        for char in row:
-            matrix_flat.append(char)
-    
     # Encrypt each pair
     encrypted_pairs = []
+    table = ctx.encrypt_table or {}
     
     for dg in digraphs:
-        c1, c2 = dg[0], dg[1]
-        encrypted_pair = encrypt_digraph(c1, c2, matrix, matrix_flat)
+        # Table engine: digraphs of matrix characters are a single lookup
+        encrypted_pair = table.get(dg)
+        if encrypted_pair is None:
+            c1, c2 = dg[0], dg[1]
+            encrypted_pair = encrypt_digraph(c1, c2, ctx, ctx.matrix_flat)
         encrypted_pairs.append(encrypted_pair)
     
     # Join the encrypted pairs
     encrypted = ''.join(encrypted_pairs)
+    timer.lap("digraph", len(digraphs))
     if show_visualization:
         print("encrypted diagraphs: ", encrypted)
     
     # Apply ASCII transformation
-    transformed = apply_ascii_transform(encrypted, secret_key)
+    transformed = apply_ascii_transform(encrypted, secret_key, ctx.key_schedule.expand(len(encrypted)), ctx.ring)
+    timer.lap("transform", len(transformed))
     if show_visualization:
         print("transformed: ", transformed)
     
-    # Encode the case information
-    # Convert case map to bits where 1=uppercase, 0=lowercase
-    case_bits = ''
-    for is_upper in case_map:
-        case_bits += '1' if is_upper else '0'
-    
-    # Convert case bits to hexadecimal for compact representation
-    case_encoded = ''
-    for i in range(0, len(case_bits), 4):
-        chunk = case_bits[i:i+4].ljust(4, '0')  # Ensure 4 bits, pad with 0s
-        hex_value = int(chunk, 2)
-        case_encoded += hex(hex_value)[2:]  # Convert to hex character
+    # Encode the case information: bits where 1=uppercase, 0=lowercase are
+    # packed into an integer and written as hexadecimal (4 bits per digit)
+    case_encoded = case_codec.encode_case_map(case_map)
+    timer.lap("case", len(case_map))
     
     # Shuffle the transformed text using the case information as a key
     shuffled = shuffle_text(transformed, case_encoded, show_visualization)
+    timer.lap("shuffle", len(shuffled))
     if show_visualization:
         print("shuffled: ", shuffled)
         print("case_encoded: ", case_encoded)
     
+    if format_version == 2:
+        filler_info = case_codec.encode_positions(filler_positions(message.upper()), len(shuffled))
+        if show_visualization:
+            print("filler_info: ", filler_info)
+        return shuffled, case_encoded, filler_info
     return shuffled, case_encoded
 
+def encrypt_many(passwords, key, engine="table", format_version=1):
+    """
+    Encrypt a batch of passwords under the same key.
+    
+    The key is compiled once and shared by every password in the batch.
+    
+    Args:
+        passwords: An iterable of plaintext passwords
+        key: The secret key or a CipherContext compiled for it
+        engine: Engine used when compiling a secret key (see cipher_context.ENGINES)
+        format_version: 2 to add the filler information to every tuple
+    
+    Returns:
+        A list of (encrypted_message, case_information) tuples in input order,
+        with filler_information as a third entry for format version 2
+    
+    Raises:
+        ValueError: If any password contains an invalid character
+    """
+    ctx = cipher_context.resolve_key(key, engine=engine)
+    return [encrypt_playfair(password, ctx, ctx.secret_key, format_version=format_version) for password in passwords]
+
 def main():
     """Main function for Playfair encryption"""
     print("=== Playfair Cipher Encryption for Passwords ===")
@@ -0,0 +1,136 @@
+"""
+Profiling helpers for the command line interface (standard library only).
+
+run_profiled() runs a function under cProfile and writes:
+- a .pstats file readable with pstats or snakeviz-like viewers,
+- a collapsed-stack file ("frame;frame;frame microseconds" per line) that
+  flamegraph.pl, speedscope and similar tools read,
+and prints the top-N functions by their own time.
+
+cProfile records caller/callee edges rather than full stacks, so the
+collapsed stacks are rebuilt from the caller graph: the time of a function
+is split between its callers in proportion to the time spent in it from
+each of them.
+"""
+import cProfile
+import os
+import pstats
+import sys
+
+# Number of functions listed in the summary
+DEFAULT_TOP = 15
+
+# Stacks deeper than this are cut
+MAX_DEPTH = 64
+
+def frame_label(func):
+    """
+    Format a pstats function key as a flamegraph frame name
+    
+    Args:
+        func: A (filename, line, function_name) tuple
+    
+    Returns:
+        "file.py:function:line", or the function name for built-ins
+    """
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+def collapsed_stacks(stats):
+    """
+    Rebuild collapsed stacks from the pstats caller graph
+    
+    Args:
+        stats: A pstats.Stats object
+    
+    Returns:
+        A dictionary mapping "frame;frame;..." to the self time in microseconds
+    """
+    entries = stats.stats
+    callees = {func: [] for func in entries}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            if caller in callees:
+                callees[caller].append(func)
+    
+    stacks = {}
+
+    def walk(func, path, labels, scale):
+        _, _, own_time, total_time, _ = entries[func]
+        if total_time * scale * 1e6 < 1:
+            return  # Less than a microsecond below this frame
+        labels = labels + [frame_label(func)]
+        micros = own_time * scale * 1e6
+        if micros >= 1:
+            key = ';'.join(labels)
+            stacks[key] = stacks.get(key, 0) + micros
+        if len(labels) >= MAX_DEPTH:
+            return
+        for callee in callees[func]:
+            if callee in path:
+                continue  # Recursion: the time is already counted higher up
+            callee_total = entries[callee][3]
+            edge_total = entries[callee][4][func][3]
+            if callee_total > 0 and edge_total > 0:
+                walk(callee, path | {callee}, labels, scale * edge_total / callee_total)
+    
+    for func, (_, _, _, _, callers) in entries.items():
+        # Roots are the profiled function and the profiler's own disable() call
+        if not any(caller in entries for caller in callers) and "_lsprof.Profiler" not in func[2]:
+            walk(func, {func}, [], 1.0)
+    
+    return {key: round(micros) for key, micros in stacks.items() if round(micros) > 0}
+
+def write_collapsed(stats, path):
+    """
+    Write the collapsed stacks of a profile
+    
+    Args:
+        stats: A pstats.Stats object
+        path: Output file path
+    """
+    with open(path, 'w') as f:
+        for key, micros in sorted(collapsed_stacks(stats).items()):
+            f.write(f"{key} {micros}\n")
+
+def output_paths(path):
+    """
+    Return the (pstats, collapsed) file paths for a --profile argument
+    
+    Args:
+        path: The requested profile path ("run" or "run.pstats")
+    
+    Returns:
+        A tuple ("run.pstats", "run.collapsed")
+    """
+    base = path[:-len(".pstats")] if path.endswith(".pstats") else path
+    return base + ".pstats", base + ".collapsed"
+
+def run_profiled(func, *args, path, top=DEFAULT_TOP, stream=None):
+    """
+    Run a function under cProfile and write the profile files
+    
+    Args:
+        func: The function to profile
+        args: Its arguments
+        path: Profile path (see output_paths)
+        top: Number of functions listed in the summary (0 for none)
+        stream: Where the summary is printed (default: stderr)
+    
+    Returns:
+        The result of func
+    """
+    stream = stream or sys.stderr
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        pstats_path, collapsed_path = output_paths(path)
+        profiler.dump_stats(pstats_path)
+        stats = pstats.Stats(profiler, stream=stream)
+        write_collapsed(stats, collapsed_path)
+        print(f"Profile written to {pstats_path} and {collapsed_path}", file=stream)
+        if top > 0:
+            stats.sort_stats("tottime").print_stats(top)
@@ -0,0 +1,121 @@
+"""
+Key rotation without the intermediate strings of decrypt-then-encrypt.
+
+rekey() gives exactly the output of
+
+    decrypted = decrypt_playfair(ciphertext, case_info, old_matrix, old_key)
+    encrypt_playfair(decrypted, new_matrix, new_key)
+
+(including the ValueError raised when the decrypted text holds a character
+that cannot be encrypted, such as the '?' placeholders for digraphs outside
+the matrix), as one composed kernel:
+
+- the old inverse permutation, reverse ring offset and digraph decryption
+  write the decrypted characters to a list (playfair_decrypt.decrypt_characters),
+- the filler scan returns the filler positions in that list,
+- the case bits are applied to the other characters one at a time, giving
+  the uppercase characters and case map of the plaintext,
+- digraph encryption, the new ring offset and the new permutation write the
+  result straight to its shuffled positions (playfair_encrypt.encrypt_prepared).
+
+The plaintext is never built as a string, and both compiled contexts are
+reused for every record.
+"""
+import cipher_context
+import case_codec
+import playfair_encrypt
+import playfair_decrypt
+
+def _restore(chars, fillers, case_info, ctx):
+    """
+    Apply the case information to the decrypted characters that are not fillers
+    
+    Args:
+        chars: The decrypted characters, fillers included
+        fillers: The filler positions in chars, in increasing order
+        case_info: Encoded case information
+        ctx: The CipherContext the plaintext is encrypted with next
+    
+    Returns:
+        A tuple (prepared, case_map) with the uppercase plaintext characters
+        and their case bits
+    
+    Raises:
+        ValueError: As encrypt_playfair does for the first plaintext
+                    character that ctx cannot encrypt
+    """
+    bits = case_codec.decode_case_bits(case_info)
+    allowed = ctx.allowed
+    prepared = []
+    case_map = []
+    
+    start = 0
+    t = 0
+    for end in fillers + [len(chars)]:
+        for k in range(start, end):
+            char = chars[k]
+            # As restore_case: characters beyond the case bits are kept as is
+            if t < len(bits):
+                char = char.lower() if bits[t] == '0' else char.upper()
+            if char not in allowed:
+                playfair_encrypt.validate_message(char, ctx)
+            prepared.append(char.upper())
+            case_map.append(char.isupper() or not char.isalpha())
+            t += 1
+        start = end + 1
+    return prepared, case_map
+
+def rekey(ciphertext, case_info, old_key, new_key, filler_info=None):
+    """
+    Re-encrypt a message from one key to another
+    
+    Args:
+        ciphertext: The message encrypted with old_key
+        case_info: Its encoded case information
+        old_key: The old secret key or a CipherContext compiled for it
+        new_key: The new secret key or a CipherContext compiled for it
+        filler_info: Its filler information for a format version 2 record,
+                     or None to detect the fillers with the heuristic
+    
+    Returns:
+        A tuple (encrypted_message, case_information) under new_key, followed
+        by filler_information when filler_info was given (the record stays
+        in format version 2)
+    
+    Raises:
+        ValueError: As decrypt_playfair/encrypt_playfair would
+    """
+    old_ctx = cipher_context.resolve_key(old_key, engine="table")
+    new_ctx = cipher_context.resolve_key(new_key, engine="table")
+    
+    chars = playfair_decrypt.decrypt_characters(ciphertext, case_info, old_ctx)
+    if filler_info is None:
+        fillers = playfair_decrypt.find_fillers(chars)
+    else:
+        fillers = playfair_decrypt.marked_fillers(filler_info, len(chars))
+    prepared, case_map = _restore(chars, fillers, case_info, new_ctx)
+    format_version = 1 if filler_info is None else 2
+    return playfair_encrypt.encrypt_prepared(prepared, case_map, new_ctx, format_version=format_version)
+
+def rekey_many(records, old_key, new_key):
+    """
+    Re-encrypt a batch of records from one key to another.
+    
+    Both keys are compiled once and shared by every record in the batch.
+    
+    Args:
+        records: An iterable of (encrypted_message, case_information) pairs, or
+                 of format version 2 triples with the filler information
+        old_key: The old secret key or a CipherContext compiled for it
+        new_key: The new secret key or a CipherContext compiled for it
+    
+    Returns:
+        A list of records under new_key, each in the format of its input record
+    """
+    old_ctx = cipher_context.resolve_key(old_key, engine="table")
+    new_ctx = cipher_context.resolve_key(new_key, engine="table")
+    results = []
+    for record in records:
+        ciphertext, case_info, filler_info = playfair_decrypt.split_record(record)
+        results.append(rekey(ciphertext, case_info, old_ctx, new_ctx, filler_info))
+    return results
@@ -0,0 +1,497 @@
+"""
+Local asyncio server and client for the Playfair password cipher.
+
+The server listens on a Unix domain socket or a localhost TCP port and speaks
+JSON lines. Each request is one JSON object per line:
+
+    {"id": 1, "op": "encrypt", "key": "SECRET", "password": "Tennis"}
+    {"id": 2, "op": "decrypt", "key": "SECRET", "encrypted": "...", "case": "..."}
+
+An encrypt request with "format": 2 also gets the filler information in a
+"fillers" field, to be sent back with the decrypt request for exact filler
+removal (see encrypt_playfair's format_version).
+
+A request with "size": 8, 9 or 10 uses a matrix of that size (default: 7),
+which also accepts characters such as {}[]<>| and Latin-1 letters; the
+decrypt request must give the same size.
+
+Each response is one JSON object per line, in request order, echoing the
+id when one was given:
+
+    {"id": 1, "encrypted": "...", "case": "..."}
+    {"id": 2, "decrypted": "Tennis"}
+    {"id": 3, "error": "..."}
+
+Requests from all connections are collected into batches that run on a
+worker pool, where compiled keys are kept in an LRU cache, so callers only
+pay a round trip instead of the import and key compilation costs.
+
+Examples:
+    python service.py --socket /tmp/playfair.sock
+    python service.py --port 8765
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cipher_context
+import parallel
+import playfair_encrypt
+import playfair_decrypt
+
+# Number of compiled keys kept warm in every worker
+KEY_CACHE_SIZE = 128
+
+# Maximum number of requests run together on a worker
+DEFAULT_BATCH_SIZE = 64
+
+# Seconds to wait for more requests before running a batch
+DEFAULT_BATCH_DELAY = 0.001
+
+# Number of connections opened by a client
+DEFAULT_POOL_SIZE = 4
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def compiled_key(secret_key, matrix_size=7):
+    """
+    Compile a secret key, reusing the contexts of recently used keys and sizes
+    
+    Args:
+        secret_key: The secret key
+        matrix_size: Size of the matrix
+    
+    Returns:
+        A CipherContext using the table engine
+    """
+    return cipher_context.compile_key(secret_key, matrix_size, engine="table")
+
+def handle_request(request):
+    """
+    Run one request
+    
+    Args:
+        request: A request dictionary (see the module documentation)
+    
+    Returns:
+        The response dictionary, without the id
+    """
+    try:
+        op = request.get("op")
+        if op not in ("encrypt", "decrypt"):
+            raise ValueError(f"Unknown operation {op!r}; use 'encrypt' or 'decrypt'.")
+        ctx = compiled_key(request["key"], request.get("size", 7))
+        if op == "encrypt":
+            result = playfair_encrypt.encrypt_playfair(request["password"], ctx, ctx.secret_key,
+                                                       format_version=request.get("format", 1))
+            response = {"encrypted": result[0], "case": result[1]}
+            if len(result) > 2:
+                response["fillers"] = result[2]
+            return response
+        decrypted = playfair_decrypt.decrypt_playfair(request["encrypted"], request["case"], ctx, ctx.secret_key,
+                                                      filler_info=request.get("fillers"))
+        return {"decrypted": decrypted}
+    except KeyError as e:
+        return {"error": f"Missing field {e} in request."}
+    except parallel.RECORD_ERRORS + (TypeError, AttributeError) as e:
+        return {"error": str(e)}
+
+def run_batch(requests):
+    """Run a batch of requests on a worker, returning the responses in order"""
+    return [handle_request(request) for request in requests]
+
+class PlayfairServer:
+    """
+    JSON lines server batching the requests of all connections onto a worker pool.
+    
+    Usage:
+        server = PlayfairServer(workers=4)
+        await server.start(path="/tmp/playfair.sock")
+        await server.serve_forever()
+    
+    Attributes:
+        address: The socket path, or the (host, port) the server listens on
+        batches: Number of batches run so far
+        requests: Number of requests run so far
+    """
+
+    def __init__(self, workers=None, batch_size=DEFAULT_BATCH_SIZE, batch_delay=DEFAULT_BATCH_DELAY,
+                 use_processes=True):
+        """
+        Args:
+            workers: Number of workers (default: os.cpu_count())
+            batch_size: Maximum number of requests run together
+            batch_delay: Seconds to wait for more requests before running a batch
+            use_processes: Whether the workers are processes (default) or threads
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1.")
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.use_processes = use_processes
+        self.address = None
+        self.batches = 0
+        self.requests = 0
+        self._server = None
+        self._executor = None
+        self._queue = None
+        self._batcher = None
+        self._running = set()
+        self._connections = {}
+    
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        """
+        Start listening
+        
+        Args:
+            path: Path of a Unix domain socket (if given, host and port are ignored)
+            host: Host to listen on for TCP
+            port: TCP port (0: any free port)
+        
+        Returns:
+            The server itself
+        """
+        executor_type = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        self._executor = executor_type(max_workers=self.workers)
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batches())
+        
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=path)
+            self.address = path
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self
+    
+    async def serve_forever(self):
+        """Serve until the task is cancelled"""
+        await self._server.serve_forever()
+    
+    async def close(self):
+        """Stop listening, close the connections, finish the running batches and shut the workers down"""
+        self._server.close()
+        await self._server.wait_closed()
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._batcher.cancel()
+        await asyncio.gather(self._batcher, *self._running, return_exceptions=True)
+        self._executor.shutdown()
+
+    def submit(self, request):
+        """
+        Queue a request for the next batch
+        
+        Args:
+            request: A request dictionary
+        
+        Returns:
+            A future resolved with the response dictionary
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((request, future))
+        return future
+    
+    async def _run_batches(self):
+        """Collect queued requests into batches and dispatch them to the workers"""
+        loop = asyncio.get_running_loop()
+        # Keep every worker busy with one batch and one more waiting
+        slots = asyncio.Semaphore(2 * self.workers)
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            
+            await slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: slots.release())
+    
+    async def _run_batch(self, batch):
+        """Run one batch on the worker pool and resolve its futures"""
+        loop = asyncio.get_running_loop()
+        try:
+            responses = await loop.run_in_executor(self._executor, run_batch, [request for request, _ in batch])
+        except Exception as e:
+            responses = [{"error": f"Worker failure: {e}"}] * len(batch)
+        self.batches += 1
+        self.requests += len(batch)
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+    
+    async def _handle_connection(self, reader, writer):
+        """Read pipelined requests from a connection and write the responses in order"""
+        handler = asyncio.current_task()
+        self._connections[handler] = writer
+        responses = asyncio.Queue()
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("A request must be a JSON object.")
+                except ValueError as e:
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result({"error": f"Invalid request: {e}"})
+                    await responses.put((None, future))
+                    continue
+                await responses.put((request.get("id"), self.submit(request)))
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            await responses.put(None)
+            await sender
+            del self._connections[handler]
+    
+    async def _send_responses(self, responses, writer):
+        """Write the response of every request of a connection, in request order"""
+        try:
+            while True:
+                item = await responses.get()
+                if item is None:
+                    break
+                request_id, future = item
+                response = await future
+                if request_id is not None:
+                    response = {"id": request_id, **response}
+                writer.write(json.dumps(response).encode() + b'\n')
+                if responses.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+class _Connection:
+    """One client connection with its requests awaiting a response"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = deque()
+        self.receiver = asyncio.create_task(self._receive())
+    
+    async def _receive(self):
+        """Resolve the pending futures with the responses, in order"""
+        error = ConnectionError("Connection to the Playfair server was closed.")
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                self.pending.popleft().set_result(json.loads(line))
+        except (ConnectionError, IndexError) as e:
+            error = e
+        finally:
+            while self.pending:
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_exception(error)
+
+    @property
+    def closed(self):
+        """Whether the connection can no longer be used"""
+        return self.receiver.done()
+    
+    async def request(self, request):
+        """Send a request without waiting for the previous ones, and await its response"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+    
+    async def close(self):
+        """Close the connection, failing the requests still pending"""
+        self.writer.close()
+        await self.receiver
+
+class PlayfairClient:
+    """
+    Async client for PlayfairServer with connection pooling and pipelining.
+    
+    Requests are spread over up to pool_size connections, and several
+    requests can be in flight on the same connection.
+    
+    Usage:
+        async with PlayfairClient(path="/tmp/playfair.sock") as client:
+            encrypted, case_encoded = await client.encrypt("Tennis", "SECRET")
+            password = await client.decrypt(encrypted, case_encoded, "SECRET")
+    """
+
+    def __init__(self, path=None, host="127.0.0.1", port=None, pool_size=DEFAULT_POOL_SIZE):
+        """
+        Args:
+            path: Path of the server's Unix domain socket
+            host: Server host for TCP
+            port: Server TCP port (used when path is not given)
+            pool_size: Maximum number of connections
+        """
+        if path is None and port is None:
+            raise ValueError("Give the socket path or the TCP port of the server.")
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.path = path
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self._connections = []
+        self._connecting = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _open(self):
+        """Open a new connection to the server"""
+        if self.path is not None:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        return _Connection(reader, writer)
+    
+    async def _connection(self):
+        """Return the open connection with the fewest pending requests, opening one if useful"""
+        self._connections = [c for c in self._connections if not c.closed]
+        idle = min(self._connections, key=lambda c: len(c.pending), default=None)
+        if idle is not None and (not idle.pending or len(self._connections) >= self.pool_size):
+            return idle
+        
+        # Open at most one connection at a time
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._open())
+            try:
+                connection = await self._connecting
+            finally:
+                self._connecting = None
+            self._connections.append(connection)
+            return connection
+        await asyncio.shield(self._connecting)
+        return await self._connection()
+    
+    async def request(self, request):
+        """
+        Send a raw request dictionary
+        
+        Returns:
+            The response dictionary
+        
+        Raises:
+            ValueError: If the server reports an error for the request
+        """
+        response = await (await self._connection()).request(request)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response
+    
+    async def encrypt(self, password, secret_key, format_version=1, matrix_size=7):
+        """
+        Encrypt a password on the server
+        
+        Args:
+            format_version: 2 to also get the filler information
+            matrix_size: Size of the matrix
+        
+        Returns:
+            A tuple (encrypted_message, case_information), followed by
+            filler_information for format version 2
+        """
+        request = {"op": "encrypt", "key": secret_key, "password": password}
+        if format_version != 1:
+            request["format"] = format_version
+        if matrix_size != 7:
+            request["size"] = matrix_size
+        response = await self.request(request)
+        if "fillers" in response:
+            return response["encrypted"], response["case"], response["fillers"]
+        return response["encrypted"], response["case"]
+    
+    async def decrypt(self, encrypted, case_encoded, secret_key, filler_info=None, matrix_size=7):
+        """
+        Decrypt a message on the server
+        
+        Args:
+            filler_info: The filler information of a format version 2 record
+            matrix_size: Size of the matrix the message was encrypted with
+        
+        Returns:
+            The decrypted message
+        """
+        request = {"op": "decrypt", "key": secret_key, "encrypted": encrypted, "case": case_encoded}
+        if filler_info is not None:
+            request["fillers"] = filler_info
+        if matrix_size != 7:
+            request["size"] = matrix_size
+        response = await self.request(request)
+        return response["decrypted"]
+    
+    async def close(self):
+        """Close every connection"""
+        connections, self._connections = self._connections, []
+        await asyncio.gather(*(c.close() for c in connections), return_exceptions=True)
+
+async def serve(path=None, host="127.0.0.1", port=0, **options):
+    """
+    Run a server until cancelled
+    
+    Args:
+        path: Path of a Unix domain socket
+        host: Host to listen on for TCP
+        port: TCP port
+        options: Options for PlayfairServer
+    """
+    server = await PlayfairServer(**options).start(path, host, port)
+    print(f"Playfair server listening on {server.address}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+def main(argv=None):
+    """Main function for the server"""
+    parser = argparse.ArgumentParser(description="Serve Playfair encryption and decryption over a local socket (JSON lines).")
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--socket", help="path of the Unix domain socket")
+    address.add_argument("--port", type=int, help="localhost TCP port")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"maximum requests per batch (default: {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args(argv)
+    
+    try:
+        asyncio.run(serve(args.socket, args.host, args.port or 0,
+                          workers=args.workers, batch_size=args.batch_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
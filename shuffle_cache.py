@@ -0,0 +1,97 @@
+import lru_cache
+
+# Default number of (shuffle_key, length) permutations kept by the shared cache
+DEFAULT_CACHE_SIZE = 1024
+
+def generate_shuffle_indices(shuffle_key, length):
+    """
+    Generate shuffling indices based on the shuffle key
+    
+    Args:
+        shuffle_key: The key to use for shuffling
+        length: The length of the text to shuffle
+    
+    Returns:
+        A list of indices for shuffling
+    """
+    # Convert the shuffle key to a list of integers
+    if len(shuffle_key) == 0:
+        return list(range(length))
+    
+    # Convert shuffle key chars to values
+    key_values = []
+    for c in shuffle_key:
+        # Convert to a value between 0-15
+        if c.isdigit():
+            key_values.append(int(c))
+        elif 'A' <= c <= 'F' or 'a' <= c <= 'f':
+            key_values.append(10 + ord(c.upper()) - ord('A'))
+        else:
+            key_values.append(ord(c) % 16)
+    
+    # Generate indices
+    indices = list(range(length))
+    
+    # Shuffle the indices using Fisher-Yates algorithm with the key values
+    for i in range(length - 1, 0, -1):
+        # Use key_values to determine the swap index
+        j = key_values[i % len(key_values)] % (i + 1)
+        # Swap indices[i] and indices[j]
+        indices[i], indices[j] = indices[j], indices[i]
+    
+    return indices
+
+class ShuffleCache(lru_cache.LRUCache):
+    """
+    Bounded LRU cache of shuffle permutations keyed by (shuffle_key, length).
+    
+    Each entry holds the forward permutation (shuffled[i] = text[forward[i]])
+    and its inverse (unshuffled[i] = text[inverse[i]]), both as tuples. The
+    cache is guarded by a lock, so it can be shared between threads.
+    
+    Attributes:
+        maxsize: Maximum number of entries kept (0 disables caching)
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that had to generate the permutation
+        evictions: Number of entries dropped to respect maxsize
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        super().__init__(maxsize)
+
+    def get(self, shuffle_key, length):
+        """
+        Return the permutations for a shuffle key and text length
+        
+        Args:
+            shuffle_key: The key used for shuffling
+            length: The length of the text
+        
+        Returns:
+            A tuple (forward, inverse) of index tuples
+        """
+        return self.lookup((shuffle_key, length), lambda: _permutations(shuffle_key, length))
+
+def _permutations(shuffle_key, length):
+    """Generate the (forward, inverse) permutations as index tuples"""
+    forward = tuple(generate_shuffle_indices(shuffle_key, length))
+    inverse = [0] * length
+    for new_pos, old_pos in enumerate(forward):
+        inverse[old_pos] = new_pos
+    return forward, tuple(inverse)
+
+# Cache shared by shuffle_text and unshuffle_text
+default_cache = ShuffleCache()
+
+def get_permutations(shuffle_key, length):
+    """
+    Return the (forward, inverse) permutations from the shared cache
+    
+    Args:
+        shuffle_key: The key used for shuffling
+        length: The length of the text
+    
+    Returns:
+        A tuple (forward, inverse) of index tuples
+    """
+    return default_cache.get(shuffle_key, length)
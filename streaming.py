@@ -0,0 +1,368 @@
+"""
+Incremental encryption and decryption of arbitrarily long inputs.
+
+StreamEncryptor and StreamDecryptor process their input chunk by chunk with
+feed() and finish with finalize(), holding at most one shuffle block in
+memory:
+
+- digraphs (and filler insertion) are carried across chunk edges,
+- the ASCII transformation uses the key value of each character's absolute
+  position, exactly like apply_ascii_transform on the whole text,
+- the shuffle is applied to fixed-size blocks of block_size characters with
+  the key-derived shuffle key (the last block may be shorter),
+- the case information covers the characters of the message only and is
+  emitted as hex digits as soon as 4 bits are known.
+
+Because of the block shuffle, the stream format is not interchangeable with
+encrypt_playfair/decrypt_playfair output; both ends of a stream must use the
+same key and block size.
+"""
+import cipher_context
+import case_codec
+import shuffle_cache
+import playfair_encrypt
+import playfair_decrypt
+
+# Number of characters shuffled together
+DEFAULT_BLOCK_SIZE = 4096
+
+# Number of characters read at a time by encrypt_stream/decrypt_stream
+DEFAULT_CHUNK_SIZE = 65536
+
+def _check_block_size(block_size):
+    """Validate the block size of a stream"""
+    if block_size < 1:
+        raise ValueError("Block size must be at least 1.")
+
+class StreamEncryptor:
+    """
+    Incremental Playfair encryptor.
+    
+    Usage:
+        encryptor = StreamEncryptor(key)
+        for chunk in chunks:
+            ciphertext, case_info = encryptor.feed(chunk)
+            ...
+        ciphertext, case_info = encryptor.finalize()
+    
+    The ciphertext and case information returned by every call are meant to
+    be appended to two separate outputs.
+    """
+
+    def __init__(self, key, block_size=DEFAULT_BLOCK_SIZE, filler='X'):
+        """
+        Args:
+            key: The secret key or a CipherContext compiled for it
+            block_size: Number of characters shuffled together
+            filler: Character used when splitting doubles or odd-length messages
+        """
+        _check_block_size(block_size)
+        self.ctx = cipher_context.resolve_key(key)
+        self.block_size = block_size
+        self.filler = filler
+        self._pending = None   # First character of an incomplete digraph
+        self._position = 0     # Absolute position of the next ciphertext character
+        self._block = []       # Transformed characters of the current block
+        self._case_map = []    # Case bits not yet emitted as a hex digit
+        self._finished = False
+
+    def _emit_digraph(self, c1, c2):
+        """Substitute a digraph, transform it and add it to the current block"""
+        ctx = self.ctx
+        digraph = c1 + c2
+        encrypted = (ctx.encrypt_table or {}).get(digraph)
+        if encrypted is None:
+            encrypted = playfair_encrypt.encrypt_digraph(c1, c2, ctx, ctx.matrix_flat)
+        
+        key_values = ctx.key_values
+        ring = ctx.ring
+        for char in encrypted:
+            key_val = key_values[self._position % len(key_values)]
+            index = ctx.ring_index.get(char, 0)
+            self._block.append(ring[(index + key_val) % len(ring)])
+            self._position += 1
+
+    def _flush_blocks(self, final):
+        """Shuffle and return every complete block (and the partial one if final)"""
+        output = []
+        while len(self._block) >= self.block_size or (final and self._block):
+            block = self._block[:self.block_size]
+            del self._block[:self.block_size]
+            forward, _ = shuffle_cache.get_permutations(self.ctx.fallback_shuffle_key, len(block))
+            output.append(''.join([block[i] for i in forward]))
+        return ''.join(output)
+
+    def _flush_case(self, final):
+        """Return the hex digits for every complete group of 4 case bits"""
+        complete = len(self._case_map) if final else len(self._case_map) // 4 * 4
+        case_encoded = case_codec.encode_case_map(self._case_map[:complete])
+        del self._case_map[:complete]
+        return case_encoded
+
+    def feed(self, chunk):
+        """
+        Encrypt the next chunk of the message
+        
+        Args:
+            chunk: The next part of the plaintext
+        
+        Returns:
+            A tuple (ciphertext, case_information) produced so far
+        
+        Raises:
+            ValueError: If the chunk contains an invalid character
+        """
+        if self._finished:
+            raise ValueError("The stream has already been finalized.")
+        
+        playfair_encrypt.validate_message(chunk, self.ctx)
+        
+        self._case_map.extend(c.isupper() or not c.isalpha() for c in chunk)
+        
+        for char in chunk.upper():
+            if self._pending is None:
+                self._pending = char
+            elif self._pending == char:
+                # The pair would have the same letter, insert filler
+                self._emit_digraph(self._pending, self.filler)
+                self._pending = char
+            else:
+                self._emit_digraph(self._pending, char)
+                self._pending = None
+        
+        return self._flush_blocks(False), self._flush_case(False)
+
+    def finalize(self):
+        """
+        Finish the message
+        
+        Returns:
+            A tuple (ciphertext, case_information) with the remaining output
+        """
+        if self._finished:
+            raise ValueError("The stream has already been finalized.")
+        self._finished = True
+        
+        if self._pending is not None:
+            # Odd number of characters, add filler
+            self._emit_digraph(self._pending, self.filler)
+            self._pending = None
+        
+        return self._flush_blocks(True), self._flush_case(True)
+
+class StreamDecryptor:
+    """
+    Incremental Playfair decryptor for StreamEncryptor output.
+    
+    Usage:
+        decryptor = StreamDecryptor(key)
+        for ciphertext_chunk, case_chunk in chunks:
+            plaintext = decryptor.feed(ciphertext_chunk, case_chunk)
+            ...
+        plaintext = decryptor.finalize()
+    
+    The ciphertext and the case information can arrive in chunks of any
+    size; plaintext is released once its case bit is known. To keep memory
+    flat, read the case information as it is needed: case_digits_needed()
+    tells how many hex digits the buffered plaintext is waiting for.
+    """
+
+    def __init__(self, key, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Args:
+            key: The secret key or a CipherContext compiled for it
+            block_size: Number of characters shuffled together (as used to encrypt)
+        """
+        _check_block_size(block_size)
+        self.ctx = cipher_context.resolve_key(key)
+        self.block_size = block_size
+        self._ciphertext = ''  # Ciphertext of the incomplete block
+        self._position = 0     # Absolute position of the next unshuffled character
+        self._half = ''        # First character of an incomplete digraph
+        self._decrypted = ''   # Decrypted characters awaiting filler removal
+        self._has_context = False  # Whether _decrypted starts with an already released character
+        self._plain = ''       # Characters awaiting their case bit
+        self._case_bits = ''   # Case bits not yet applied
+        self._finished = False
+
+    def _decrypt_block(self, block):
+        """Unshuffle a block, reverse the transformation and decrypt its digraphs"""
+        ctx = self.ctx
+        _, inverse = shuffle_cache.get_permutations(ctx.fallback_shuffle_key, len(block))
+        
+        key_values = ctx.key_values
+        ring = ctx.ring
+        transformed = []
+        for i in inverse:
+            char = block[i]
+            key_val = key_values[self._position % len(key_values)]
+            index = ctx.ring_index.get(char)
+            transformed.append(char if index is None else ring[(index - key_val) % len(ring)])
+            self._position += 1
+        
+        text = self._half + ''.join(transformed)
+        even = len(text) // 2 * 2
+        self._half = text[even:]
+        
+        table = ctx.decrypt_table or {}
+        pairs = []
+        for i in range(0, even, 2):
+            digraph = text[i:i + 2]
+            decrypted = table.get(digraph)
+            if decrypted is None:
+                decrypted = playfair_decrypt.decrypt_digraph(digraph[0], digraph[1], ctx)
+            pairs.append(decrypted)
+        self._decrypted += ''.join(pairs)
+
+    def _remove_fillers(self, final):
+        """
+        Drop filler characters from the decrypted text
+        
+        Applies playfair_decrypt.find_fillers; the last character is only
+        decided once the next one is known (or at the end). The last released
+        character is kept as the first one of the buffer, so the next call
+        sees the character before its first undecided X.
+        """
+        decrypted = self._decrypted
+        start = 1 if self._has_context else 0
+        end = len(decrypted) if final else len(decrypted) - 1
+        if end <= start:
+            return
+        fillers = playfair_decrypt.find_fillers(decrypted, final)
+        released = [k - start for k in fillers if start <= k < end]
+        self._plain += playfair_decrypt.remove_positions(decrypted[start:end], released)
+        
+        # Keep the last released non-filler as context (it precedes a filler at most once)
+        context = end - 2 if fillers and fillers[-1] == end - 1 else end - 1
+        self._decrypted = decrypted[context:]
+        self._has_context = True
+
+    def _restore_case(self, final):
+        """Return the characters whose case bit is known (all of them if final)"""
+        count = min(len(self._plain), len(self._case_bits))
+        restored = [char.lower() if bit == '0' else char.upper()
+                    for char, bit in zip(self._plain[:count], self._case_bits[:count])]
+        self._case_bits = self._case_bits[count:]
+        if final:
+            # If we run out of case bits, keep the characters as is
+            restored.append(self._plain[count:])
+            self._plain = ''
+        else:
+            self._plain = self._plain[count:]
+        return ''.join(restored)
+
+    def case_digits_needed(self, final=False):
+        """
+        Return the number of hex digits of case information still needed
+        
+        Args:
+            final: Whether to count every buffered character (as finalize
+                   releases them), not only those awaiting their case bit
+        
+        Returns:
+            The number of hex digits to read (at most 3 bits too many)
+        """
+        pending = len(self._plain)
+        if final:
+            pending += len(self._decrypted) + len(self._half) + len(self._ciphertext)
+        return max(0, -(-(pending - len(self._case_bits)) // 4))
+
+    def feed(self, ciphertext, case_encoded=''):
+        """
+        Decrypt the next chunk of the stream
+        
+        Args:
+            ciphertext: The next part of the ciphertext
+            case_encoded: The next part of the case information
+        
+        Returns:
+            The plaintext produced so far
+        
+        Raises:
+            ValueError: If the ciphertext contains an invalid character
+        """
+        if self._finished:
+            raise ValueError("The stream has already been finalized.")
+        
+        playfair_decrypt.validate_encrypted(ciphertext, self.ctx)
+        
+        self._case_bits += case_codec.decode_case_bits(case_encoded)
+        self._ciphertext += ciphertext
+        while len(self._ciphertext) >= self.block_size:
+            self._decrypt_block(self._ciphertext[:self.block_size])
+            self._ciphertext = self._ciphertext[self.block_size:]
+        
+        self._remove_fillers(False)
+        return self._restore_case(False)
+
+    def finalize(self, case_encoded=''):
+        """
+        Finish the stream
+        
+        Args:
+            case_encoded: The rest of the case information
+        
+        Returns:
+            The remaining plaintext
+        """
+        if self._finished:
+            raise ValueError("The stream has already been finalized.")
+        self._finished = True
+        
+        self._case_bits += case_codec.decode_case_bits(case_encoded)        
+        if self._ciphertext:
+            self._decrypt_block(self._ciphertext)
+            self._ciphertext = ''
+        if self._half:
+            raise ValueError("The encrypted stream has an odd number of characters.")
+        
+        self._remove_fillers(True)
+        return self._restore_case(True)
+
+def encrypt_stream(reader, cipher_writer, case_writer, key, block_size=DEFAULT_BLOCK_SIZE,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Encrypt a text stream (file, socket file object, ...) in constant memory
+    
+    Args:
+        reader: Text stream with the plaintext
+        cipher_writer: Text stream receiving the ciphertext
+        case_writer: Text stream receiving the case information
+        key: The secret key or a CipherContext compiled for it
+        block_size: Number of characters shuffled together
+        chunk_size: Number of characters read at a time
+    """
+    encryptor = StreamEncryptor(key, block_size)
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        ciphertext, case_encoded = encryptor.feed(chunk)
+        cipher_writer.write(ciphertext)
+        case_writer.write(case_encoded)
+    ciphertext, case_encoded = encryptor.finalize()
+    cipher_writer.write(ciphertext)
+    case_writer.write(case_encoded)
+
+def decrypt_stream(cipher_reader, case_reader, writer, key, block_size=DEFAULT_BLOCK_SIZE,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Decrypt a stream written by encrypt_stream in constant memory
+    
+    Args:
+        cipher_reader: Text stream with the ciphertext
+        case_reader: Text stream with the case information
+        writer: Text stream receiving the plaintext
+        key: The secret key or a CipherContext compiled for it
+        block_size: Number of characters shuffled together (as used to encrypt)
+        chunk_size: Number of ciphertext characters read at a time
+    """
+    decryptor = StreamDecryptor(key, block_size)
+    while True:
+        ciphertext = cipher_reader.read(chunk_size)
+        if not ciphertext:
+            break
+        writer.write(decryptor.feed(ciphertext))
+        # Case information is read only for the plaintext waiting for it
+        writer.write(decryptor.feed('', case_reader.read(decryptor.case_digits_needed())))
+    writer.write(decryptor.finalize(case_reader.read(decryptor.case_digits_needed(final=True))))
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+
+PASSWORDS = ["Password123", "abcDEF123", "Tennis", "Secret", "P@55w0rd", "Cyber$3curity", "WiFi-Security!", "Str0ng#P@ss!"]
+
+def test_encrypt_many_matches_single_calls():
+    """Batch encryption returns the single-call results in input order"""
+    key = "P@55W0RD!"
+    matrix = methods.PT(key, 7)
+    expected = [playfair_encrypt.encrypt_playfair(p, matrix, key) for p in PASSWORDS]
+    assert playfair_encrypt.encrypt_many(PASSWORDS, key) == expected
+    assert playfair_encrypt.encrypt_many(iter(PASSWORDS), key, engine="lookup") == expected
+
+def test_decrypt_many_round_trip():
+    """Batch decryption restores every password, also from a shared context"""
+    ctx = cipher_context.compile_key("COMPLEX", engine="table")
+    records = playfair_encrypt.encrypt_many(PASSWORDS, ctx)
+    assert playfair_decrypt.decrypt_many(records, ctx) == PASSWORDS
+    assert playfair_decrypt.decrypt_many(records, "COMPLEX") == PASSWORDS
+
+def test_batch_rejects_invalid_password():
+    """An invalid password in the batch raises the usual ValueError"""
+    try:
+        playfair_encrypt.encrypt_many(["valid", "has space"], "SECRET")
+    except ValueError:
+        return
+    assert False, "expected ValueError"
+
+if __name__ == "__main__":
+    print("=== TESTING BATCH ENCRYPTION ===")
+    
+    tests = [
+        test_encrypt_many_matches_single_calls,
+        test_decrypt_many_round_trip,
+        test_batch_rejects_invalid_password,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
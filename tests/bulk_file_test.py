@@ -0,0 +1,131 @@
+import sys
+import os
+import tempfile
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_file
+import cipher_context
+import playfair_encrypt
+from helpers import random_texts
+
+SECRET_KEY = "SECRET"
+WIDTH = 20
+
+# Password characters, with extra fillers and doubled letters
+PASSWORD_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()_+-xXll"
+
+def write_fixed(path, passwords, newline="\n", final_newline=True):
+    """Write passwords as a fixed-width record file"""
+    text = newline.join(p.ljust(WIDTH) for p in passwords)
+    with open(path, 'w', newline='') as f:
+        f.write(text + (newline if final_newline else ""))
+
+def read_records(path):
+    """Read the lines of an output file without their line endings"""
+    with open(path, 'r') as f:
+        return f.read().split("\n")[:-1]
+
+def test_encrypt_matches_library():
+    """Every output record holds the encrypt_playfair result, padded to the record width"""
+    ctx = cipher_context.compile_key(SECRET_KEY)
+    passwords = random_texts(PASSWORD_CHARS, 200, seed=4, min_length=1, max_length=WIDTH)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "in.dat")
+        write_fixed(input_path, passwords)
+        for mmap_output in (True, False):
+            output_path = os.path.join(tmp, f"out-{mmap_output}.dat")
+            count, errors = bulk_file.encrypt_file(input_path, output_path, SECRET_KEY, mmap_output=mmap_output)
+            assert (count, errors) == (len(passwords), [])
+            records = read_records(output_path)
+            assert {len(r) for r in records} == {bulk_file.encrypted_record_width(WIDTH)}
+            for password, record in zip(passwords, records):
+                encrypted, case_encoded = record.split("\t")
+                assert (encrypted.rstrip(), case_encoded.rstrip()) == playfair_encrypt.encrypt_playfair(password, ctx, SECRET_KEY)
+
+def test_round_trip_line_endings():
+    """Decrypting restores the fixed-width file, with or without CRLF and a final newline"""
+    # Without X and doubled letters, so that the filler heuristic restores every password
+    passwords = random_texts("abcdefghABCDEFGH0123456789!@#", 50, seed=9, min_length=1, max_length=WIDTH)
+    passwords = [p for p in passwords if not any(a.lower() == b.lower() for a, b in zip(p, p[1:]))]
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "in.dat")
+        encrypted_path = os.path.join(tmp, "enc.dat")
+        output_path = os.path.join(tmp, "out.dat")
+        for newline, final_newline in (("\n", True), ("\r\n", True), ("\n", False)):
+            write_fixed(input_path, passwords, newline, final_newline)
+            bulk_file.encrypt_file(input_path, encrypted_path, SECRET_KEY)
+            bulk_file.decrypt_file(encrypted_path, output_path, SECRET_KEY)
+            assert [r.rstrip() for r in read_records(output_path)] == passwords, repr(newline)
+
+def test_latin1_records():
+    """Passwords needing a 10x10 matrix round trip as one Latin-1 byte per character"""
+    ctx = cipher_context.compile_key(SECRET_KEY, 10)
+    passwords = ["Ünïcode{}<Pass>", "Tennis", "ÀÖ[x]|~"]
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "in.dat")
+        encrypted_path = os.path.join(tmp, "enc.dat")
+        output_path = os.path.join(tmp, "out.dat")
+        data = "".join(p.ljust(WIDTH) + "\n" for p in passwords).encode('latin-1')
+        with open(input_path, 'wb') as f:
+            f.write(data)
+        assert bulk_file.encrypt_file(input_path, encrypted_path, ctx) == (len(passwords), [])
+        with open(encrypted_path, 'rb') as f:
+            records = f.read().decode('latin-1').split("\n")[:-1]
+        assert {len(r) for r in records} == {bulk_file.encrypted_record_width(WIDTH)}
+        bulk_file.decrypt_file(encrypted_path, output_path, ctx)
+        with open(output_path, 'rb') as f:
+            assert f.read() == data
+
+def test_invalid_records():
+    """Invalid records stop the run unless skip_invalid is set, which leaves them blank"""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "in.dat")
+        output_path = os.path.join(tmp, "out.dat")
+        write_fixed(input_path, ["Tennis", "bad pw", "Secret"])
+        try:
+            bulk_file.encrypt_file(input_path, output_path, SECRET_KEY)
+            assert False, "invalid record accepted"
+        except ValueError as e:
+            assert "line 2" in str(e)
+        count, errors = bulk_file.encrypt_file(input_path, output_path, SECRET_KEY, skip_invalid=True)
+        assert count == 3 and [line for line, _ in errors] == [2]
+        assert read_records(output_path)[1].strip() == ""
+
+def test_not_fixed_width():
+    """Files whose lines have different lengths are rejected"""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "in.dat")
+        with open(input_path, 'w') as f:
+            f.write("short\nmuch longer\n")
+        try:
+            bulk_file.encrypt_file(input_path, os.path.join(tmp, "out.dat"), SECRET_KEY)
+            assert False, "ragged file accepted"
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    print("=== TESTING FIXED-WIDTH FILES ===")
+    
+    tests = [
+        test_encrypt_matches_library,
+        test_round_trip_line_endings,
+        test_latin1_records,
+        test_invalid_records,
+        test_not_fixed_width,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,166 @@
+import sys
+import os
+import random
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+import bytes_api
+from helpers import outcome, random_texts
+
+def test_matches_str_api():
+    """bytes input gives the str API output (or error) for valid and invalid passwords"""
+    for size in (7, 8, 10):
+        ctx = cipher_context.compile_key("P@55W0RD!", size)
+        charset = methods.charset(size)
+        for text in random_texts(charset + charset.lower() + " ~é" + "aa", 400, seed=size):
+            expected = outcome(playfair_encrypt.encrypt_playfair, text, ctx, ctx.secret_key)
+            result = outcome(bytes_api.encrypt_bytes, text.encode('latin-1'), ctx)
+            succeeded = isinstance(result[0], bytes)
+            if succeeded:
+                result = (result[0].decode('latin-1'), result[1].decode('ascii'))
+            assert result == expected, (size, text, result, expected)
+            
+            if succeeded:
+                encrypted, case_info = expected
+                decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, ctx.secret_key)
+                result = bytes_api.decrypt_bytes(encrypted.encode('latin-1'), case_info.encode('ascii'), ctx)
+                assert result.decode('latin-1') == decrypted, (size, text)
+
+def test_decrypt_arbitrary_ciphertext():
+    """Even-length ciphertext of ring characters decrypts like decrypt_playfair, including '??' digraphs"""
+    ctx = cipher_context.compile_key("SECRET")
+    rng = random.Random(3)
+    for _ in range(300):
+        encrypted = ''.join(rng.choice(ctx.ring) for _ in range(2 * rng.randint(0, 10)))
+        case_info = ''.join(rng.choice("0123456789abcdef") for _ in range(rng.randint(0, 5)))
+        expected = playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, ctx.secret_key)
+        result = bytes_api.decrypt_bytes(encrypted.encode('ascii'), case_info.encode('ascii'), ctx)
+        assert result.decode('ascii') == expected, (encrypted, case_info)
+
+def test_buffer_types():
+    """bytearray and memoryview inputs give the same result as bytes"""
+    expected = bytes_api.encrypt_bytes(b"Password123", "SECRET")
+    assert bytes_api.encrypt_bytes(bytearray(b"Password123"), "SECRET") == expected
+    assert bytes_api.encrypt_bytes(memoryview(b"xxPassword123")[2:], "SECRET") == expected
+    
+    encrypted, case_info = expected
+    assert bytes_api.decrypt_bytes(memoryview(encrypted), bytearray(case_info), "SECRET") == b"Password123"
+
+def test_output_buffer():
+    """encrypt_into/decrypt_into write at the start of the buffer and return the count"""
+    encrypted, case_info = bytes_api.encrypt_bytes(b"Tennis", "SPORTS")
+    
+    out = bytearray(b'.' * 32)
+    count, info = bytes_api.encrypt_into(b"Tennis", "SPORTS", out)
+    assert (bytes(out[:count]), info) == (encrypted, case_info)
+    assert out[count:] == b'.' * (32 - count)
+    
+    view = memoryview(bytearray(16))
+    count = bytes_api.decrypt_into(encrypted, case_info, "SPORTS", view[4:])
+    assert bytes(view[4:4 + count]) == b"Tennis"
+
+def test_output_buffer_errors():
+    """Too small or read-only buffers are rejected without writing"""
+    out = bytearray(b'.' * 3)
+    try:
+        bytes_api.encrypt_into(b"Tennis", "SPORTS", out)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a too small buffer was accepted")
+    assert out == b'...'
+    
+    try:
+        bytes_api.encrypt_into(b"Tennis", "SPORTS", b'.' * 32)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("a read-only buffer was accepted")
+
+def test_odd_ciphertext_rejected():
+    """Ciphertext with an odd number of characters raises ValueError"""
+    try:
+        bytes_api.decrypt_bytes(b"ABC", b"", "SECRET")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("odd-length ciphertext was accepted")
+
+def test_fillers_removed_on_bytes():
+    """Fillers are removed without the str filler scan, for odd-length and XX passwords"""
+    def fail(*args):
+        raise AssertionError("the str filler scan was used")
+    
+    ctx = cipher_context.compile_key("SECRET")
+    records = [playfair_encrypt.encrypt_playfair(password, ctx, "SECRET")
+               for password in ["abc", "Tennis", "baXXoon", "XX", "Passw0rd!", "XXXXX", "aXa"]]
+    expected = [playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, "SECRET") for encrypted, case_info in records]
+    saved = playfair_decrypt.remove_fillers, playfair_decrypt.find_fillers
+    playfair_decrypt.remove_fillers = playfair_decrypt.find_fillers = fail
+    try:
+        for (encrypted, case_info), decrypted in zip(records, expected):
+            result = bytes_api.decrypt_bytes(encrypted.encode('ascii'), case_info.encode('ascii'), ctx)
+            assert result.decode('latin-1') == decrypted, decrypted
+        # The heuristic keeps every X of these passwords
+        assert expected[:6] == ["abc", "Tennis", "baXXoon", "XX", "Passw0rd!", "XXXXX"], expected
+    finally:
+        playfair_decrypt.remove_fillers, playfair_decrypt.find_fillers = saved
+
+def test_str_key_matrix_size():
+    """A str key compiles the requested matrix size, so 10x10-only passwords work"""
+    password = "Ünïcode{}<Pass>".encode('latin-1')
+    try:
+        bytes_api.encrypt_bytes(password, "SECRET")
+        assert False, "a 7x7 matrix accepted a 10x10-only password"
+    except ValueError:
+        pass
+    encrypted, case_info = bytes_api.encrypt_bytes(password, "SECRET", matrix_size=10)
+    ctx = cipher_context.compile_key("SECRET", 10)
+    assert (encrypted, case_info) == bytes_api.encrypt_bytes(password, ctx)
+    assert bytes_api.decrypt_bytes(encrypted, case_info, "SECRET", matrix_size=10) == password
+    out = bytearray(64)
+    count = bytes_api.decrypt_into(encrypted, case_info, "SECRET", out, matrix_size=10)
+    assert out[:count] == password
+
+def test_str_key_compiled_once():
+    """Repeated calls with the same str key reuse its context and tables"""
+    key = "CACHEDKEY"
+    bytes_api.encrypt_bytes(b"warmup", key)
+    compiled = bytes_api._compiled_key.cache_info().misses
+    built = bytes_api._tables.cache_info().misses
+    for _ in range(5):
+        encrypted, case_info = bytes_api.encrypt_bytes(b"Passw0rd!", key)
+        assert bytes_api.decrypt_bytes(encrypted, case_info, key) == b"Passw0rd!"
+    assert bytes_api._compiled_key.cache_info().misses == compiled
+    assert bytes_api._tables.cache_info().misses == built
+
+if __name__ == "__main__":
+    print("=== TESTING BYTES API ===")
+    
+    tests = [
+        test_matches_str_api,
+        test_decrypt_arbitrary_ciphertext,
+        test_buffer_types,
+        test_output_buffer,
+        test_output_buffer_errors,
+        test_odd_ciphertext_rejected,
+        test_fillers_removed_on_bytes,
+        test_str_key_matrix_size,
+        test_str_key_compiled_once,
+    ]
+    
+    all_passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            all_passed = False
+            print(f"[FAIL] {test.__name__}: {e}")
+    
+    print(f"\nOverall result: {'ALL PASSED' if all_passed else 'SOME FAILED'}")
@@ -0,0 +1,79 @@
+import sys
+import os
+import random
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import case_codec
+
+def legacy_encode(case_map):
+    """The original string-concatenation encoder, kept as a reference"""
+    case_bits = ''
+    for is_upper in case_map:
+        case_bits += '1' if is_upper else '0'
+    case_encoded = ''
+    for i in range(0, len(case_bits), 4):
+        chunk = case_bits[i:i+4].ljust(4, '0')
+        case_encoded += hex(int(chunk, 2))[2:]
+    return case_encoded
+
+def legacy_decode(case_encoded):
+    """The original per-digit decoder, kept as a reference"""
+    case_bits = ''
+    for c in case_encoded:
+        try:
+            case_bits += bin(int(c, 16))[2:].zfill(4)
+        except ValueError:
+            continue
+    return case_bits
+
+def test_matches_legacy_format():
+    """Encoding and decoding produce exactly the legacy wire format"""
+    rng = random.Random(3)
+    for length in list(range(0, 20)) + [100, 1000]:
+        case_map = [rng.random() < 0.5 for _ in range(length)]
+        encoded = case_codec.encode_case_map(case_map)
+        assert encoded == legacy_encode(case_map), length
+        assert case_codec.decode_case_bits(encoded) == legacy_decode(encoded), length
+
+def test_decode_skips_invalid_digits():
+    """Characters that are not hex digits are ignored like before"""
+    for case_encoded in ["fb", "FB", "f-b", "zz", "", "0x1f", "a_b", " 7 "]:
+        assert case_codec.decode_case_bits(case_encoded) == legacy_decode(case_encoded), case_encoded
+
+def test_pack_case_map():
+    """The first case bit is the most significant bit"""
+    assert case_codec.pack_case_map([True, True, True, True, True, False, True]) == (0b1111101, 7)
+    assert case_codec.pack_case_map([]) == (0, 0)
+
+def test_binary_round_trip():
+    """The compact binary form converts back to the same hex string"""
+    for case_encoded in ["", "f", "fb", "80f", "ac04", "0", "00"]:
+        data = case_codec.case_to_bytes(case_encoded)
+        assert len(data) == 1 + (len(case_encoded) + 1) // 2
+        assert case_codec.case_from_bytes(data) == case_encoded, case_encoded
+
+if __name__ == "__main__":
+    print("=== TESTING CASE ENCODING ===")
+    
+    tests = [
+        test_matches_legacy_format,
+        test_decode_skips_invalid_digits,
+        test_pack_case_map,
+        test_binary_round_trip,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,144 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+
+PASSWORDS = [
+    ("Password123", "SECRET"),
+    ("abcDEF123", "KEY"),
+    ("Tennis", "SPORTS"),
+    ("P@55w0rd", "SECURE"),
+    ("Cyber$3curity", "HACK"),
+    ("WiFi-Security!", "P@55W0RD!"),
+    ("Str0ng#P@ss!", "COMPLEX"),
+    ("{braces}", "CODE"),
+]
+
+def test_positions_match_matrix_scan():
+    """Every matrix character maps to the position find_position would return"""
+    ctx = cipher_context.compile_key("P@55W0RD!")
+    matrix = methods.PT("P@55W0RD!", 7)
+    for char in methods.ALLOWED_CHARS:
+        assert ctx.positions.get(char) == playfair_encrypt.find_position(matrix, char), char
+    assert ctx.matrix_flat == tuple(c for row in matrix for c in row)
+
+def test_context_matches_matrix():
+    """Encrypting with a compiled context gives the same output as with the raw matrix"""
+    for password, key in PASSWORDS:
+        matrix = methods.PT(key, 7)
+        ctx = cipher_context.compile_key(key)
+        expected = playfair_encrypt.encrypt_playfair(password, matrix, key)
+        encrypted, case_info = playfair_encrypt.encrypt_playfair(password, ctx, key)
+        assert (encrypted, case_info) == expected, password
+        
+        decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, key)
+        assert decrypted == playfair_decrypt.decrypt_playfair(encrypted, case_info, matrix, key), password
+        assert playfair_decrypt.decrypt_playfair(encrypted, "", ctx, key) == playfair_decrypt.decrypt_playfair(encrypted, "", matrix, key), password
+
+def test_context_for_other_key():
+    """A context compiled for another key only contributes its matrix"""
+    ctx = cipher_context.compile_key("SECRET")
+    matrix = methods.PT("SECRET", 7)
+    expected = playfair_encrypt.encrypt_playfair("Tennis", matrix, "OTHERKEY")
+    assert playfair_encrypt.encrypt_playfair("Tennis", ctx, "OTHERKEY") == expected
+
+def test_table_engine_matches_lookup():
+    """The digraph table engine produces the same results as the lookup engine"""
+    for password, key in PASSWORDS:
+        lookup_ctx = cipher_context.compile_key(key)
+        table_ctx = cipher_context.compile_key(key, engine="table")
+        encrypted, case_info = playfair_encrypt.encrypt_playfair(password, table_ctx, key)
+        assert (encrypted, case_info) == playfair_encrypt.encrypt_playfair(password, lookup_ctx, key), password
+        decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_info, table_ctx, key)
+        assert decrypted == playfair_decrypt.decrypt_playfair(encrypted, case_info, lookup_ctx, key), password
+
+def test_digraph_tables_are_inverses():
+    """Every digraph survives an encrypt/decrypt table round trip"""
+    ctx = cipher_context.compile_key("C@23#b", engine="table")
+    assert len(ctx.encrypt_table) == 49 * 49
+    for digraph, encrypted in ctx.encrypt_table.items():
+        assert ctx.decrypt_table[encrypted] == digraph, digraph
+        assert encrypted == playfair_encrypt.encrypt_digraph(digraph[0], digraph[1], ctx.matrix, ctx.matrix_flat)
+
+def test_digraph_tables_reject_duplicate_cells():
+    """Matrices with duplicate cells cannot use the table engine"""
+    try:
+        cipher_context.CipherContext([["A", "B"], ["C", "A"]], "SECRET", engine="table")
+    except ValueError:
+        return
+    assert False, "expected ValueError"
+
+def test_key_schedule_expands_key_values():
+    """The schedule cycles the key values, in whole periods, and grows for longer texts"""
+    ctx = cipher_context.compile_key("SECRET", schedule_length=20)
+    schedule = ctx.key_schedule
+    period = len(ctx.key_values)
+    assert schedule.period == period and len(schedule) == 24
+    
+    short = schedule.expand(10)
+    long = schedule.expand(1000)
+    assert len(long) >= 1000 and len(long) % period == 0
+    assert all(long[i] == ctx.key_values[i % period] for i in range(len(long)))
+    assert bytes(short[:24]) == bytes(long[:24])
+    assert schedule.expand(500) is long
+
+def test_key_schedule_buffer():
+    """A buffer holding the schedule is used in place; any other buffer is rejected"""
+    values = cipher_context.expand_key_values(cipher_context.generate_key_values("SECRET"), 48)
+    ctx = cipher_context.compile_key("SECRET", schedule_buffer=bytearray(values))
+    assert isinstance(ctx.key_schedule.expand(48), memoryview)
+    assert playfair_encrypt.encrypt_playfair("Tennis", ctx, "SECRET") == \
+        playfair_encrypt.encrypt_playfair("Tennis", cipher_context.compile_key("SECRET"), "SECRET")
+    
+    for buffer in (values[:-1], cipher_context.expand_key_values(cipher_context.generate_key_values("OTHER"), 48)):
+        try:
+            cipher_context.compile_key("SECRET", schedule_buffer=buffer)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("a buffer with another schedule was accepted")
+
+def test_transform_accepts_schedule():
+    """The ASCII transformation gives the same result with key values or a schedule"""
+    ctx = cipher_context.compile_key("SECRET")
+    text = "H$I8*KTX" * 50
+    schedule = ctx.key_schedule.expand(len(text))
+    transformed = playfair_encrypt.apply_ascii_transform(text, "SECRET")
+    assert playfair_encrypt.apply_ascii_transform(text, None, schedule) == transformed
+    assert playfair_decrypt.reverse_ascii_transform(transformed, None, schedule) == text
+    assert playfair_decrypt.reverse_ascii_transform(transformed, "SECRET") == text
+
+if __name__ == "__main__":
+    print("=== TESTING COMPILED CIPHER CONTEXT ===")
+    
+    tests = [
+        test_positions_match_matrix_scan,
+        test_context_matches_matrix,
+        test_context_for_other_key,
+        test_table_engine_matches_lookup,
+        test_digraph_tables_are_inverses,
+        test_digraph_tables_reject_duplicate_cells,
+        test_key_schedule_expands_key_values,
+        test_key_schedule_buffer,
+        test_transform_accepts_schedule,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,175 @@
+import sys
+import os
+import pstats
+import tempfile
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair
+import playfair_encrypt
+
+PASSWORDS = ["Password123", "abcDEF123", "Tennis", "P@55w0rd", "WiFi-Security!"]
+
+def run_cli(args, input_text):
+    """Run the command line interface on an input file and return (status, output)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "in.txt")
+        output_path = os.path.join(tmp, "out.txt")
+        with open(input_path, 'w') as f:
+            f.write(input_text)
+        status = playfair.main(args + ["--in", input_path, "--out", output_path])
+        with open(output_path, 'r') as f:
+            return status, f.read()
+
+def test_encrypt_tsv_matches_library():
+    """Each TSV record holds the encrypt_playfair result for its line"""
+    status, output = run_cli(["encrypt", "--key", "SECRET"], "\n".join(PASSWORDS) + "\n")
+    assert status == 0
+    matrix = methods.PT("SECRET", 7)
+    expected = "".join(f"{e}\t{c}\n" for e, c in (playfair_encrypt.encrypt_playfair(p, matrix, "SECRET") for p in PASSWORDS))
+    assert output == expected
+
+def test_workers_match_sequential():
+    """Running with worker processes writes the same records in the same order"""
+    input_text = "\n".join(PASSWORDS * 20) + "\n"
+    sequential = run_cli(["encrypt", "--key", "SECRET"], input_text)
+    assert run_cli(["encrypt", "--key", "SECRET", "--workers", "2", "--chunk-size", "3"], input_text) == sequential
+
+def test_round_trip_both_formats():
+    """Decrypting the encrypt output restores the passwords"""
+    for fmt in ("tsv", "jsonl"):
+        status, encrypted = run_cli(["encrypt", "--key", "COMPLEX", "--format", fmt], "\n".join(PASSWORDS) + "\n")
+        assert status == 0
+        status, decrypted = run_cli(["decrypt", "--key", "COMPLEX", "--format", fmt], encrypted)
+        assert status == 0
+        if fmt == "tsv":
+            assert decrypted.splitlines() == PASSWORDS, fmt
+        else:
+            assert decrypted.count('"decrypted"') == len(PASSWORDS), fmt
+
+def test_format_version_2_round_trip():
+    """--format-version 2 writes the filler information, and decrypt uses it to keep real X characters"""
+    passwords = ["AXA", "TaXi_xIt", "boXb", "Tennis"]
+    for fmt in ("tsv", "jsonl"):
+        status, encrypted = run_cli(["encrypt", "--key", "SECRET", "--format", fmt, "--format-version", "2"],
+                                    "\n".join(passwords) + "\n")
+        assert status == 0
+        records = [playfair.parse_encrypted(line, fmt) for line in encrypted.splitlines()]
+        assert records == playfair_encrypt.encrypt_many(passwords, "SECRET", format_version=2), fmt
+        for workers in ("1", "2"):
+            status, decrypted = run_cli(["decrypt", "--key", "SECRET", "--format", fmt, "--workers", workers],
+                                        encrypted)
+            assert status == 0
+            if fmt == "tsv":
+                assert decrypted.splitlines() == passwords, (fmt, workers)
+    
+    # Fixed-width records have no room for the filler information
+    assert playfair.main(["encrypt", "--key", "SECRET", "--format", "fixed", "--format-version", "2",
+                          "--in", "in.dat", "--out", "out.dat"]) == 2
+
+def test_matrix_size_round_trip():
+    """--matrix-size 10 accepts passwords the 7x7 matrix rejects, with and without workers"""
+    passwords = ["Ünïcode{}<Pass>", "Tennis", "ÀÖ[x]|~"]
+    input_text = "\n".join(passwords) + "\n"
+    status, _ = run_cli(["encrypt", "--key", "SECRET"], input_text)
+    assert status == 1
+    
+    ctx = cipher_context.compile_key("SECRET", 10)
+    for fmt in ("tsv", "jsonl"):
+        for workers in ("1", "2"):
+            options = ["--key", "SECRET", "--format", fmt, "--matrix-size", "10", "--workers", workers]
+            status, encrypted = run_cli(["encrypt"] + options, input_text)
+            assert status == 0
+            records = [playfair.parse_encrypted(line, fmt) for line in encrypted.splitlines()]
+            assert records == [playfair_encrypt.encrypt_playfair(p, ctx, "SECRET") for p in passwords], (fmt, workers)
+            status, decrypted = run_cli(["decrypt"] + options, encrypted)
+            assert status == 0
+            if fmt == "tsv":
+                assert decrypted.splitlines() == passwords, (fmt, workers)
+
+def test_fixed_width_round_trip():
+    """--format fixed encrypts and decrypts fixed-width record files"""
+    input_text = "".join(p.ljust(16) + "\n" for p in PASSWORDS)
+    status, encrypted = run_cli(["encrypt", "--key", "SECRET", "--format", "fixed"], input_text)
+    assert status == 0
+    assert {len(line) for line in encrypted.splitlines()} == {32 + 1 + 8}
+    for extra in ([], ["--no-mmap-output"]):
+        status, decrypted = run_cli(["decrypt", "--key", "SECRET", "--format", "fixed"] + extra, encrypted)
+        assert status == 0
+        assert decrypted == input_text
+
+def test_profile_outputs():
+    """--profile writes a pstats file and collapsed stacks rooted at the run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, "run")
+        status, output = run_cli(["encrypt", "--key", "SECRET", "--profile", prefix, "--profile-top", "3"],
+                                 "\n".join(PASSWORDS * 50) + "\n")
+        assert status == 0 and len(output.splitlines()) == len(PASSWORDS) * 50
+        
+        stats = pstats.Stats(prefix + ".pstats")
+        assert any(name == "encrypt_playfair" for _, _, name in stats.stats)
+        with open(prefix + ".collapsed") as f:
+            lines = f.read().splitlines()
+        assert lines
+        for line in lines:
+            stack, micros = line.rsplit(" ", 1)
+            assert stack.startswith("playfair.py:run:") and int(micros) > 0, line
+        assert any("playfair_encrypt.py:encrypt_playfair:" in line for line in lines)
+
+def test_invalid_worker_options():
+    """Negative worker counts and empty chunks are usage errors with exit status 2"""
+    for options in (["--workers", "-1"], ["--workers", "2", "--chunk-size", "0"], ["--chunk-size", "-3"]):
+        try:
+            playfair.main(["encrypt", "--key", "SECRET"] + options)
+            assert False, f"{options} accepted"
+        except SystemExit as e:
+            assert e.code == 2, options
+
+def test_invalid_records():
+    """Invalid passwords stop the run unless --skip-invalid is given"""
+    status, output = run_cli(["encrypt", "--key", "SECRET"], "Tennis\nbad pw\nSecret\n")
+    assert status == 1 and len(output.splitlines()) == 1
+    status, output = run_cli(["encrypt", "--key", "SECRET", "--skip-invalid"], "Tennis\nbad pw\nSecret\n")
+    assert status == 0 and len(output.splitlines()) == 2
+    
+    # A blank line is an invalid record, not an empty one
+    for workers in ("1", "2"):
+        status, output = run_cli(["encrypt", "--key", "SECRET", "--workers", workers], "Tennis\n\nSecret\n")
+        assert status == 1 and len(output.splitlines()) == 1, workers
+        status, output = run_cli(["encrypt", "--key", "SECRET", "--workers", workers, "--skip-invalid"],
+                                 "Tennis\n\nSecret\n")
+        assert status == 0 and len(output.splitlines()) == 2, workers
+        status, decrypted = run_cli(["decrypt", "--key", "SECRET"], output)
+        assert decrypted.splitlines() == ["Tennis", "Secret"], workers
+
+if __name__ == "__main__":
+    print("=== TESTING COMMAND LINE INTERFACE ===")
+    
+    tests = [
+        test_encrypt_tsv_matches_library,
+        test_workers_match_sequential,
+        test_round_trip_both_formats,
+        test_format_version_2_round_trip,
+        test_matrix_size_round_trip,
+        test_fixed_width_round_trip,
+        test_profile_outputs,
+        test_invalid_worker_options,
+        test_invalid_records,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,100 @@
+import sys
+import os
+import operator
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+import shuffle_cache
+from helpers import random_texts
+
+KEYS = ["SECRET", "P@55W0RD!", "COMPLEX"]
+
+# Characters of the random passwords
+PASSWORD_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()_+-"
+
+def test_context_is_immutable():
+    """Attributes cannot be reassigned and the tables cannot be modified"""
+    ctx = cipher_context.compile_key("SECRET", engine="table")
+    for attempt in [lambda: setattr(ctx, "secret_key", "OTHER"),
+                    lambda: setattr(ctx, "extra", 1),
+                    lambda: delattr(ctx, "matrix")]:
+        try:
+            attempt()
+            assert False, "attribute changed"
+        except AttributeError:
+            pass
+    for attempt in [lambda: operator.setitem(ctx.positions, "A", (0, 0)),
+                    lambda: operator.setitem(ctx.encrypt_table, "AB", "CD"),
+                    lambda: operator.setitem(ctx.matrix[0], 0, "?")]:
+        try:
+            attempt()
+            assert False, "table changed"
+        except TypeError:
+            pass
+    
+    copy = pickle.loads(pickle.dumps(ctx))
+    assert copy.matrix == ctx.matrix and copy.key_values == ctx.key_values and copy.engine == "table"
+
+def test_threads_share_contexts():
+    """Many threads encrypting and decrypting with shared contexts get the sequential results"""
+    passwords = random_texts(PASSWORD_CHARS, 400, seed=14, min_length=1, max_length=40)
+    contexts = [cipher_context.compile_key(key, engine=engine) for key in KEYS for engine in cipher_context.ENGINES]
+    expected = {}
+    for i, ctx in enumerate(contexts):
+        for password in passwords:
+            encrypted, case_info = playfair_encrypt.encrypt_playfair(password, ctx, ctx.secret_key)
+            decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, ctx.secret_key)
+            expected[(i, password)] = (encrypted, case_info, decrypted)
+    
+    # A small shared cache keeps the threads evicting each other's permutations
+    shuffle_cache.default_cache.clear()
+    shuffle_cache.default_cache.resize(16)
+    previous_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        def work(n):
+            i = n % len(contexts)
+            ctx = contexts[i]
+            password = passwords[n % len(passwords)]
+            encrypted, case_info = playfair_encrypt.encrypt_playfair(password, ctx, ctx.secret_key)
+            decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, ctx.secret_key)
+            return (encrypted, case_info, decrypted) == expected[(i, password)]
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(work, range(6000)))
+    finally:
+        sys.setswitchinterval(previous_interval)
+        shuffle_cache.default_cache.resize(shuffle_cache.DEFAULT_CACHE_SIZE)
+    
+    assert all(results), results.count(False)
+    stats = shuffle_cache.default_cache.stats()
+    assert stats["hits"] + stats["misses"] == 2 * 6000
+    assert stats["size"] <= 16
+
+if __name__ == "__main__":
+    print("=== TESTING THREAD SAFETY ===")
+    
+    tests = [
+        test_context_is_immutable,
+        test_threads_share_contexts,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
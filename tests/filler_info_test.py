@@ -0,0 +1,110 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+from helpers import random_texts
+
+# Passwords where the legacy filler heuristic drops a real X
+AMBIGUOUS = ["AXA", "boXb", "TaXi_xIt", "XxX", "aXAXa", "TAXXI", "ab1X1"]
+
+def filler_rich(charset):
+    """An alphabet over a charset rich in X and doubled letters"""
+    return charset + charset.lower() + "XXXxxAAa"
+
+def test_filler_positions():
+    """filler_positions marks exactly the fillers prepare_message inserts"""
+    for message in random_texts(filler_rich(methods.ALLOWED_CHARS), 500, seed=1) + AMBIGUOUS:
+        digraphs, case_map = playfair_encrypt.prepare_message(message)
+        joined = ''.join(digraphs)
+        positions = playfair_encrypt.filler_positions(message.upper())
+        assert len(positions) == len(case_map) - len(message), message
+        assert all(joined[k] == 'X' for k in positions), message
+        kept = [c for k, c in enumerate(joined) if k not in positions]
+        assert ''.join(kept) == message.upper(), message
+
+def test_round_trip_is_exact():
+    """Format version 2 round-trips every password, with fused and staged kernels"""
+    for size in (7, 10):
+        for engine in cipher_context.ENGINES:
+            ctx = cipher_context.compile_key("P@55W0RD!", size, engine=engine)
+            for password in random_texts(filler_rich(''.join(ctx.matrix_flat)), 200, seed=size) + AMBIGUOUS:
+                for fused in (True, False):
+                    encrypted, case_info, filler_info = playfair_encrypt.encrypt_playfair(
+                        password, ctx, ctx.secret_key, fused=fused, format_version=2)
+                    decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, ctx.secret_key,
+                                                                  fused=fused, filler_info=filler_info)
+                    assert decrypted == password, (size, engine, fused, password, decrypted)
+
+def test_version_1_unchanged():
+    """Format version 2 adds the filler information without changing the other outputs"""
+    ctx = cipher_context.compile_key("SECRET")
+    for password in random_texts(filler_rich(methods.ALLOWED_CHARS), 200, seed=3):
+        result = playfair_encrypt.encrypt_playfair(password, ctx, "SECRET", format_version=2)
+        assert result[:2] == playfair_encrypt.encrypt_playfair(password, ctx, "SECRET"), password
+        assert len(result[2]) == (len(result[0]) + 3) // 4, password
+
+def test_legacy_heuristic_kept():
+    """Without filler information the heuristic path is used, X-ambiguities included"""
+    ctx = cipher_context.compile_key("SECRET")
+    encrypted, case_info, filler_info = playfair_encrypt.encrypt_playfair("AXA", ctx, "SECRET", format_version=2)
+    assert playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, "SECRET") == "AA"
+    assert playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, "SECRET", filler_info=filler_info) == "AXA"
+
+def test_drop_fillers():
+    """Only the marked positions are dropped; marks beyond the text are ignored"""
+    cases = [
+        ("AXAX", "1", "AXA"),
+        ("AXAX", "5", "AA"),
+        ("AXAX", "0", "AXAX"),
+        ("AXAX", "", "AXAX"),
+        ("AB", "ff", ""),
+        ("", "8", ""),
+    ]
+    for decrypted, filler_info, expected in cases:
+        assert playfair_decrypt.drop_fillers(decrypted, filler_info) == expected, (decrypted, filler_info)
+
+def test_batches():
+    """encrypt_many and decrypt_many pass the filler information through"""
+    records = playfair_encrypt.encrypt_many(AMBIGUOUS, "SECRET", format_version=2)
+    assert all(len(record) == 3 for record in records)
+    assert playfair_decrypt.decrypt_many(records, "SECRET") == AMBIGUOUS
+
+def test_unsupported_version_rejected():
+    """Format versions other than 1 and 2 raise ValueError"""
+    for version in (0, 3, "2"):
+        try:
+            playfair_encrypt.encrypt_playfair("Password", methods.PT("SECRET", 7), "SECRET", format_version=version)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"format version {version!r} was accepted")
+
+if __name__ == "__main__":
+    print("=== TESTING FILLER INFORMATION ===")
+    
+    tests = [
+        test_filler_positions,
+        test_round_trip_is_exact,
+        test_version_1_unchanged,
+        test_legacy_heuristic_kept,
+        test_drop_fillers,
+        test_batches,
+        test_unsupported_version_rejected,
+    ]
+    
+    all_passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            all_passed = False
+            print(f"[FAIL] {test.__name__}: {e}")
+    
+    print(f"\nOverall result: {'ALL PASSED' if all_passed else 'SOME FAILED'}")
@@ -0,0 +1,85 @@
+import sys
+import os
+import random
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+from helpers import outcome
+
+def test_fused_encrypt_matches_stages():
+    """The fused kernel gives the output (or error) of the separate stages"""
+    rng = random.Random(1)
+    for size in (7, 8, 10):
+        for engine in cipher_context.ENGINES:
+            ctx = cipher_context.compile_key("P@55W0RD!", size, engine=engine)
+            charset = methods.charset(size)
+            for _ in range(300):
+                message = ''.join(rng.choice(charset + charset.lower() + "XXxaa ~") for _ in range(rng.randint(0, 20)))
+                expected = outcome(playfair_encrypt.encrypt_playfair, message, ctx, ctx.secret_key, fused=False)
+                assert outcome(playfair_encrypt.encrypt_fused, message, ctx) == expected, (size, engine, message)
+
+def test_fused_decrypt_matches_stages():
+    """The fused kernel decrypts any even-length input like the separate stages"""
+    rng = random.Random(2)
+    for size in (7, 10):
+        for engine in cipher_context.ENGINES:
+            ctx = cipher_context.compile_key("P@55W0RD!", size, engine=engine)
+            for _ in range(300):
+                encrypted = ''.join(rng.choice(ctx.ring + "~") for _ in range(2 * rng.randint(0, 10)))
+                case_info = ''.join(rng.choice("0123456789abcdefz") for _ in range(rng.randint(0, 5)))
+                expected = outcome(playfair_decrypt.decrypt_playfair, encrypted, case_info, ctx, ctx.secret_key,
+                                   fused=False)
+                assert outcome(playfair_decrypt.decrypt_fused, encrypted, case_info, ctx) == expected, \
+                    (size, engine, encrypted, case_info)
+
+def test_odd_length_ciphertext():
+    """Odd lengths raise the same ValueError on the fused and staged paths"""
+    ctx = cipher_context.compile_key("SECRET")
+    expected = ("ValueError", "The encrypted message has an odd number of characters.")
+    assert outcome(playfair_decrypt.decrypt_fused, "ABC", "", ctx) == expected
+    assert outcome(playfair_decrypt.decrypt_playfair, "ABC", "", ctx, "SECRET") == expected
+    assert outcome(playfair_decrypt.decrypt_playfair, "ABC", "", ctx, "SECRET", fused=False) == expected
+
+def test_remove_fillers():
+    """Fillers between equal letters and at the end are dropped, other X are kept"""
+    cases = {
+        "": "",
+        "AXA": "AA",
+        "AXB": "AXB",
+        "ABAX": "ABA",
+        "XAXA": "XAA",
+        "AXXA": "AXXA",
+        "AXAXA": "AAA",
+        "aXA": "aA",
+        "XX": "X",
+        "X": "X",
+        "TENXNIS": "TENNIS",
+    }
+    for decrypted, expected in cases.items():
+        assert playfair_decrypt.remove_fillers(decrypted) == expected, decrypted
+
+if __name__ == "__main__":
+    print("=== TESTING FUSED KERNELS ===")
+    
+    tests = [
+        test_fused_encrypt_matches_stages,
+        test_fused_decrypt_matches_stages,
+        test_odd_length_ciphertext,
+        test_remove_fillers,
+    ]
+    
+    all_passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            all_passed = False
+            print(f"[FAIL] {test.__name__}: {e}")
+    
+    print(f"\nOverall result: {'ALL PASSED' if all_passed else 'SOME FAILED'}")
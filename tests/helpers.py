@@ -0,0 +1,39 @@
+import random
+
+# Helpers shared by the test scripts. The scripts run from this directory or
+# under pytest, which both put it on sys.path, so "import helpers" works.
+
+def outcome(func, *args, errors=ValueError, **kwargs):
+    """
+    Call a function, turning the errors it raises into comparable values
+    
+    Args:
+        func: The function to call
+        *args: Its positional arguments
+        errors: Exception type(s) to catch
+        **kwargs: Its keyword arguments
+    
+    Returns:
+        The result of the call, or a tuple (type name, message) of the error
+    """
+    try:
+        return func(*args, **kwargs)
+    except errors as e:
+        return type(e).__name__, str(e)
+
+def random_texts(alphabet, count, seed, min_length=0, max_length=20):
+    """
+    Generate reproducible random texts over an alphabet
+    
+    Args:
+        alphabet: Characters to draw from (repeat a character to favour it)
+        count: Number of texts
+        seed: Seed of the random generator
+        min_length: Shortest text length
+        max_length: Longest text length
+    
+    Returns:
+        A list of count texts
+    """
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(min_length, max_length))) for _ in range(count)]
@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cipher_context
+import instrumentation
+import playfair_encrypt
+import playfair_decrypt
+
+def test_every_stage_is_reported():
+    """Encryption and decryption report each stage once per call"""
+    ctx = cipher_context.compile_key("SECRET")
+    calls = []
+    encrypted, case_info = playfair_encrypt.encrypt_playfair("Password123", ctx, "SECRET",
+                                                             instrument=lambda *a: calls.append(a))
+    assert [c[0] for c in calls] == ["prepare", "digraph", "transform", "case", "shuffle"]
+    assert all(seconds >= 0 for _, seconds, _ in calls)
+    assert calls[1][2] == 6  # "Password123" is split into 6 digraphs
+    
+    calls.clear()
+    playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, "SECRET", instrument=lambda *a: calls.append(a))
+    assert sorted(c[0] for c in calls) == sorted(instrumentation.STAGES)
+
+def test_stage_stats_report():
+    """StageStats aggregates calls, items and percentiles per stage"""
+    stats = instrumentation.StageStats()
+    ctx = cipher_context.compile_key("SECRET")
+    for password in ["Tennis", "Secret", "P@55w0rd"] * 10:
+        playfair_encrypt.encrypt_playfair(password, ctx, "SECRET", instrument=stats)
+    report = stats.report()
+    assert set(report) == set(instrumentation.STAGES)
+    assert report["prepare"]["calls"] == 30
+    assert report["case"]["items"] == 10 * (8 + 6 + 10)  # one case bit per prepared character
+    assert report["shuffle"]["p50_us"] <= report["shuffle"]["p99_us"]
+
+def test_percentile():
+    """Nearest-rank percentiles"""
+    values = list(range(1, 101))
+    assert instrumentation.percentile(values, 50) == 50
+    assert instrumentation.percentile(values, 99) == 99
+    assert instrumentation.percentile([7], 99) == 7
+
+if __name__ == "__main__":
+    print("=== TESTING STAGE INSTRUMENTATION ===")
+    
+    tests = [
+        test_every_stage_is_reported,
+        test_stage_stats_report,
+        test_percentile,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,99 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+
+def test_cached_matrix_is_a_copy():
+    """Modifying a returned matrix does not change the cached one"""
+    cache = methods.MatrixCache()
+    matrix = cache.get("SECRET", 7)
+    assert matrix == methods.build_matrix("SECRET", 7)
+    matrix[0][0] = "?"
+    assert cache.get("SECRET", 7) == methods.build_matrix("SECRET", 7)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_lru_eviction_and_invalidation():
+    """The least recently used entries are evicted; invalidate drops one key or all"""
+    cache = methods.MatrixCache(maxsize=2)
+    cache.get("KEYONE", 7)
+    cache.get("KEYTWO", 7)
+    cache.get("KEYONE", 7)
+    cache.get("KEYTHREE", 7)  # Evicts KEYTWO
+    assert cache.stats()["evictions"] == 1
+    cache.get("KEYONE", 7)
+    assert cache.stats()["hits"] == 2
+    
+    assert cache.invalidate("KEYONE") == 1
+    assert cache.invalidate("KEYONE") == 0
+    assert cache.invalidate() == 1
+    stats = cache.stats()
+    assert stats["size"] == 0 and stats["invalidations"] == 2
+    
+    cache.resize(0)
+    cache.get("KEYONE", 7)
+    assert cache.stats()["size"] == 0
+
+def test_keys_are_sanitized():
+    """Keys differing only in case share an entry, and invalidate finds it"""
+    cache = methods.MatrixCache()
+    assert cache.get("secret", 7) == cache.get("SECRET", 7) == methods.build_matrix("SECRET", 7)
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["size"] == 1
+    assert cache.invalidate("Secret") == 1
+    assert cache.stats()["size"] == 0
+
+def test_invalid_keys_are_not_cached():
+    """An invalid key raises on every call"""
+    cache = methods.MatrixCache()
+    for _ in range(2):
+        try:
+            cache.get("bad key", 7)
+            assert False, "invalid key accepted"
+        except ValueError:
+            pass
+    assert cache.stats()["size"] == 0
+
+def test_concurrent_lookups():
+    """Concurrent lookups from many threads return the right matrices"""
+    cache = methods.MatrixCache(maxsize=8)
+    keys = [f"TENANT{i}" for i in range(20)]
+    expected = {key: methods.build_matrix(key, 7) for key in keys}
+
+    def lookup(i):
+        key = keys[i % len(keys)]
+        return cache.get(key, 7) == expected[key]
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(lookup, range(2000)))
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 2000
+    assert stats["size"] <= 8
+
+if __name__ == "__main__":
+    print("=== TESTING MATRIX CACHE ===")
+    
+    tests = [
+        test_cached_matrix_is_a_copy,
+        test_lru_eviction_and_invalidation,
+        test_keys_are_sanitized,
+        test_invalid_keys_are_not_cached,
+        test_concurrent_lookups,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,135 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+import vectorized
+
+SIZES = range(methods.STANDARD_MATRIX_SIZE, methods.MAX_MATRIX_SIZE + 1)
+
+# Passwords without X or doubled letters, so filler removal is exact
+PASSWORDS = [
+    "Password123",
+    "{braces}[brackets]",
+    "a<b>c|d;e:f,g.h?i~j`k'l\"m=n/o\\p",
+    "CaféÉtéÑandú",
+    "¡Olé!¢5ÆØÞþ",
+]
+
+def test_matrices_have_distinct_characters():
+    """Every supported size fills its cells with distinct characters, without '.' padding for 7x7"""
+    for size in SIZES:
+        matrix = methods.PT("SECRET", size)
+        cells = [c for row in matrix for c in row]
+        assert len(cells) == size * size and len(set(cells)) == len(cells), size
+        assert set(cells) <= set(methods.charset(size)), size
+    assert '.' not in methods.PT("SECRET", 7)[-1]
+    assert methods.PT("SECRET", 8)[-1][-1] == methods.EXTENDED_CHARS[14]
+
+def test_unsupported_size_rejected():
+    """Sizes beyond MAX_MATRIX_SIZE raise ValueError"""
+    for size in (0, methods.MAX_MATRIX_SIZE + 1):
+        try:
+            methods.PT("SECRET", size)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"size {size} was accepted")
+
+def test_shift_tables():
+    """The precomputed shift tables match the modular shift rules"""
+    for size in SIZES:
+        rows_down, cols_right, rows_up, cols_left = cipher_context.shift_tables(size)
+        for i in range(size):
+            assert rows_down[i] == (i + 2) % size and rows_up[i] == (i - 2) % size
+            assert cols_right[i] == (i + 3) % size and cols_left[i] == (i - 3) % size
+            assert rows_up[rows_down[i]] == i and cols_left[cols_right[i]] == i
+
+def test_standard_context_unchanged():
+    """A 7x7 context keeps the original ring and allowed characters"""
+    ctx = cipher_context.compile_key("SECRET")
+    assert ctx.ring == cipher_context.TRANSFORM_CHARS
+    assert ctx.allowed is methods.ALLOWED_SET
+
+def test_extended_contexts_cover_their_charset():
+    """Every character of a larger matrix is in its ring, and no digraph needs a fallback"""
+    for size in SIZES[1:]:
+        ctx = cipher_context.compile_key("SECRET", size, engine="table")
+        assert set(ctx.matrix_flat) <= set(ctx.ring), size
+        assert len(set(ctx.ring)) == len(ctx.ring), size
+        for c1 in ctx.matrix_flat:
+            for c2 in ctx.matrix_flat:
+                encrypted = playfair_encrypt.encrypt_digraph(c1, c2, ctx, ctx.matrix_flat)
+                assert encrypted == ctx.encrypt_table[c1 + c2]
+                assert playfair_decrypt.decrypt_digraph(encrypted[0], encrypted[1], ctx) == c1 + c2
+
+def test_round_trip():
+    """Passwords using the extended characters round-trip with both engines"""
+    for size in SIZES[3:]:
+        for engine in cipher_context.ENGINES:
+            ctx = cipher_context.compile_key("P@55W0RD!", size, engine=engine)
+            for password in PASSWORDS:
+                encrypted, case_info = playfair_encrypt.encrypt_playfair(password, ctx, ctx.secret_key)
+                assert playfair_decrypt.validate_encrypted(encrypted, ctx) is None
+                decrypted = playfair_decrypt.decrypt_playfair(encrypted, case_info, ctx, ctx.secret_key)
+                assert decrypted == password, (size, engine, password, decrypted)
+
+def test_validation_follows_matrix_size():
+    """Extended characters are accepted for larger matrices only, and never in keys"""
+    assert not methods.validate_input("a~b")[0]
+    assert methods.validate_input("a~b", matrix_size=8)[0]
+    assert not methods.validate_input("é", matrix_size=8)[0]
+    assert methods.validate_input("é", matrix_size=10)[0]
+    assert not methods.validate_input("KEY~", is_key=True, matrix_size=10)[0]
+    
+    ctx = cipher_context.compile_key("SECRET", 8)
+    for message in ("pass word", "pass€"):
+        try:
+            playfair_encrypt.encrypt_playfair(message, ctx, ctx.secret_key)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{message!r} was accepted")
+
+def test_vectorized_matches_extended():
+    """The batch transform and substitution handle the extended rings"""
+    ctx = cipher_context.compile_key("SECRET", 10)
+    prepared = [''.join(playfair_encrypt.prepare_message(p)[0]) for p in PASSWORDS]
+    
+    texts = [playfair_encrypt.apply_ascii_transform(p, None, ctx.key_values, ctx.ring) for p in prepared]
+    assert vectorized.apply_ascii_transform_batch(prepared, ctx) == texts
+    assert vectorized.reverse_ascii_transform_batch(texts, ctx) == prepared
+    
+    encrypted = vectorized.encrypt_digraphs_batch(prepared, ctx)
+    assert encrypted == vectorized.encrypt_digraphs_batch(prepared, ctx, use_numpy=False)
+    assert vectorized.decrypt_digraphs_batch(encrypted, ctx) == prepared
+
+if __name__ == "__main__":
+    print("=== TESTING MATRIX SIZES ===")
+    
+    tests = [
+        test_matrices_have_distinct_characters,
+        test_unsupported_size_rejected,
+        test_shift_tables,
+        test_standard_context_unchanged,
+        test_extended_contexts_cover_their_charset,
+        test_round_trip,
+        test_validation_follows_matrix_size,
+        test_vectorized_matches_extended,
+    ]
+    
+    all_passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            all_passed = False
+            print(f"[FAIL] {test.__name__}: {e}")
+    
+    print(f"\nOverall result: {'ALL PASSED' if all_passed else 'SOME FAILED'}")
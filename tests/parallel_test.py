@@ -0,0 +1,71 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parallel
+import playfair_encrypt
+
+PASSWORDS = ["Password123", "abcDEF123", "Tennis", "Secret", "P@55w0rd", "Cyber$3curity", "WiFi-Security!", "Str0ng#P@ss!"] * 25
+
+def schedule_source(ctx, record):
+    """Report whether a worker's key schedule is the shared buffer, and its length"""
+    return isinstance(ctx.key_schedule.expand(0), memoryview), len(ctx.key_schedule)
+
+def test_workers_share_key_schedule():
+    """Workers read the key schedule from shared memory and grow a copy for long records"""
+    results = list(parallel.map_parallel(schedule_source, range(4), "SECRET", workers=2, chunk_size=1,
+                                         schedule_length=30))
+    assert results == [(True, 36)] * 4
+    
+    long_passwords = ["Tennis" * 20, "Password123" * 10]
+    results = list(parallel.map_parallel(parallel.encrypt_record, long_passwords, "SECRET", workers=2,
+                                         schedule_length=30))
+    assert results == playfair_encrypt.encrypt_many(long_passwords, "SECRET")
+
+def test_parallel_matches_sequential():
+    """Parallel results are identical to encrypt_many and keep input order"""
+    expected = playfair_encrypt.encrypt_many(PASSWORDS, "SECRET")
+    results = list(parallel.encrypt_parallel(iter(PASSWORDS), "SECRET", workers=2, chunk_size=7, max_in_flight=2))
+    assert results == expected
+    assert list(parallel.decrypt_parallel(results, "SECRET", workers=2, chunk_size=16)) == PASSWORDS
+
+def test_parallel_format_version_2():
+    """encrypt_parallel emits filler information that decrypt_parallel uses"""
+    passwords = ["AXA", "TaXi_xIt", "Tennis"] * 5
+    records = list(parallel.encrypt_parallel(passwords, "SECRET", workers=2, chunk_size=4, format_version=2))
+    assert records == playfair_encrypt.encrypt_many(passwords, "SECRET", format_version=2)
+    assert list(parallel.decrypt_parallel(records, "SECRET", workers=2, chunk_size=4)) == passwords
+
+def test_parallel_reports_invalid_records():
+    """An invalid password yields its error without stopping the run"""
+    results = list(parallel.encrypt_parallel(["Tennis", "bad pw", "Secret", ""], "SECRET", workers=2, chunk_size=1))
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[3], ValueError)
+    assert results[0] == playfair_encrypt.encrypt_many(["Tennis"], "SECRET")[0]
+    assert results[2] == playfair_encrypt.encrypt_many(["Secret"], "SECRET")[0]
+
+if __name__ == "__main__":
+    print("=== TESTING PARALLEL ENCRYPTION ===")
+    
+    tests = [
+        test_parallel_matches_sequential,
+        test_parallel_reports_invalid_records,
+        test_parallel_format_version_2,
+        test_workers_share_key_schedule,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,119 @@
+import sys
+import os
+import random
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+import rekey
+from helpers import outcome
+
+OLD_KEY = "SECRET"
+NEW_KEY = "R0TATED!"
+OLD_CTX = cipher_context.compile_key(OLD_KEY, engine="table")
+NEW_CTX = cipher_context.compile_key(NEW_KEY, engine="table")
+
+def two_call_rekey(ciphertext, case_info, old_key, new_key):
+    """The reference path: decrypt with the old key, encrypt with the new one"""
+    decrypted = playfair_decrypt.decrypt_playfair(ciphertext, case_info, methods.PT(old_key, 7), old_key)
+    return playfair_encrypt.encrypt_playfair(decrypted, methods.PT(new_key, 7), new_key)
+
+def test_matches_two_call_path():
+    """Re-encrypting real records gives the decrypt-then-encrypt output"""
+    rng = random.Random(10)
+    chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()_+-xXll"
+    passwords = [''.join(rng.choice(chars) for _ in range(rng.randint(0, 30))) for _ in range(500)]
+    records = playfair_encrypt.encrypt_many(passwords, OLD_KEY)
+    for ciphertext, case_info in records:
+        assert rekey.rekey(ciphertext, case_info, OLD_CTX, NEW_CTX) == two_call_rekey(ciphertext, case_info, OLD_KEY, NEW_KEY)
+    assert rekey.rekey_many(records, OLD_KEY, NEW_KEY) == [two_call_rekey(c, h, OLD_KEY, NEW_KEY) for c, h in records]
+
+def test_matches_two_call_path_on_arbitrary_input():
+    """Arbitrary ciphertexts and case information give the same result or the same error"""
+    rng = random.Random(11)
+    for _ in range(1000):
+        ciphertext = ''.join(rng.choice(methods.ALLOWED_CHARS + "~ ") for _ in range(rng.randint(0, 24)))
+        case_info = ''.join(rng.choice("0123456789abcdefz") for _ in range(rng.randint(0, 6)))
+        expected = outcome(two_call_rekey, ciphertext, case_info, OLD_KEY, NEW_KEY)
+        assert outcome(rekey.rekey, ciphertext, case_info, OLD_CTX, NEW_CTX) == expected, (ciphertext, case_info)
+
+def test_does_not_use_two_call_path():
+    """rekey runs its own kernel rather than decrypt_playfair followed by encrypt_playfair"""
+    records = playfair_encrypt.encrypt_many(["Password123", "balloon", "aXa"], OLD_KEY)
+    expected = [two_call_rekey(c, h, OLD_KEY, NEW_KEY) for c, h in records]
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("the two-call path was used")
+    
+    saved = playfair_decrypt.decrypt_playfair, playfair_encrypt.encrypt_playfair
+    playfair_decrypt.decrypt_playfair = playfair_encrypt.encrypt_playfair = forbidden
+    try:
+        assert rekey.rekey_many(records, OLD_CTX, NEW_CTX) == expected
+    finally:
+        playfair_decrypt.decrypt_playfair, playfair_encrypt.encrypt_playfair = saved
+
+def test_matches_two_call_path_across_matrix_sizes():
+    """Rotating between matrix sizes gives the same result, or the same error for characters the new matrix lacks"""
+    rng = random.Random(12)
+    old_ctx = cipher_context.compile_key(OLD_KEY, 10, engine="table")
+    new_ctx = cipher_context.compile_key(NEW_KEY, 8, engine="lookup")
+    chars = methods.charset(10)
+    for _ in range(300):
+        password = ''.join(rng.choice(chars + chars.lower() + "Xx") for _ in range(rng.randint(0, 20)))
+        ciphertext, case_info = playfair_encrypt.encrypt_playfair(password, old_ctx, OLD_KEY)
+        decrypted = outcome(playfair_decrypt.decrypt_playfair, ciphertext, case_info, old_ctx, OLD_KEY)
+        expected = outcome(playfair_encrypt.encrypt_playfair, decrypted, new_ctx, NEW_KEY)
+        assert outcome(rekey.rekey, ciphertext, case_info, old_ctx, new_ctx) == expected, password
+
+def test_format_version_2_records():
+    """Records with filler information stay exact and in format version 2 after rotation"""
+    passwords = ["AXA", "TaXi_xIt", "boXb", "Password123", "XxX", ""]
+    records = playfair_encrypt.encrypt_many(passwords, OLD_KEY, format_version=2)
+    rotated = rekey.rekey_many(records, OLD_CTX, NEW_CTX)
+    assert rotated == playfair_encrypt.encrypt_many(passwords, NEW_KEY, format_version=2)
+    assert playfair_decrypt.decrypt_many(rotated, NEW_KEY) == passwords
+    
+    # Pairs and triples can be mixed; each keeps its format
+    mixed = [records[0], records[0][:2]]
+    assert [len(record) for record in rekey.rekey_many(mixed, OLD_KEY, NEW_KEY)] == [3, 2]
+
+def test_placeholder_characters_raise():
+    """A digraph outside the matrix decrypts to '??', which cannot be re-encrypted"""
+    # Reverses to a digraph holding '{' or '}', which are not in the matrix
+    ciphertext, case_info = "R_Ig", "f"
+    assert "??" in playfair_decrypt.decrypt_playfair(ciphertext, case_info, methods.PT(OLD_KEY, 7), OLD_KEY)
+    try:
+        rekey.rekey(ciphertext, case_info, OLD_KEY, NEW_KEY)
+        assert False, "placeholder accepted"
+    except ValueError as e:
+        assert str(e).startswith("Invalid character '?' in text.")
+
+if __name__ == "__main__":
+    print("=== TESTING KEY ROTATION ===")
+    
+    tests = [
+        test_matches_two_call_path,
+        test_matches_two_call_path_on_arbitrary_input,
+        test_does_not_use_two_call_path,
+        test_matches_two_call_path_across_matrix_sizes,
+        test_format_version_2_records,
+        test_placeholder_characters_raise,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,155 @@
+import sys
+import os
+import asyncio
+import json
+import tempfile
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import playfair_encrypt
+import service
+
+PASSWORDS = ["Password123", "abcDEF123", "Tennis", "Secret", "P@55w0rd", "Cyber$3curity", "WiFi-Security!", "Str0ng#P@ss!"] * 10
+
+async def round_trip(server_options, client_options):
+    """Encrypt and decrypt PASSWORDS concurrently through a server"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "playfair.sock")
+        server = await service.PlayfairServer(**server_options).start(path=path)
+        try:
+            async with service.PlayfairClient(path=path, **client_options) as client:
+                encrypted = await asyncio.gather(*(client.encrypt(p, "SECRET") for p in PASSWORDS))
+                decrypted = await asyncio.gather(*(client.decrypt(e, c, "SECRET") for e, c in encrypted))
+                connections = len(client._connections)
+        finally:
+            await server.close()
+    return encrypted, decrypted, connections, server
+
+def test_concurrent_requests_match_library():
+    """Concurrent requests over pooled connections give the library results, batched"""
+    for use_processes in (False, True):
+        encrypted, decrypted, connections, server = asyncio.run(round_trip(
+            {"workers": 2, "batch_size": 16, "use_processes": use_processes}, {"pool_size": 3}))
+        assert encrypted == playfair_encrypt.encrypt_many(PASSWORDS, "SECRET")
+        assert decrypted == PASSWORDS
+        assert connections == 3
+        assert server.requests == 2 * len(PASSWORDS)
+        assert server.batches < server.requests
+
+def test_format_version_2_requests():
+    """Encrypt requests with "format": 2 return fillers that decrypt requests use"""
+    response = service.handle_request({"op": "encrypt", "key": "SECRET", "password": "AXA", "format": 2})
+    assert (response["encrypted"], response["case"], response["fillers"]) == \
+        playfair_encrypt.encrypt_playfair("AXA", service.compiled_key("SECRET"), "SECRET", format_version=2)
+    
+    request = {"op": "decrypt", "key": "SECRET", "encrypted": response["encrypted"], "case": response["case"]}
+    assert service.handle_request(request) == {"decrypted": "AA"}
+    assert service.handle_request(dict(request, fillers=response["fillers"])) == {"decrypted": "AXA"}
+    assert "error" in service.handle_request({"op": "encrypt", "key": "SECRET", "password": "AXA", "format": 3})
+    
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "playfair.sock")
+            server = await service.PlayfairServer(workers=1, use_processes=False).start(path=path)
+            try:
+                async with service.PlayfairClient(path=path) as client:
+                    record = await client.encrypt("TaXi_xIt", "SECRET", format_version=2)
+                    return len(record), await client.decrypt(*record[:2], "SECRET", filler_info=record[2])
+            finally:
+                await server.close()
+    
+    assert asyncio.run(run()) == (3, "TaXi_xIt")
+
+def test_matrix_size_requests():
+    """Requests with "size" use that matrix, so 10x10-only passwords round trip"""
+    password = "Ünïcode{}<Pass>"
+    assert "error" in service.handle_request({"op": "encrypt", "key": "SECRET", "password": password})
+    response = service.handle_request({"op": "encrypt", "key": "SECRET", "password": password, "size": 10})
+    assert (response["encrypted"], response["case"]) == \
+        playfair_encrypt.encrypt_playfair(password, service.compiled_key("SECRET", 10), "SECRET")
+    
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "playfair.sock")
+            server = await service.PlayfairServer(workers=1).start(path=path)
+            try:
+                async with service.PlayfairClient(path=path) as client:
+                    record = await client.encrypt(password, "SECRET", matrix_size=10)
+                    return await client.decrypt(*record, "SECRET", matrix_size=10)
+            finally:
+                await server.close()
+    
+    assert asyncio.run(run()) == password
+
+def test_pipelined_responses_in_order():
+    """Requests written back to back on one TCP connection are answered in order, errors included"""
+    async def run():
+        server = await service.PlayfairServer(workers=2, use_processes=False).start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection(*server.address)
+            requests = [
+                {"id": 1, "op": "encrypt", "key": "SECRET", "password": "Tennis"},
+                {"id": 2, "op": "encrypt", "key": "SECRET", "password": "bad pw"},
+                {"id": 3, "op": "shuffle", "key": "SECRET"},
+                {"id": 4, "op": "decrypt", "key": "SECRET"},
+            ]
+            writer.write(b"".join(json.dumps(r).encode() + b"\n" for r in requests) + b"not json\n")
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(5)]
+            writer.close()
+            return responses
+        finally:
+            await server.close()
+    
+    responses = asyncio.run(run())
+    assert [r.get("id") for r in responses] == [1, 2, 3, 4, None]
+    encrypted, case_encoded = playfair_encrypt.encrypt_many(["Tennis"], "SECRET")[0]
+    assert responses[0] == {"id": 1, "encrypted": encrypted, "case": case_encoded}
+    assert "Spaces" in responses[1]["error"]
+    assert "Unknown operation" in responses[2]["error"]
+    assert "Missing field" in responses[3]["error"]
+    assert "Invalid request" in responses[4]["error"]
+
+def test_client_raises_server_errors():
+    """The client raises ValueError for an error response"""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "playfair.sock")
+            server = await service.PlayfairServer(workers=1, use_processes=False).start(path=path)
+            try:
+                async with service.PlayfairClient(path=path) as client:
+                    await client.encrypt("bad pw", "SECRET")
+            finally:
+                await server.close()
+    
+    try:
+        asyncio.run(run())
+        assert False, "error response not raised"
+    except ValueError as e:
+        assert "Spaces" in str(e)
+
+if __name__ == "__main__":
+    print("=== TESTING CIPHER SERVICE ===")
+    
+    tests = [
+        test_concurrent_requests_match_library,
+        test_format_version_2_requests,
+        test_matrix_size_requests,
+        test_pipelined_responses_in_order,
+        test_client_raises_server_errors,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
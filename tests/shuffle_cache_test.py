@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shuffle_cache
+import playfair_encrypt
+import playfair_decrypt
+
+def test_permutations_are_inverses():
+    """The cached inverse undoes the forward permutation"""
+    cache = shuffle_cache.ShuffleCache()
+    for key in ["fb", "0", "", "a1b2c3", "zz"]:
+        for length in range(0, 30):
+            forward, inverse = cache.get(key, length)
+            assert list(forward) == shuffle_cache.generate_shuffle_indices(key, length)
+            assert [forward[inverse[i]] for i in range(length)] == list(range(length))
+
+def test_shuffle_round_trip():
+    """shuffle_text and unshuffle_text undo each other through the shared cache"""
+    text = "(x6oSH!o"
+    shuffled = playfair_encrypt.shuffle_text(text, "fb")
+    assert shuffled == "6!So(Hxo"
+    assert playfair_decrypt.unshuffle_text(shuffled, "fb") == text
+
+def test_cache_statistics_and_eviction():
+    """Hits, misses and evictions are counted and the size limit is respected"""
+    cache = shuffle_cache.ShuffleCache(maxsize=2)
+    cache.get("a", 4)
+    cache.get("a", 4)
+    cache.get("b", 4)
+    cache.get("c", 4)
+    assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2, "maxsize": 2}
+    
+    # "a" was the least recently used entry and is gone
+    cache.get("a", 4)
+    assert cache.misses == 4
+    
+    cache.resize(1)
+    assert cache.stats()["size"] == 1
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0, "maxsize": 1}
+
+def test_disabled_cache():
+    """A cache of size 0 still answers lookups but stores nothing"""
+    cache = shuffle_cache.ShuffleCache(maxsize=0)
+    assert cache.get("fb", 8) == cache.get("fb", 8)
+    assert cache.stats()["size"] == 0 and cache.misses == 2
+
+if __name__ == "__main__":
+    print("=== TESTING SHUFFLE PERMUTATION CACHE ===")
+    
+    tests = [
+        test_permutations_are_inverses,
+        test_shuffle_round_trip,
+        test_cache_statistics_and_eviction,
+        test_disabled_cache,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
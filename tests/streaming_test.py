@@ -0,0 +1,174 @@
+import sys
+import os
+import io
+import random
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+import streaming
+
+SECRET_KEY = "SECRET"
+# Characters of the 7x7 matrix ({ and } are allowed but not in the matrix)
+CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()_+-"
+
+def random_messages(count, seed=12):
+    """Random messages including doubled letters and filler characters"""
+    rng = random.Random(seed)
+    messages = ["", "a", "AA", "aXa", "balloon", "XxX", "Hello!World"]
+    for _ in range(count):
+        length = rng.randint(1, 300)
+        messages.append(''.join(rng.choice(CHARS + "xXlL") for _ in range(length)))
+    return messages
+
+def random_chunks(text, rng):
+    """Split a text into chunks of random size"""
+    chunks = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(0, 17)
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+def stream_encrypt(message, chunks, block_size):
+    """Encrypt a message fed in the given chunks"""
+    encryptor = streaming.StreamEncryptor(SECRET_KEY, block_size)
+    cipher_parts, case_parts = [], []
+    for chunk in chunks:
+        ciphertext, case_encoded = encryptor.feed(chunk)
+        cipher_parts.append(ciphertext)
+        case_parts.append(case_encoded)
+    ciphertext, case_encoded = encryptor.finalize()
+    return ''.join(cipher_parts) + ciphertext, ''.join(case_parts) + case_encoded
+
+def test_output_independent_of_chunking():
+    """The same message gives the same stream however it is split"""
+    rng = random.Random(5)
+    for message in random_messages(50):
+        expected = stream_encrypt(message, [message], 16)
+        for _ in range(3):
+            assert stream_encrypt(message, random_chunks(message, rng), 16) == expected, message
+
+def test_transform_by_absolute_position():
+    """Without shuffling the stream matches the whole-message pipeline before its shuffle"""
+    for message in random_messages(30):
+        ciphertext, case_encoded = stream_encrypt(message, [message[:7], message[7:]], 1)
+        encrypted, whole_case = playfair_encrypt.encrypt_playfair(message, cipher_context.compile_key(SECRET_KEY), SECRET_KEY)
+        if not encrypted:
+            assert ciphertext == ""
+            continue
+        shuffle_key = whole_case or cipher_context.compile_key(SECRET_KEY).fallback_shuffle_key
+        assert ciphertext == playfair_decrypt.unshuffle_text(encrypted, shuffle_key), message
+        # Only the message characters have a case bit in the stream
+        assert len(case_encoded) == (len(message) + 3) // 4
+
+def test_round_trip_matches_decrypt_playfair():
+    """Decrypting the stream in random chunks gives what decrypt_playfair gives"""
+    ctx = cipher_context.compile_key(SECRET_KEY)
+    rng = random.Random(8)
+    for block_size in (1, 2, 5, 64):
+        for message in random_messages(20, seed=block_size):
+            ciphertext, case_encoded = stream_encrypt(message, random_chunks(message, rng), block_size)
+            encrypted, whole_case = playfair_encrypt.encrypt_playfair(message, ctx, SECRET_KEY)
+            expected = playfair_decrypt.decrypt_playfair(encrypted, whole_case, ctx, SECRET_KEY)
+            
+            decryptor = streaming.StreamDecryptor(SECRET_KEY, block_size)
+            cipher_chunks = random_chunks(ciphertext, rng)
+            case_chunks = random_chunks(case_encoded, rng)
+            case_chunks += [''] * (len(cipher_chunks) - len(case_chunks))
+            cipher_chunks += [''] * (len(case_chunks) - len(cipher_chunks))
+            decrypted = ''.join(decryptor.feed(c, h) for c, h in zip(cipher_chunks, case_chunks))
+            decrypted += decryptor.finalize()
+            assert decrypted == expected, (message, block_size)
+
+def test_file_helpers():
+    """encrypt_stream and decrypt_stream work on file objects"""
+    message = ''.join(random_messages(40, seed=3))
+    cipher_file, case_file, plain_file = io.StringIO(), io.StringIO(), io.StringIO()
+    streaming.encrypt_stream(io.StringIO(message), cipher_file, case_file, SECRET_KEY, block_size=100, chunk_size=33)
+    streaming.decrypt_stream(io.StringIO(cipher_file.getvalue()), io.StringIO(case_file.getvalue()),
+                             plain_file, SECRET_KEY, block_size=100, chunk_size=29)
+    
+    decryptor = streaming.StreamDecryptor(SECRET_KEY, 100)
+    expected = decryptor.feed(cipher_file.getvalue(), case_file.getvalue()) + decryptor.finalize()
+    assert plain_file.getvalue() == expected
+    assert expected.lower().replace('x', '') == message.lower().replace('x', '')
+
+class TrackingReader(io.StringIO):
+    """StringIO that counts the characters read"""
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.consumed += len(data)
+        return data
+
+def test_case_info_read_on_demand():
+    """decrypt_stream reads case information only as plaintext needs it"""
+    message = "aa" * 25000  # Every character gets a filler, so the ciphertext is twice as long
+    cipher_file, case_file = io.StringIO(), io.StringIO()
+    streaming.encrypt_stream(io.StringIO(message), cipher_file, case_file, SECRET_KEY, block_size=64, chunk_size=1000)
+    
+    case_reader = TrackingReader(case_file.getvalue())
+    ahead = []
+
+    class Writer(io.StringIO):
+        def write(self, text):
+            super().write(text)
+            # Case bits read but not yet applied to written plaintext
+            ahead.append(case_reader.consumed * 4 - len(self.getvalue()))
+    
+    writer = Writer()
+    streaming.decrypt_stream(io.StringIO(cipher_file.getvalue()), case_reader, writer, SECRET_KEY,
+                             block_size=64, chunk_size=1000)
+    assert writer.getvalue() == message
+    assert max(ahead) <= 8, max(ahead)
+
+def test_errors():
+    """Invalid characters and use after finalize are rejected"""
+    encryptor = streaming.StreamEncryptor(SECRET_KEY)
+    for chunk in ["a b", "pass~"]:
+        try:
+            encryptor.feed(chunk)
+            assert False, chunk
+        except ValueError:
+            pass
+    encryptor.finalize()
+    try:
+        encryptor.feed("abc")
+        assert False, "feed after finalize"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    print("=== TESTING STREAMING ===")
+    
+    tests = [
+        test_output_independent_of_chunking,
+        test_transform_by_absolute_position,
+        test_round_trip_matches_decrypt_playfair,
+        test_file_helpers,
+        test_case_info_read_on_demand,
+        test_errors,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import playfair_encrypt
+import playfair_decrypt
+from helpers import random_texts
+
+# Allowed characters mixed with spaces and invalid characters
+TEXT_CHARS = methods.ALLOWED_CHARS + " ~é?<>[]"
+
+def legacy_invalid_chars(text):
+    """The original per-character check, kept as a reference"""
+    return ''.join(c for c in text if c not in methods.ALLOWED_CHARS)
+
+def test_invalid_chars_matches_legacy():
+    """invalid_chars returns the invalid characters in order"""
+    for text in random_texts(TEXT_CHARS, 2000, seed=6):
+        assert methods.invalid_chars(text) == legacy_invalid_chars(text), text
+
+def test_error_messages_unchanged():
+    """validate_input, encrypt_playfair and decrypt_playfair report the first invalid character as before"""
+    matrix = methods.PT("SECRET", 7)
+    message = methods.validate_input("a~b<~")[1]
+    assert message.startswith("Invalid characters found: ") and "'~'" in message and "'<'" in message
+    for text in random_texts(TEXT_CHARS, 300, seed=7):
+        invalid = legacy_invalid_chars(text)
+        if not invalid:
+            continue
+        try:
+            playfair_encrypt.encrypt_playfair(text, matrix, "SECRET")
+            assert False, text
+        except ValueError as e:
+            if invalid[0] == ' ':
+                assert str(e) == "Spaces are not allowed in passwords. Please remove all spaces."
+            else:
+                assert f"Invalid character '{invalid[0]}' in text." in str(e), text
+        try:
+            playfair_decrypt.decrypt_playfair(text, "", matrix, "SECRET")
+            assert False, text
+        except ValueError as e:
+            assert f"Invalid character '{invalid[0]}' in encrypted text." in str(e), text
+
+if __name__ == "__main__":
+    print("=== TESTING INPUT VALIDATION ===")
+    
+    tests = [
+        test_invalid_chars_matches_legacy,
+        test_error_messages_unchanged,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
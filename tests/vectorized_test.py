@@ -0,0 +1,83 @@
+import sys
+import os
+import random
+
+# Add the parent directory to the Python path so we can import modules from there
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import methods
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+import vectorized
+from helpers import random_texts
+
+# Allowed characters mixed with characters outside the transform ring
+TEXT_CHARS = methods.ALLOWED_CHARS + " ?~é"
+
+def test_transform_batch_matches_single_calls():
+    """Both backends give the same output as the per-text functions"""
+    texts = random_texts(TEXT_CHARS, 300, seed=1, max_length=40)
+    for key in ["SECRET", "P@55W0RD!", "a"]:
+        expected = [playfair_encrypt.apply_ascii_transform(t, key) for t in texts]
+        reversed_expected = [playfair_decrypt.reverse_ascii_transform(t, key) for t in texts]
+        backends = [False, True] if vectorized.HAVE_NUMPY else [False]
+        for use_numpy in backends:
+            assert vectorized.apply_ascii_transform_batch(texts, key, use_numpy) == expected, (key, use_numpy)
+            assert vectorized.reverse_ascii_transform_batch(texts, key, use_numpy) == reversed_expected, (key, use_numpy)
+
+def test_transform_batch_round_trip():
+    """Reversing a transformed batch restores ring characters"""
+    ctx = cipher_context.compile_key("COMPLEX")
+    texts = [t for t in random_texts(TEXT_CHARS, 100, seed=2, max_length=40) if all(c in methods.ALLOWED_CHARS for c in t)]
+    transformed = vectorized.apply_ascii_transform_batch(texts, ctx)
+    assert vectorized.reverse_ascii_transform_batch(transformed, ctx) == texts
+
+def test_digraph_batch_matches_single_calls():
+    """Both backends substitute digraphs exactly like encrypt_digraph/decrypt_digraph"""
+    rng = random.Random(3)
+    alphabet = methods.ALLOWED_CHARS.upper() + ".é€"
+    texts = [''.join(rng.choice(alphabet) for _ in range(2 * rng.randint(0, 20))) for _ in range(300)]
+    # An 8x8 matrix has padding cells holding the same character
+    for ctx in [cipher_context.compile_key("SECRET"), cipher_context.compile_key("COMPLEX", 8)]:
+        expected = [''.join(playfair_encrypt.encrypt_digraph(t[i], t[i+1], ctx, ctx.matrix_flat) for i in range(0, len(t), 2)) for t in texts]
+        reversed_expected = [''.join(playfair_decrypt.decrypt_digraph(t[i], t[i+1], ctx) for i in range(0, len(t), 2)) for t in texts]
+        backends = [False, True] if vectorized.HAVE_NUMPY else [False]
+        for use_numpy in backends:
+            ascii_texts = [t for t in texts if '€' not in t]
+            ascii_expected = [e for t, e in zip(texts, expected) if '€' not in t]
+            assert vectorized.encrypt_digraphs_batch(ascii_texts, ctx, use_numpy) == ascii_expected, use_numpy
+            assert vectorized.encrypt_digraphs_batch(texts, ctx, use_numpy) == expected, use_numpy
+            assert vectorized.decrypt_digraphs_batch(texts, ctx, use_numpy) == reversed_expected, use_numpy
+
+def test_digraph_batch_round_trip():
+    """Decrypting an encrypted batch of prepared messages restores it"""
+    ctx = cipher_context.compile_key("SECRET")
+    prepared = [''.join(playfair_encrypt.prepare_message(p)[0]) for p in ["Tennis", "balloon", "P@55w0rd!", ""]]
+    encrypted = vectorized.encrypt_digraphs_batch(prepared, ctx)
+    assert vectorized.decrypt_digraphs_batch(encrypted, ctx) == prepared
+
+if __name__ == "__main__":
+    print("=== TESTING VECTORIZED TRANSFORMS ===")
+    print(f"NumPy backend available: {vectorized.HAVE_NUMPY}")
+    
+    tests = [
+        test_transform_batch_matches_single_calls,
+        test_transform_batch_round_trip,
+        test_digraph_batch_matches_single_calls,
+        test_digraph_batch_round_trip,
+    ]
+    
+    results = []
+    for test in tests:
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+            results.append(True)
+        except AssertionError as e:
+            print(f"[FAIL] {test.__name__}: {e}")
+            results.append(False)
+    
+    # Summary
+    print("\n=== TEST SUMMARY ===")
+    print(f"Overall result: {'ALL PASSED' if all(results) else 'SOME FAILED'}")
@@ -0,0 +1,328 @@
+import functools
+
+import cipher_context
+import playfair_encrypt
+import playfair_decrypt
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python stages are used instead
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Symbol index of characters that are not in the matrix
+UNKNOWN_SYMBOL = 255
+
+def _use_numpy(use_numpy):
+    """
+    Resolve the use_numpy argument of the batch functions
+    
+    Args:
+        use_numpy: True, False or None (use NumPy when it is installed)
+    
+    Returns:
+        Whether the NumPy backend should be used
+    """
+    if use_numpy is None:
+        return HAVE_NUMPY
+    if use_numpy and not HAVE_NUMPY:
+        raise ImportError("NumPy is not installed; use use_numpy=False for the pure-Python backend.")
+    return use_numpy
+
+def _key_values(key):
+    """
+    Return the key values and transform ring for a secret key or a CipherContext
+    
+    Args:
+        key: The secret key or a CipherContext
+    
+    Returns:
+        A tuple (key_values, ring); a secret key uses the 7x7 ring
+    """
+    if isinstance(key, cipher_context.CipherContext):
+        return key.key_values, key.ring
+    return cipher_context.generate_key_values(key), cipher_context.TRANSFORM_CHARS
+
+@functools.lru_cache(maxsize=16)
+def _ring_arrays(ring):
+    """
+    Return a transform ring as Latin-1 byte codes, and the ring index of
+    every byte (-1 if not in the ring)
+    """
+    codes = np.frombuffer(ring.encode('latin-1'), dtype=np.uint8)
+    index = np.full(256, -1, dtype=np.int32)
+    index[codes] = np.arange(len(codes), dtype=np.int32)
+    return codes, index
+
+def _is_latin1(text):
+    """Whether every character of a text fits in one Latin-1 byte"""
+    return not text or max(text) <= '\xff'
+
+def _transform_rows(texts, key_values, direction, ring):
+    """
+    Apply the ASCII transformation to ASCII texts as one array operation
+    
+    Texts are padded to the longest one and stacked into a 2-D array of byte
+    codes, so the cyclic key-value offsets become a single modular add/subtract.
+    
+    Args:
+        texts: A list of ASCII texts
+        key_values: Values derived from the secret key
+        direction: 1 to apply the transformation, -1 to reverse it
+        ring: Characters of the transform ring
+    
+    Returns:
+        A list of transformed texts
+    """
+    width = max(len(text) for text in texts)
+    if width == 0:
+        return list(texts)
+    
+    ring_codes, ring_index = _ring_arrays(ring)
+    padded = ''.join(text.ljust(width) for text in texts).encode('latin-1')
+    codes = np.frombuffer(padded, dtype=np.uint8).reshape(len(texts), width)
+    
+    # Key value for every column, cycling through the key values
+    schedule = np.asarray(key_values, dtype=np.int32)[np.arange(width) % len(key_values)]
+    
+    indices = ring_index[codes]
+    in_ring = indices >= 0
+    shifted = ring_codes[np.mod(np.where(in_ring, indices, 0) + direction * schedule, len(ring_codes))]
+    if direction < 0:
+        # Characters outside the ring are kept as they are when reversing
+        shifted = np.where(in_ring, shifted, codes)
+    
+    rows = shifted.astype(np.uint8).tobytes().decode('latin-1')
+    return [rows[i * width:i * width + len(text)] for i, text in enumerate(texts)]
+
+def _transform_batch(texts, key, use_numpy, direction, single):
+    """
+    Shared implementation of the batch transformations
+    
+    Args:
+        texts: An iterable of texts
+        key: The secret key or a CipherContext
+        use_numpy: Whether to use the NumPy backend (None: when installed)
+        direction: 1 to apply the transformation, -1 to reverse it
+        single: The pure-Python function for a single text
+    
+    Returns:
+        A list of transformed texts in input order
+    """
+    texts = list(texts)
+    key_values, ring = _key_values(key)
+    
+    if not _use_numpy(use_numpy) or not key_values:
+        return [single(text, None, key_values, ring) for text in texts]
+    
+    # Texts beyond Latin-1 cannot be stacked as byte codes; they take the pure-Python path
+    results = [None] * len(texts)
+    byte_positions = []
+    for i, text in enumerate(texts):
+        if _is_latin1(text):
+            byte_positions.append(i)
+        else:
+            results[i] = single(text, None, key_values, ring)
+    
+    if byte_positions:
+        transformed = _transform_rows([texts[i] for i in byte_positions], key_values, direction, ring)
+        for i, text in zip(byte_positions, transformed):
+            results[i] = text
+    
+    return results
+
+def apply_ascii_transform_batch(texts, key, use_numpy=None):
+    """
+    Apply the ASCII transformation to a batch of texts.
+    
+    The output is identical to calling playfair_encrypt.apply_ascii_transform
+    on each text.
+    
+    Args:
+        texts: An iterable of texts to transform
+        key: The secret key or a CipherContext compiled for it
+        use_numpy: Whether to use the NumPy backend (default: when installed)
+    
+    Returns:
+        A list of transformed texts in input order
+    """
+    return _transform_batch(texts, key, use_numpy, 1, playfair_encrypt.apply_ascii_transform)
+
+def reverse_ascii_transform_batch(texts, key, use_numpy=None):
+    """
+    Reverse the ASCII transformation on a batch of texts.
+    
+    The output is identical to calling playfair_decrypt.reverse_ascii_transform
+    on each text.
+    
+    Args:
+        texts: An iterable of transformed texts
+        key: The secret key or a CipherContext compiled for it
+        use_numpy: Whether to use the NumPy backend (default: when installed)
+    
+    Returns:
+        A list of original texts in input order
+    """
+    return _transform_batch(texts, key, use_numpy, -1, playfair_decrypt.reverse_ascii_transform)
+
+@functools.lru_cache(maxsize=64)
+def _symbol_tables(matrix_flat, matrix_size):
+    """
+    Build the symbol tables of a matrix
+    
+    The symbol index of a character is the position of its first cell in the
+    flattened matrix (the cell find_position returns).
+    
+    Args:
+        matrix_flat: The flattened matrix as a tuple
+        matrix_size: Number of rows (and columns) in the matrix
+    
+    Returns:
+        A tuple (encode_table, decode_table, rows, cols, cell_symbols) where
+        encode_table maps code points 0-255 to symbol characters for
+        str.translate, decode_table maps symbol characters back, rows/cols give
+        the row/column of every symbol and cell_symbols the symbol of every cell
+    """
+    symbols = {}
+    for index, char in enumerate(matrix_flat):
+        symbols.setdefault(char, index)
+    
+    encode_table = {code: chr(UNKNOWN_SYMBOL) for code in range(256)}
+    for char, index in symbols.items():
+        encode_table[ord(char)] = chr(index)
+    decode_table = {index: char for char, index in symbols.items()}
+    decode_table[UNKNOWN_SYMBOL] = '?'
+    
+    rows = np.zeros(256, dtype=np.int32)
+    cols = np.zeros(256, dtype=np.int32)
+    indices = np.arange(len(matrix_flat), dtype=np.int32)
+    rows[indices] = indices // matrix_size
+    cols[indices] = indices % matrix_size
+    cell_symbols = np.array([symbols[char] for char in matrix_flat], dtype=np.uint8)
+    return encode_table, decode_table, rows, cols, cell_symbols
+
+@functools.lru_cache(maxsize=None)
+def _shift_arrays(matrix_size):
+    """Return cipher_context.shift_tables(matrix_size) as NumPy index arrays"""
+    return tuple(np.asarray(table, dtype=np.int32) for table in cipher_context.shift_tables(matrix_size))
+
+def substitute_symbols(pairs, ctx, direction):
+    """
+    Apply the Playfair rules to an array of digraphs of symbol indices
+    
+    Args:
+        pairs: A uint8 array of shape (n, 2) of symbol indices (the first
+               cell of each character in ctx.matrix_flat); UNKNOWN_SYMBOL
+               marks characters that are not in the matrix
+        ctx: The CipherContext the symbols belong to
+        direction: 1 to encrypt, -1 to decrypt
+    
+    Returns:
+        A uint8 array of shape (n, 2) with the substituted symbols; digraphs
+        with an unknown character become the fallback pair (the first matrix
+        cell twice when encrypting, UNKNOWN_SYMBOL twice when decrypting)
+    """
+    _, _, rows, cols, cell_symbols = _symbol_tables(ctx.matrix_flat, ctx.matrix_size)
+    size = ctx.matrix_size
+    rows_down, cols_right, rows_up, cols_left = _shift_arrays(size)
+    row_shift, col_shift = (rows_down, cols_right) if direction > 0 else (rows_up, cols_left)
+    
+    r1, r2 = rows[pairs[:, 0]], rows[pairs[:, 1]]
+    c1, c2 = cols[pairs[:, 0]], cols[pairs[:, 1]]
+    same_row = r1 == r2
+    same_col = (c1 == c2) & ~same_row
+    rectangle = ~(same_row | same_col)
+    
+    # Same row: shift the rows; same column: shift the columns; rectangle: swap the columns
+    new_r1 = np.where(same_row, row_shift[r1], r1)
+    new_r2 = np.where(same_row, row_shift[r2], r2)
+    new_c1 = np.where(same_col, col_shift[c1], np.where(rectangle, c2, c1))
+    new_c2 = np.where(same_col, col_shift[c2], np.where(rectangle, c1, c2))
+    
+    result = np.stack((cell_symbols[new_r1 * size + new_c1], cell_symbols[new_r2 * size + new_c2]), axis=1)
+    unknown = (pairs == UNKNOWN_SYMBOL).any(axis=1)
+    result[unknown] = cell_symbols[0] if direction > 0 else UNKNOWN_SYMBOL
+    return result
+
+def _substitute_python(text, ctx, direction):
+    """Substitute the digraphs of one prepared text with the per-digraph functions"""
+    if direction > 0:
+        return ''.join(playfair_encrypt.encrypt_digraph(text[i], text[i+1], ctx, ctx.matrix_flat)
+                       for i in range(0, len(text), 2))
+    return ''.join(playfair_decrypt.decrypt_digraph(text[i], text[i+1], ctx)
+                   for i in range(0, len(text), 2))
+
+def _substitute_batch(texts, key, use_numpy, direction):
+    """
+    Shared implementation of the batch digraph substitutions
+    
+    Args:
+        texts: An iterable of prepared texts (concatenated digraphs)
+        key: The secret key or a CipherContext
+        use_numpy: Whether to use the NumPy backend (None: when installed)
+        direction: 1 to encrypt, -1 to decrypt
+    
+    Returns:
+        A list of substituted texts in input order
+    """
+    texts = list(texts)
+    ctx = cipher_context.resolve_key(key)
+    if any(len(text) % 2 for text in texts):
+        raise ValueError("Prepared texts must have an even length (a whole number of digraphs).")
+    
+    if not _use_numpy(use_numpy):
+        return [_substitute_python(text, ctx, direction) for text in texts]
+    
+    encode_table, decode_table, _, _, _ = _symbol_tables(ctx.matrix_flat, ctx.matrix_size)
+    try:
+        # Characters above U+00FF are left untouched by the table and cannot be encoded
+        joined = ''.join(texts).translate(encode_table).encode('latin-1')
+    except UnicodeEncodeError:
+        return [_substitute_python(text, ctx, direction) for text in texts]
+    if not joined:
+        return list(texts)
+    
+    pairs = np.frombuffer(joined, dtype=np.uint8).reshape(-1, 2)
+    substituted = substitute_symbols(pairs, ctx, direction).tobytes().decode('latin-1').translate(decode_table)
+    
+    results = []
+    start = 0
+    for text in texts:
+        results.append(substituted[start:start + len(text)])
+        start += len(text)
+    return results
+
+def encrypt_digraphs_batch(texts, key, use_numpy=None):
+    """
+    Encrypt the digraphs of a batch of prepared texts.
+    
+    The output is identical to joining playfair_encrypt.encrypt_digraph over
+    the digraphs of each text.
+    
+    Args:
+        texts: An iterable of prepared (uppercase, even-length) texts
+        key: The secret key or a CipherContext compiled for it
+        use_numpy: Whether to use the NumPy backend (default: when installed)
+    
+    Returns:
+        A list of encrypted texts in input order
+    """
+    return _substitute_batch(texts, key, use_numpy, 1)
+
+def decrypt_digraphs_batch(texts, key, use_numpy=None):
+    """
+    Decrypt the digraphs of a batch of texts.
+    
+    The output is identical to joining playfair_decrypt.decrypt_digraph over
+    the digraphs of each text.
+    
+    Args:
+        texts: An iterable of even-length texts
+        key: The secret key or a CipherContext compiled for it
+        use_numpy: Whether to use the NumPy backend (default: when installed)
+    
+    Returns:
+        A list of decrypted texts in input order
+    """
+    return _substitute_batch(texts, key, use_numpy, -1)